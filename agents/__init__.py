@@ -8,4 +8,14 @@ Agents package:
 - customer_data_agent.py
 - support_agent.py
 - coordinator.py
+- profiling.py
+- session_store.py
+- batch.py
+- pool.py
+- plans.py
+- prefetch.py
+- templates.py
+- result_store.py
+- llm_metrics.py
+- single_flight.py
 """
@@ -1,7 +1,19 @@
 # agents/base_agent.py
+import time
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from . import llm_metrics
 from .llm_utils import generate_text
+from .single_flight import LLM_FLIGHTS
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's latency budget ran out while `agent` was working."""
+
+    def __init__(self, agent: Optional[str] = None):
+        super().__init__(f"deadline exceeded in {agent or 'unknown agent'}")
+        self.agent = agent
+
 
 @dataclass
 class A2AMessage:
@@ -10,6 +22,49 @@ class A2AMessage:
     role: str            # "user", "system", or "agent"
     content: str         # free text query or instruction
     state: Dict[str, Any] = field(default_factory=dict)
+    deadline: Optional[float] = None   # time.monotonic() by which the request must finish
+    results: Optional[Any] = field(default=None, repr=False)   # conversation's ResultStore
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the latency budget (None = no deadline)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def to_wire(self, content_type: str = "application/json") -> bytes:
+        """Serialize for another process (see mcp_server.wire)."""
+        from mcp_server import wire
+
+        # deadline is a time.monotonic() value, meaningless in another
+        # process: send the remaining budget instead
+        return wire.encode({
+            "sender": self.sender,
+            "receiver": self.receiver,
+            "role": self.role,
+            "content": self.content,
+            # ResultHandles only mean something in this process
+            "state": self.results.resolve(self.state) if self.results is not None else self.state,
+            "budget": self.remaining(),
+        }, content_type)
+
+    @classmethod
+    def from_wire(cls, data: bytes, content_type: str = "application/json") -> "A2AMessage":
+        from mcp_server import wire
+
+        payload = wire.decode(data, content_type)
+        budget = payload.get("budget")
+        return cls(
+            sender=payload["sender"],
+            receiver=payload["receiver"],
+            role=payload["role"],
+            content=payload["content"],
+            state=payload.get("state") or {},
+            deadline=time.monotonic() + budget if budget is not None else None,
+        )
+
 
 class BaseAgent:
     def __init__(self, name: str, mcp_client=None):
@@ -22,3 +77,53 @@ class BaseAgent:
         Returns a new A2AMessage.
         """
         raise NotImplementedError
+
+    # ------------------------------------------------------
+    # Deadline helpers
+    # ------------------------------------------------------
+    def check_deadline(self, message: A2AMessage):
+        if message.expired():
+            raise DeadlineExceeded(self.name)
+
+    def timeout_kwargs(self, message: A2AMessage) -> Dict[str, float]:
+        """`timeout=<remaining budget>` for LLM / MCP calls, or {} without a deadline."""
+        remaining = message.remaining()
+        if remaining is None:
+            return {}
+        if remaining <= 0:
+            raise DeadlineExceeded(self.name)
+        return {"timeout": remaining}
+
+    # ------------------------------------------------------
+    # LLM calls
+    # ------------------------------------------------------
+    # Identical prompts in flight at the same time share one LLM call (None: off)
+    llm_flights = LLM_FLIGHTS
+
+    def call_llm(self, system_prompt: str, user_prompt: str, scenario: Optional[str] = None, **llm_kwargs) -> str:
+        """
+        self.llm(...), timed and recorded in llm_metrics under this agent and
+        `scenario`. A call that joined an identical one in flight is recorded
+        as a cache hit; if that one failed because its caller's budget ran
+        out (DeadlineExceeded), this caller runs the prompt itself.
+        """
+        timeout = llm_kwargs.get("timeout")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        def run():
+            try:
+                with llm_metrics.track(self.name, scenario):
+                    return self.llm(system_prompt, user_prompt, **llm_kwargs)
+            except Exception:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise DeadlineExceeded(self.name)
+                raise
+
+        if self.llm_flights is None:
+            return run()
+        options = {k: v for k, v in llm_kwargs.items() if k != "timeout"}
+        key = (self.llm, system_prompt, user_prompt, tuple(sorted(options.items())))
+        result, shared = self.llm_flights.do(key, run, timeout=timeout, rerun_on=(DeadlineExceeded,))
+        if shared:
+            llm_metrics.record_cache_hit(self.name, scenario)
+        return result
@@ -0,0 +1,267 @@
+# agents/batch.py
+"""
+High-throughput batch replay of queries from a JSONL file.
+
+    python -m agents.batch queries.jsonl -o answers.jsonl --workers 8 --mode thread
+
+Input: one JSON object per line, {"query": "...", "id": ..., "session_id": ...}
+(only "query" is required). Output: one JSON object per query, written as
+soon as it finishes (completion order, not input order):
+
+    {"id", "query", "session_id", "answer", "log", "latency_ms", "error"}
+
+Memory stays bounded: at most `max_in_flight` queries are read ahead, and
+latencies are kept as a fixed-size histogram rather than a list.
+
+Modes:
+- thread:  one coordinator per worker thread, sharing one SessionStore.
+           Turns of the same session are never in flight concurrently, so
+           session context is applied in input order.
+- process: one coordinator per worker process (for CPU-bound agent work).
+           Session context is per process, so reuse is best-effort.
+"""
+
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+
+_local = threading.local()
+
+
+# ------------------------------------------------------
+# Latency histogram
+# ------------------------------------------------------
+# Bucket upper bounds in ms (1-2-5 steps); last bucket is open-ended.
+HISTOGRAM_BOUNDS_MS = [b * 10 ** e for e in range(0, 6) for b in (1, 2, 5)]
+
+
+@dataclass
+class LatencyHistogram:
+    bounds: List[float] = field(default_factory=lambda: list(HISTOGRAM_BOUNDS_MS))
+    counts: List[int] = field(default_factory=list)
+    total: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def add(self, ms: float):
+        idx = next((i for i, b in enumerate(self.bounds) if ms <= b), len(self.bounds))
+        self.counts[idx] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile."""
+        if not self.total:
+            return 0.0
+        target = pct / 100 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def format(self, width: int = 40) -> str:
+        lines = []
+        peak = max(self.counts) or 1
+        lower = 0
+        for i, count in enumerate(self.counts):
+            upper = self.bounds[i] if i < len(self.bounds) else float("inf")
+            if count:
+                bar = "#" * max(1, round(count / peak * width))
+                label = f"{lower:g}-{upper:g}ms" if upper != float("inf") else f">{lower:g}ms"
+                lines.append(f"  {label:>16} | {count:>7} {bar}")
+            lower = upper
+        return "\n".join(lines)
+
+
+# ------------------------------------------------------
+# Workers
+# ------------------------------------------------------
+def _init_worker(factory: Callable[[], Any], session_store=None):
+    coord = factory()
+    if session_store is not None:
+        coord.sessions = session_store
+    _local.coordinator = coord
+
+
+def _run_one(item: Dict[str, Any], include_log: bool) -> Dict[str, Any]:
+    coord = _local.coordinator
+    start = time.perf_counter()
+    answer, log, error = None, [], None
+    try:
+        answer, log = coord.run(item["query"], session_id=item.get("session_id"))
+    except Exception as e:  # keep the batch going; record the failure
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "id": item.get("id"),
+        "query": item["query"],
+        "session_id": item.get("session_id"),
+        "answer": answer,
+        "log": log if include_log else None,
+        "latency_ms": (time.perf_counter() - start) * 1000,
+        "error": error,
+    }
+
+
+def _default_factory():
+    from .coordinator import A2ACoordinator
+
+    return A2ACoordinator()
+
+
+def read_queries(f: TextIO) -> Iterator[Dict[str, Any]]:
+    for lineno, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"query": item}
+        item.setdefault("id", lineno)
+        yield item
+
+
+# ------------------------------------------------------
+# Batch runner
+# ------------------------------------------------------
+@dataclass
+class BatchReport:
+    completed: int
+    errors: int
+    elapsed_s: float
+    histogram: LatencyHistogram
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed_s if self.elapsed_s else 0.0
+
+    def format(self) -> str:
+        h = self.histogram
+        mean = h.sum_ms / h.total if h.total else 0.0
+        return "\n".join([
+            f"BATCH completed={self.completed} errors={self.errors} "
+            f"elapsed={self.elapsed_s:.1f}s throughput={self.throughput:.2f} q/s",
+            f"latency mean={mean:.1f}ms p50<={h.percentile(50):g}ms p95<={h.percentile(95):g}ms "
+            f"p99<={h.percentile(99):g}ms max={h.max_ms:.1f}ms",
+            h.format(),
+        ])
+
+
+def run_batch(
+    queries: Iterator[Dict[str, Any]],
+    out: TextIO,
+    workers: int = 4,
+    mode: str = "thread",
+    coordinator_factory: Callable[[], Any] = _default_factory,
+    max_in_flight: Optional[int] = None,
+    include_log: bool = True,
+    progress: Optional[TextIO] = sys.stderr,
+    progress_every: float = 5.0,
+) -> BatchReport:
+    """
+    Stream `queries` through a pool of coordinators, writing each result
+    to `out` as a JSON line as soon as it completes.
+    """
+    if mode == "thread":
+        from .session_store import SessionStore
+
+        pool = ThreadPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(coordinator_factory, SessionStore()),
+        )
+    elif mode == "process":
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(coordinator_factory,),
+        )
+    else:
+        raise ValueError(f"Unknown batch mode: {mode!r} (expected 'thread' or 'process')")
+
+    max_in_flight = max_in_flight or workers * 2
+    histogram = LatencyHistogram()
+    completed = errors = 0
+    in_flight: Dict[Any, Optional[str]] = {}   # future -> session_id
+    busy_sessions = set()
+    start = last_progress = time.perf_counter()
+
+    def drain(block_until_one: bool):
+        nonlocal completed, errors, last_progress
+        if not in_flight:
+            return
+        done, _ = wait(list(in_flight), timeout=None if block_until_one else 0, return_when=FIRST_COMPLETED)
+        for fut in done:
+            busy_sessions.discard(in_flight.pop(fut))
+            result = fut.result()
+            out.write(json.dumps(result, default=str) + "\n")
+            completed += 1
+            errors += result["error"] is not None
+            histogram.add(result["latency_ms"])
+
+        now = time.perf_counter()
+        if progress is not None and now - last_progress >= progress_every:
+            last_progress = now
+            progress.write(
+                f"[batch] {completed} done, {errors} errors, "
+                f"{completed / (now - start):.2f} q/s\n"
+            )
+            progress.flush()
+
+    with pool:
+        for item in queries:
+            sid = item.get("session_id")
+            # Bound read-ahead, and keep turns of one session strictly ordered
+            while len(in_flight) >= max_in_flight or (
+                mode == "thread" and sid is not None and sid in busy_sessions
+            ):
+                drain(block_until_one=True)
+            if sid is not None:
+                busy_sessions.add(sid)
+            in_flight[pool.submit(_run_one, item, include_log)] = sid
+            drain(block_until_one=False)
+
+        while in_flight:
+            drain(block_until_one=True)
+
+    out.flush()
+    return BatchReport(completed, errors, time.perf_counter() - start, histogram)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay a JSONL file of queries through the coordinator.")
+    parser.add_argument("input", help="Input JSONL file ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default stdout)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--max-in-flight", type=int, help="Read-ahead bound (default 2 x workers)")
+    parser.add_argument("--no-log", action="store_true", help="Don't write the A2A log per query")
+    args = parser.parse_args(argv)
+
+    fin = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        report = run_batch(
+            read_queries(fin), fout,
+            workers=args.workers, mode=args.mode,
+            max_in_flight=args.max_in_flight, include_log=not args.no_log,
+        )
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    print(report.format(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
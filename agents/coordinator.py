@@ -1,20 +1,30 @@
 # agents/coordinator.py
 
+import time
+from collections import Counter
+
 from agents.router_agent import RouterAgent
 from agents.customer_data_agent import CustomerDataAgent
 from agents.support_agent import SupportAgent
 from agents.mcp_client import MCPClient
-from agents.base_agent import A2AMessage
+from agents.base_agent import A2AMessage, DeadlineExceeded
+from agents.llm_metrics import METRICS, Conversation, LLMMetrics, conversation
+from agents.plans import PlanCompiler
+from agents.result_store import HANDLE_MIN_ROWS, ResultStore
+from agents.session_store import SessionStore
 
 
 class A2ACoordinator:
-    def __init__(self):
+    def __init__(self, session_store: SessionStore = None, use_plans: bool = True,
+                 timeout: float = None, rewrite: str = "auto", handle_min_rows: int = HANDLE_MIN_ROWS,
+                 llm_metrics: LLMMetrics = None):
         self.mcp = MCPClient()
+        self.sessions = session_store or SessionStore()
 
         # Initialize agents
-        self.router = RouterAgent()
+        self.router = RouterAgent(self.mcp)
         self.customer_data_agent = CustomerDataAgent(self.mcp)
-        self.support_agent = SupportAgent(self.mcp)
+        self.support_agent = SupportAgent(self.mcp, rewrite=rewrite)
 
         # Agent registry
         self.agents = {
@@ -23,17 +33,68 @@ class A2ACoordinator:
             "support": self.support_agent,
         }
 
-    def run(self, query: str):
-        """Runs a single end-to-end A2A workflow."""
+        # Scenario → direct agent pipeline (skips the forwarding router hops).
+        # Scenarios without a plan fall back to the router's routing.
+        self.plans = PlanCompiler(self.agents).compile() if use_plans else {}
+
+        # Per-step timings of the most recent run()
+        self.last_timings = []
+
+        # Default latency budget per run() in seconds (None = unbounded),
+        # and how often each agent was the one caught by the deadline
+        self.timeout = timeout
+        self.deadline_misses = Counter()
+
+        # Tool results longer than this go to the turn's ResultStore
+        self.handle_min_rows = handle_min_rows
+
+        # Where each turn's LLM calls are recorded (process-wide by default)
+        self.llm_metrics = llm_metrics or METRICS
+
+    def run(self, query: str, session_id: str = None, timeout: float = None):
+        """
+        Runs a single end-to-end A2A workflow.
+
+        With a session_id, the turn starts from the context resolved by
+        earlier turns of the same conversation (customer, history, intents).
+
+        `timeout` (default: self.timeout) is the latency budget in seconds.
+        It travels with every A2AMessage; LLM / MCP calls get the remaining
+        time as their timeout, and once it runs out a deterministic degraded
+        answer is returned instead.
+
+        Large tool results live in a per-turn ResultStore (state only holds
+        handles) that is released when the turn ends.
+
+        Every LLM call of the turn is recorded in self.llm_metrics, tagged
+        with its agent and the turn's scenario; the log ends with an [LLM]
+        summary of the turn.
+        """
+        results = ResultStore(self.handle_min_rows)
+        with conversation(self.llm_metrics) as llm_calls:
+            try:
+                return self._run(query, session_id, timeout, results, llm_calls)
+            finally:
+                results.clear()
+
+    def _run(self, query: str, session_id: str, timeout: float, results: ResultStore, llm_calls: Conversation):
         log = []
+        self.last_timings = []
+        session = self.sessions.get(session_id) if session_id is not None else None
+        budget = timeout if timeout is not None else self.timeout
+        deadline = time.monotonic() + budget if budget is not None else None
         message = A2AMessage(
             sender="user",
             receiver="router",
             role="user",
             content=query,
-            state={}
+            state=session.initial_state() if session else {},
+            deadline=deadline,
+            results=results,
         )
 
+        pipeline = None
+
         for step in range(15):
             log.append(
                 f"[STEP {step+1}] {message.sender} → {message.receiver} | content={message.content} | state={message.state}"
@@ -41,6 +102,19 @@ class A2ACoordinator:
 
             # Final answer returned to user
             if message.receiver == "user":
+                if llm_calls.calls:
+                    log.append(llm_calls.summary())
+                if len(results):
+                    log.append(f"[RESULTS] handles={len(results)} rows={results.rows_stored} (released at end of turn)")
+                if session:
+                    # Sessions outlive the turn's ResultStore: keep the rows themselves
+                    self.sessions.update(session, results.resolve(message.state), query)
+                    reused = [k for k in ("intent", "customer") if message.state.get(f"{k}_reused")]
+                    log.append(
+                        f"[SESSION] id={session_id} turn={session.turns} "
+                        f"reused={','.join(reused) or 'none'} "
+                        f"saved={message.state.get('saved_ms', 0.0):.1f}ms"
+                    )
                 return message.content, log
 
             receiver = message.receiver
@@ -50,43 +124,109 @@ class A2ACoordinator:
                 return f"ERROR: Unknown receiver '{receiver}'", log
 
             agent = self.agents[receiver]
-            message = agent.handle(message)
+
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                if message.expired():
+                    raise DeadlineExceeded(receiver)
+                reply = agent.handle(message)
+            except DeadlineExceeded:
+                self.deadline_misses[receiver] += 1
+                if llm_calls.calls:
+                    log.append(llm_calls.summary())
+                log.append(
+                    f"[DEADLINE] budget={budget * 1000:.0f}ms exhausted in agent={receiver} "
+                    f"at step={step+1}; returning degraded answer"
+                )
+                return self._degraded_answer(message.state), log
+            reply.deadline = deadline
+            reply.results = results
+            message = reply
+            llm_calls.scenario = message.state.get("scenario")
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+
+            self.last_timings.append(
+                {"step": step + 1, "agent": receiver, "wall_ms": wall_ms, "cpu_ms": cpu_ms}
+            )
+            log.append(
+                f"[TIMING] step={step+1} agent={receiver} wall={wall_ms:.1f}ms cpu={cpu_ms:.1f}ms"
+            )
+
+            # Inside a compiled plan: hand straight to the next stage
+            if pipeline is not None:
+                message.receiver = pipeline.pop(0) if pipeline else "user"
+
+            # After classification, switch to the scenario's compiled plan
+            elif step == 0 and receiver == "router" and message.receiver != "user":
+                plan = self.plans.get(message.state.get("scenario"))
+                if plan is not None:
+                    pipeline = plan.pipeline(message.state)
+                    message.receiver = pipeline.pop(0)
+                    log.append(
+                        f"[PLAN] scenario={plan.scenario} pipeline=router → "
+                        f"{' → '.join([message.receiver] + pipeline)} → user"
+                    )
 
         return "ERROR: Max steps exceeded", log
 
+    @staticmethod
+    def _degraded_answer(state) -> str:
+        """Deterministic fallback reply built from whatever was resolved in time."""
+        parts = ["Sorry, we could not complete your request in time."]
+        customer = state.get("customer")
+        if customer:
+            parts.append(
+                f"We found your account (Customer #{customer['id']}: {customer['name']}, "
+                f"status: {customer['status']})."
+            )
+        parts.append("A support agent will follow up with you shortly.")
+        return " ".join(parts)
 
-def run_demo():
-    """Runs all required assignment scenarios."""
+    def run_profiled(self, queries, mode="cprofile", output=None, top=20):
+        """
+        Runs a batch of queries under cProfile ("cprofile") or the stack
+        sampler ("sample"). Returns (results, ProfileReport).
+        """
+        from agents.profiling import profile_runs
 
-    coordinator = A2ACoordinator()
+        return profile_runs(self, queries, mode=mode, output=output, top=top)
+
+
+DEMO_SCENARIOS = [
+    # Scenario 1
+    "I need help with my account, customer ID 12345",
+
+    # Scenario 2
+    "I want to cancel my subscription but I'm having billing issues",
+
+    # Scenario 3
+    "What's the status of all high-priority tickets for premium customers?",
 
-    scenarios = [
-        # Scenario 1
-        "I need help with my account, customer ID 12345",
+    # Simple Query
+    "Get customer information for ID 5",
 
-        # Scenario 2
-        "I want to cancel my subscription but I'm having billing issues",
+    # Coordinated Query
+    "I'm customer 12345 and need help upgrading my account",
 
-        # Scenario 3
-        "What's the status of all high-priority tickets for premium customers?",
+    # Complex Query
+    "Show me all active customers who have open tickets",
 
-        # Simple Query
-        "Get customer information for ID 5",
+    # Escalation
+    "I've been charged twice, please refund immediately!",
 
-        # Coordinated Query
-        "I'm customer 12345 and need help upgrading my account",
+    # Multi-intent
+    "Update my email to new@email.com and show my ticket history",
+]
 
-        # Complex Query
-        "Show me all active customers who have open tickets",
 
-        # Escalation
-        "I've been charged twice, please refund immediately!",
+def run_demo():
+    """Runs all required assignment scenarios."""
 
-        # Multi-intent
-        "Update my email to new@email.com and show my ticket history",
-    ]
+    coordinator = A2ACoordinator()
 
-    for q in scenarios:
+    for q in DEMO_SCENARIOS:
         print("\n" + "=" * 80)
         print(f"QUERY: {q}")
         print("=" * 80)
@@ -100,5 +240,50 @@ def run_demo():
         print("\n" + "-" * 80)
 
 
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the A2A demo scenarios.")
+    parser.add_argument("--query", action="append", help="Query to run (repeatable). Defaults to the demo scenarios.")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], help="Wrap the runs in a profiler.")
+    parser.add_argument("--profile-out", help="pstats / collapsed-stack output file.")
+    parser.add_argument("--repeat", type=int, default=1, help="Run the query batch N times (profiling only).")
+    parser.add_argument("--top", type=int, default=20, help="Number of functions in the profile summary.")
+    parser.add_argument("--session", help="Run the --query list as one conversation with this session ID.")
+    parser.add_argument("--timeout", type=float, help="Latency budget per query in seconds.")
+    parser.add_argument("--rewrite", choices=["auto", "always", "never"], default="auto",
+                        help="When SupportAgent polishes replies with the LLM (auto: templates for factual scenarios).")
+    parser.add_argument("--llm-metrics", help="Write LLM call metrics (tokens, latency, cost) as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    if not args.profile:
+        if args.query:
+            coordinator = A2ACoordinator(timeout=args.timeout, rewrite=args.rewrite)
+            for q in args.query:
+                response, log = coordinator.run(q, session_id=args.session)
+                for line in log:
+                    print(line)
+                print("\nFINAL RESPONSE:", response)
+        else:
+            run_demo()
+    else:
+        coordinator = A2ACoordinator(timeout=args.timeout, rewrite=args.rewrite)
+        queries = (args.query or DEMO_SCENARIOS) * args.repeat
+        results, report = coordinator.run_profiled(
+            queries, mode=args.profile, output=args.profile_out, top=args.top
+        )
+        for q, (response, log) in zip(queries, results):
+            print(f"QUERY: {q}")
+            for line in log:
+                print(line)
+            print("FINAL RESPONSE:", response)
+            print("-" * 80)
+        print(report.format())
+
+    if args.llm_metrics:
+        METRICS.export_json(args.llm_metrics)
+        print(f"LLM metrics written to {args.llm_metrics}")
+
+
 if __name__ == "__main__":
-    run_demo()
+    main()
@@ -1,10 +1,16 @@
 # agents/customer_data_agent.py
+import sys
+import time
 from typing import Dict, Any, List
 
 from .base_agent import BaseAgent, A2AMessage
 from .mcp_client import MCPClient
 
 
+# Scenarios whose reply is built from the customer's ticket history
+HISTORY_SCENARIOS = ("open_tickets", "update_email_and_history")
+
+
 class CustomerDataAgent(BaseAgent):
     """
     Deterministic data-specialist agent for MCP-backed database access.
@@ -20,19 +26,29 @@ class CustomerDataAgent(BaseAgent):
     This agent *does not* use an LLM. It must be deterministic.
     """
 
-    def __init__(self, mcp_client: MCPClient):
+    def __init__(self, mcp_client: MCPClient, list_limit: int = 50):
         super().__init__(name="customer_data")
         self.mcp = mcp_client
+        self.list_limit = list_limit
+
+    @staticmethod
+    def _stash(message: A2AMessage, kind: str, rows):
+        """Large lists go to the conversation's ResultStore; state keeps a handle."""
+        if message.results is None:
+            return rows
+        return message.results.put(kind, rows)
 
     # ------------------------------------------------------
     # Main handler
     # ------------------------------------------------------
     def handle(self, message: A2AMessage) -> A2AMessage:
+        self.check_deadline(message)
         state = dict(message.state)
         scenario = state.get("scenario")
         content = message.content
 
-        print(f"[CustomerDataAgent] Received: scenario={scenario}, content={content}")
+        # Diagnostics go to stderr: stdout carries results (agents.batch JSONL)
+        print(f"[CustomerDataAgent] Received: scenario={scenario}, content={content}", file=sys.stderr)
 
         # ------------------------------------------------------
         # CASE 1 — Customer lookup
@@ -40,8 +56,25 @@ class CustomerDataAgent(BaseAgent):
         # ------------------------------------------------------
         if "customer_id" in state and state["customer_id"] is not None:
             cid = state["customer_id"]
-            customer = self.mcp.get_customer(cid)
-            state["customer"] = customer
+            cached = state.get("customer")
+            if cached and str(cached.get("id")) == str(cid):
+                # Resolved on an earlier turn of this session, or prefetched by
+                # the router (which already booked its own saving) → no refetch
+                state["customer_reused"] = True
+                if not state.get("customer_prefetched"):
+                    state["saved_ms"] = state.get("saved_ms", 0.0) + state.get("customer_fetch_ms", 0.0)
+            else:
+                start = time.perf_counter()
+                customer = self.mcp.get_customer(cid, **self.timeout_kwargs(message))
+                state["customer"] = customer
+                state["customer_fetch_ms"] = (time.perf_counter() - start) * 1000
+
+            # Ticket-centric scenarios also need the customer's history
+            if scenario in HISTORY_SCENARIOS and "customer_history" not in state:
+                state["customer_history"] = self._stash(
+                    message, "customer_history",
+                    self.mcp.get_customer_history(cid, **self.timeout_kwargs(message)),
+                )
 
             return A2AMessage(
                 sender=self.name,
@@ -56,8 +89,13 @@ class CustomerDataAgent(BaseAgent):
         # Used for query: "Show me all active customers who have open tickets"
         # ------------------------------------------------------
         if scenario == "active_customers_with_open_tickets":
-            customers = self.mcp.list_customers(status="active")
-            state["active_customers"] = customers
+            customers = self.mcp.list_customers(
+                status="active", limit=self.list_limit, **self.timeout_kwargs(message)
+            )
+            state["active_customers"] = self._stash(message, "active_customers", customers)
+            state["open_tickets"] = self._stash(message, "open_tickets", self.mcp.list_open_tickets_for_customers(
+                [c["id"] for c in customers], **self.timeout_kwargs(message)
+            ))
 
             return A2AMessage(
                 sender=self.name,
@@ -73,8 +111,15 @@ class CustomerDataAgent(BaseAgent):
         # ------------------------------------------------------
         if scenario == "high_priority_for_premium":
             # Your DB has no "premium" flag → we approximate with status="active"
-            customers = self.mcp.list_customers(status="active")
-            state["premium_customers"] = customers
+            customers = self.mcp.list_customers(
+                status="active", limit=self.list_limit, **self.timeout_kwargs(message)
+            )
+            state["premium_customers"] = self._stash(message, "premium_customers", customers)
+            state["high_priority_tickets"] = self._stash(
+                message, "high_priority_tickets", self.mcp.list_open_tickets_for_customers(
+                    [c["id"] for c in customers], priority="high", **self.timeout_kwargs(message)
+                ),
+            )
 
             return A2AMessage(
                 sender=self.name,
@@ -91,8 +136,8 @@ class CustomerDataAgent(BaseAgent):
         if scenario == "update_email_and_history":
             cid = state.get("customer_id")
             if cid:
-                history = self.mcp.get_customer_history(cid)
-                state["customer_history"] = history
+                history = self.mcp.get_customer_history(cid, **self.timeout_kwargs(message))
+                state["customer_history"] = self._stash(message, "customer_history", history)
             else:
                 state["customer_history"] = []
 
@@ -107,7 +152,7 @@ class CustomerDataAgent(BaseAgent):
         # ------------------------------------------------------
         # DEFAULT: No operation
         # ------------------------------------------------------
-        print("[CustomerDataAgent] Warning: no matching scenario. Returning noop.")
+        print("[CustomerDataAgent] Warning: no matching scenario. Returning noop.", file=sys.stderr)
         return A2AMessage(
             sender=self.name,
             receiver="router",
@@ -0,0 +1,271 @@
+# agents/llm_metrics.py
+"""
+Instrumentation of LLM calls: latency, token usage, retries, cache hits
+and estimated cost, tagged by agent and scenario.
+
+Agents call their LLM through BaseAgent.call_llm(), which wraps it in
+track(): the wall time and any exception are recorded there, and the
+backend (llm_utils.chat) fills in what the completion response reports
+(model, usage, retries) with report_usage(). Stub LLMs in tests and
+benchmarks are timed the same way, with zero tokens.
+
+    with llm_metrics.conversation(METRICS) as calls:   # A2ACoordinator.run()
+        ...                                            # every LLM call of the turn
+        calls.scenario = "simple_get"                  # known after classification
+    log.append(calls.summary())                        # [LLM] calls=2 tokens=... cost=$...
+
+Calls made inside a conversation are buffered and recorded into the sink
+when it ends, with the conversation's scenario filled in for calls made
+before the scenario was known (the router's classification). Calls
+outside a conversation go straight to the process-wide METRICS.
+
+LLMMetrics keeps counters and a latency histogram per (agent, scenario,
+model); snapshot() / export_json() dump them.
+"""
+
+import bisect
+import contextlib
+import json
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds of the latency histogram buckets (ms); the last bucket is open
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# USD per 1M tokens: (input, cached input, output). Unknown models cost 0.
+PRICES_PER_MTOK: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+}
+
+
+@dataclass
+class LLMCall:
+    agent: str
+    scenario: Optional[str] = None
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0        # prompt tokens served from the provider's prompt cache
+    latency_ms: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False       # answered without calling the LLM (e.g. session reuse)
+    error: Optional[str] = None
+
+    @property
+    def cost_usd(self) -> float:
+        prices = PRICES_PER_MTOK.get(self.model or "")
+        if prices is None:
+            return 0.0
+        fresh = self.prompt_tokens - self.cached_tokens
+        return (fresh * prices[0] + self.cached_tokens * prices[1] + self.completion_tokens * prices[2]) / 1e6
+
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return float(min(bound, self.max))
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "buckets": {
+                (f"le_{b}" if i < len(self.bounds) else f"gt_{self.bounds[-1]}"): n
+                for i, (b, n) in enumerate(zip(self.bounds + (None,), self.counts)) if n
+            },
+        }
+
+
+@dataclass
+class _Totals:
+    calls: int = 0
+    cache_hits: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+    latency_ms: Histogram = field(default_factory=Histogram)
+
+    def add(self, call: LLMCall):
+        self.calls += 1
+        self.cache_hits += call.cache_hit
+        self.errors += call.error is not None
+        self.retries += call.retries
+        self.prompt_tokens += call.prompt_tokens
+        self.completion_tokens += call.completion_tokens
+        self.cached_tokens += call.cached_tokens
+        self.cost_usd += call.cost_usd
+        if not call.cache_hit:
+            self.latency_ms.observe(call.latency_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {k: v for k, v in self.__dict__.items() if k != "latency_ms"}
+        out["latency_ms"] = self.latency_ms.to_dict()
+        return out
+
+
+class LLMMetrics:
+    """In-process counters and latency histograms per (agent, scenario, model)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], _Totals] = {}
+
+    def record(self, call: LLMCall):
+        key = (call.agent, call.scenario or "unknown", call.model or "unknown")
+        with self._lock:
+            totals = self._series.get(key)
+            if totals is None:
+                totals = self._series[key] = _Totals()
+            totals.add(call)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            series = [
+                {"agent": agent, "scenario": scenario, "model": model, **totals.to_dict()}
+                for (agent, scenario, model), totals in sorted(self._series.items())
+            ]
+            overall = _Totals()
+            for totals in self._series.values():
+                for name in ("calls", "cache_hits", "errors", "retries", "prompt_tokens",
+                             "completion_tokens", "cached_tokens", "cost_usd"):
+                    setattr(overall, name, getattr(overall, name) + getattr(totals, name))
+        out = overall.to_dict()
+        del out["latency_ms"]
+        return {"totals": out, "series": series}
+
+    def export_json(self, path: Optional[str] = None) -> str:
+        """Snapshot as JSON; also written to `path` if given."""
+        text = json.dumps(self.snapshot(), indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+# Process-wide default sink
+METRICS = LLMMetrics()
+
+
+class Conversation:
+    """LLM calls of one coordinator turn, recorded into `sink` when it ends."""
+
+    def __init__(self, sink: LLMMetrics):
+        self.sink = sink
+        self.scenario: Optional[str] = None
+        self.calls: List[LLMCall] = []
+
+    def close(self):
+        for call in self.calls:
+            if call.scenario is None:
+                call.scenario = self.scenario
+            self.sink.record(call)
+
+    def summary(self) -> str:
+        called = [c for c in self.calls if not c.cache_hit]
+        per_agent: Dict[str, List[LLMCall]] = {}
+        for c in called:
+            per_agent.setdefault(c.agent, []).append(c)
+        agents = " ".join(
+            f"{agent}={sum(c.latency_ms for c in calls):.1f}ms" for agent, calls in per_agent.items()
+        )
+        return (
+            f"[LLM] calls={len(called)} cache_hits={len(self.calls) - len(called)} "
+            f"retries={sum(c.retries for c in called)} errors={sum(c.error is not None for c in called)} "
+            f"tokens={sum(c.prompt_tokens for c in called)}+{sum(c.completion_tokens for c in called)} "
+            f"cost=${sum(c.cost_usd for c in called):.6f}" + (f" | {agents}" if agents else "")
+        )
+
+
+_current: ContextVar[Optional[LLMCall]] = ContextVar("llm_call", default=None)
+_conversation: ContextVar[Optional[Conversation]] = ContextVar("llm_conversation", default=None)
+
+
+def _record(call: LLMCall):
+    conv = _conversation.get()
+    if conv is not None:
+        conv.calls.append(call)
+    else:
+        METRICS.record(call)
+
+
+@contextlib.contextmanager
+def conversation(sink: Optional[LLMMetrics] = None) -> Iterator[Conversation]:
+    conv = Conversation(sink or METRICS)
+    token = _conversation.set(conv)
+    try:
+        yield conv
+    finally:
+        _conversation.reset(token)
+        conv.close()
+
+
+@contextlib.contextmanager
+def track(agent: str, scenario: Optional[str] = None) -> Iterator[LLMCall]:
+    """Time one LLM call; the backend reports usage into it with report_usage()."""
+    call = LLMCall(agent, scenario)
+    token = _current.set(call)
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException as e:
+        call.error = type(e).__name__
+        raise
+    finally:
+        call.latency_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+        _record(call)
+
+
+def report_usage(model: Optional[str], usage: Any = None, retries: int = 0):
+    """Attach a completion's model / usage / retry count to the call being tracked (if any)."""
+    call = _current.get()
+    if call is None:
+        return
+    call.model = model
+    call.retries = retries
+    if usage is not None:
+        call.prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        call.completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        call.cached_tokens = getattr(details, "cached_tokens", 0) or 0
+
+
+def record_cache_hit(agent: str, scenario: Optional[str] = None):
+    """An LLM answer reused instead of requested (no latency, no tokens)."""
+    _record(LLMCall(agent, scenario, cache_hit=True))
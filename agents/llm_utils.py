@@ -1,28 +1,72 @@
 # agents/llm_utils.py
 
-from openai import OpenAI
 import os
+import threading
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from . import llm_metrics
 
 DEFAULT_MODEL = "gpt-4o-mini"
 
+# The OpenAI client (and the openai package itself) is only loaded on the
+# first LLM call, so importing `agents` stays cheap for CLI / test runs.
+_client = None
+_client_lock = threading.Lock()
 
-def generate_text(
+
+def get_client():
+    """Shared OpenAI client, created on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def __getattr__(name):
+    # Backwards compatibility: `llm_utils.client` used to be a module global.
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def chat(
     system_prompt: str,
     user_prompt: str,
     model: str = DEFAULT_MODEL,
-    temperature: float = 0.2,
+    timeout: float = None,
+    **create_kwargs,
 ) -> str:
     """
-    Simple helper to call an LLM and return plain text.
+    One chat completion; returns the reply text. Model, token usage and
+    the SDK's retry count are reported to llm_metrics (for the call being
+    tracked, see BaseAgent.call_llm). Without a `timeout` the client's
+    default applies.
     """
-    completion = client.chat.completions.create(
+    if timeout is not None:
+        create_kwargs["timeout"] = timeout
+    raw = get_client().chat.completions.with_raw_response.create(
         model=model,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        temperature=temperature,
+        **create_kwargs,
     )
+    completion = raw.parse()
+    llm_metrics.report_usage(completion.model, completion.usage, getattr(raw, "retries_taken", 0))
     return completion.choices[0].message.content
+
+
+def generate_text(
+    system_prompt: str,
+    user_prompt: str,
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.2,
+) -> str:
+    """
+    Simple helper to call an LLM and return plain text.
+    """
+    return chat(system_prompt, user_prompt, model=model, temperature=temperature)
@@ -7,31 +7,381 @@ each method performs a remote call to your MCP server.
 
 The rest of the agent code only depends on this interface, so you can
 swap the implementation without touching agents.
+
+Every method takes an optional `timeout` (seconds, the request's remaining
+latency budget). With a timeout a read runs on a worker thread and
+DeadlineExceeded is raised if it does not finish in time; a call that has
+not started yet is cancelled. Writes (update_customer, create_ticket,
+update_ticket_status) are never abandoned half way: a running thread
+cannot be stopped, so an abandoned write would still commit after the
+caller gave up. They raise DeadlineExceeded without touching the database
+if the budget is already spent, and otherwise run inline to completion,
+possibly past the timeout, so the caller always learns their outcome.
+
+get_customer keeps recently read customers in a CustomerCache and
+revalidates them on every read (known_version / If-None-Match): the
+server answers "not modified" instead of resending an unchanged row.
+
+Read tools go through the process-wide single-flight group
+(single_flight.TOOL_FLIGHTS): identical calls that are in flight at the
+same time, from any client in the process, run once and share the result.
+A shared read runs on the worker threads without a deadline of its own;
+each caller waits for it with its own timeout.
+
+RemoteMCPClient is the same interface over HTTP against mcp_server.server,
+with JSON or the binary wire format (mcp_server.wire).
 """
 
-from typing import Any, Dict, List, Optional
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from mcp_server import tools
+from mcp_server.db import is_not_modified
+
+from .base_agent import DeadlineExceeded
+from .single_flight import TOOL_FLIGHTS, call_key
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="mcp-call")
+    return _executor
+
+
+def _call(fn, *args, timeout: Optional[float] = None, **kwargs):
+    if timeout is None:
+        return fn(*args, **kwargs)
+    if timeout <= 0:
+        raise DeadlineExceeded("mcp")
+
+    future = _get_executor().submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:  # concurrent.futures.TimeoutError is the builtin since 3.11
+        future.cancel()
+        raise DeadlineExceeded("mcp")
+
+
+class CustomerCache:
+    """
+    LRU of customer rows (plus the server's validator, e.g. an ETag) by id.
+    Entries are never served without revalidation, so there is no TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._rows: "OrderedDict[int, Tuple[Dict[str, Any], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.not_modified = 0   # revalidations answered without the row
+        self.fetched = 0        # full rows received
+
+    def get(self, customer_id: int) -> Tuple[Optional[Dict[str, Any]], Any]:
+        with self._lock:
+            entry = self._rows.get(customer_id)
+            if entry is None:
+                return None, None
+            self._rows.move_to_end(customer_id)
+            return entry
+
+    def put(self, row: Dict[str, Any], validator: Any = None):
+        with self._lock:
+            self._rows[row["id"]] = (row, validator)
+            self._rows.move_to_end(row["id"])
+            while len(self._rows) > self.max_entries:
+                self._rows.popitem(last=False)
+
+    def discard(self, customer_id: int):
+        with self._lock:
+            self._rows.pop(customer_id, None)
+
+    def __len__(self) -> int:
+        return len(self._rows)
 
 
 class MCPClient:
-    def get_customer(self, customer_id: int) -> Optional[Dict[str, Any]]:
-        return tools.get_customer(customer_id)
+    def __init__(self, customer_cache_size: int = 1024, single_flight: bool = True):
+        self.customers = CustomerCache(customer_cache_size) if customer_cache_size else None
+        self.flights = TOOL_FLIGHTS if single_flight else None
+
+    def _read(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """_call for read-only tools, collapsed with identical calls already in flight."""
+        if self.flights is None:
+            return _call(fn, *args, timeout=timeout, **kwargs)
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceeded("mcp")
+        key = call_key(fn, *args, **kwargs)
+        # With a deadline the call runs detached on the worker threads: no
+        # caller's deadline (the first one's included) ends it for the others
+        executor = _get_executor() if timeout is not None else None
+        try:
+            result, _ = self.flights.do(key, fn, *args, timeout=timeout, executor=executor, **kwargs)
+        except TimeoutError:   # gave up waiting
+            raise DeadlineExceeded("mcp")
+        return result
+
+    def _write(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Runs a tool that writes inline: the deadline is checked before it
+        starts, never while it runs. Later reads will not join reads
+        started before it.
+        """
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceeded("mcp")
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if self.flights is not None:
+                self.flights.forget_all()
+
+    def get_customer(self, customer_id: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        if self.customers is None:
+            return self._read(tools.get_customer, customer_id, timeout=timeout)
+        cached, _ = self.customers.get(customer_id)
+        known = cached.get("version") if cached else None
+        result = self._read(tools.get_customer, customer_id, known_version=known, timeout=timeout)
+        if is_not_modified(result):
+            self.customers.not_modified += 1
+            return dict(cached)
+        if result is None:
+            self.customers.discard(customer_id)
+            return None
+        self.customers.fetched += 1
+        self.customers.put(result)
+        return dict(result)
+
+    def list_customers(self, status: Optional[str] = None, limit: int = 50, timeout: Optional[float] = None):
+        return self._read(tools.list_customers, status=status, limit=limit, timeout=timeout)
 
-    def list_customers(self, status: Optional[str] = None, limit: int = 50):
-        return tools.list_customers(status=status, limit=limit)
+    def find_customer_by_email(self, email: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._read(tools.find_customer_by_email, email, timeout=timeout)
 
-    def update_customer(self, customer_id: int, data: Dict[str, Any]):
-        return tools.update_customer(customer_id, data)
+    def find_customer_by_phone(self, phone: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._read(tools.find_customer_by_phone, phone, timeout=timeout)
 
-    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium"):
-        return tools.create_ticket(customer_id=customer_id, issue=issue, priority=priority)
+    def update_customer(self, customer_id: int, data: Dict[str, Any], timeout: Optional[float] = None):
+        row = self._write(tools.update_customer, customer_id, data, timeout=timeout)
+        if self.customers is not None and row is not None:
+            self.customers.put(row)   # RETURNING row carries the new version
+        return row
 
-    def get_customer_history(self, customer_id: int):
-        return tools.get_customer_history(customer_id)
+    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium",
+                      timeout: Optional[float] = None):
+        return self._write(tools.create_ticket, customer_id=customer_id, issue=issue, priority=priority,
+                           timeout=timeout)
+
+    def get_customer_history(self, customer_id: int, hot_only: bool = False, timeout: Optional[float] = None):
+        return self._read(tools.get_customer_history, customer_id, hot_only=hot_only, timeout=timeout)
+
+    def get_customers(self, customer_ids: List[int], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self._read(tools.get_customers, customer_ids, timeout=timeout)
+
+    def get_customer_histories(self, customer_ids: List[int], per_customer_limit: Optional[int] = None,
+                               hot_only: bool = False,
+                               timeout: Optional[float] = None) -> Dict[int, List[Dict[str, Any]]]:
+        return self._read(tools.get_customer_histories, customer_ids, per_customer_limit=per_customer_limit,
+                          hot_only=hot_only, timeout=timeout)
 
     def list_open_tickets_for_customers(
-        self, customer_ids: List[int], priority: Optional[str] = None
+        self, customer_ids: List[int], priority: Optional[str] = None, timeout: Optional[float] = None
     ):
-        return tools.list_open_tickets_for_customers(customer_ids=customer_ids, priority=priority)
+        return self._read(tools.list_open_tickets_for_customers, customer_ids=customer_ids, priority=priority,
+                          timeout=timeout)
+
+    def update_ticket_status(self, ticket_id: int, status: str, customer_id: Optional[int] = None,
+                             timeout: Optional[float] = None):
+        return self._write(tools.update_ticket_status, ticket_id, status, customer_id=customer_id, timeout=timeout)
+
+    def get_triage_queue(self, limit: int = 10, priority: Optional[str] = None,
+                         customer_id: Optional[int] = None, timeout: Optional[float] = None):
+        return self._read(tools.get_triage_queue, limit=limit, priority=priority, customer_id=customer_id,
+                          timeout=timeout)
+
+    def get_backlog_stats(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self._read(tools.get_backlog_stats, timeout=timeout)
+
+    def get_customer_ticket_distribution(self, status: Optional[str] = None, top: int = 10,
+                                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self._read(tools.get_customer_ticket_distribution, status, top=top, timeout=timeout)
+
+    def get_changes(self, since_seq: int = 0, limit: int = 100, wait_seconds: float = 0.0,
+                    shard: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        if timeout is not None:
+            wait_seconds = min(wait_seconds, timeout)
+        return _call(tools.get_changes, since_seq, limit=limit, wait_seconds=wait_seconds, shard=shard,
+                     timeout=timeout)
+
+
+class RemoteToolError(RuntimeError):
+    """The MCP server returned a JSON-RPC error for a tool call."""
+
+
+class RemoteMCPClient:
+    """
+    MCPClient over HTTP (`POST /tools/call` on mcp_server.server), same
+    interface. `wire` picks the body format:
+
+    - "auto":    JSON requests, binary responses if the server can send
+                 them (Accept negotiation), JSON otherwise
+    - "msgpack": binary both ways (needs msgpack here and on the server)
+    - "json":    JSON only
+    """
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8000", wire: str = "auto",
+                 customer_cache_size: int = 1024):
+        import requests
+
+        from mcp_server import wire as wire_format
+
+        if wire not in ("auto", "msgpack", "json"):
+            raise ValueError(f"wire must be 'auto', 'msgpack' or 'json', got {wire!r}")
+        if wire == "msgpack" and not wire_format.binary_available():
+            raise ValueError("wire='msgpack' requires the msgpack package")
+        self.base_url = base_url.rstrip("/")
+        self.url = self.base_url + "/tools/call"
+        self._wire = wire_format
+        self._session = requests.Session()
+        self._ids = itertools.count(1)
+        binary = wire != "json" and wire_format.binary_available()
+        self._request_type = wire_format.BINARY if wire == "msgpack" else wire_format.JSON
+        self._headers = {
+            "Content-Type": self._request_type,
+            "Accept": f"{wire_format.BINARY}, {wire_format.JSON};q=0.5" if binary else wire_format.JSON,
+        }
+        self.customers = CustomerCache(customer_cache_size) if customer_cache_size else None
+
+    def call_tool(self, name: str, arguments: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        import requests
+
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceeded("mcp")
+        body = {
+            "jsonrpc": "2.0",
+            "id": str(next(self._ids)),
+            "method": "tools/call",
+            "params": {"name": name, "arguments": arguments},
+        }
+        try:
+            resp = self._session.post(
+                self.url, data=self._wire.encode(body, self._request_type),
+                headers=self._headers, timeout=timeout,
+            )
+        except requests.Timeout:
+            raise DeadlineExceeded("mcp")
+        resp.raise_for_status()
+        payload = self._wire.decode(resp.content, resp.headers.get("content-type"))
+        if payload.get("error"):
+            raise RemoteToolError(f"{name}: {payload['error'].get('message')}")
+        return payload["result"]["data"]
+
+    def close(self):
+        self._session.close()
+
+    def get_customer(self, customer_id: int, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """GET /customers/{id}, revalidating a cached copy with If-None-Match."""
+        import requests
+
+        if self.customers is None:
+            return self.call_tool("get_customer", {"customer_id": customer_id}, timeout)
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceeded("mcp")
+        cached, etag = self.customers.get(customer_id)
+        headers = {"Accept": self._headers["Accept"]}
+        if etag:
+            headers["If-None-Match"] = etag
+        try:
+            resp = self._session.get(f"{self.base_url}/customers/{customer_id}", headers=headers, timeout=timeout)
+        except requests.Timeout:
+            raise DeadlineExceeded("mcp")
+        if resp.status_code == 304 and cached is not None:
+            self.customers.not_modified += 1
+            return dict(cached)
+        if resp.status_code == 404:
+            self.customers.discard(customer_id)
+            return None
+        resp.raise_for_status()
+        row = self._wire.decode(resp.content, resp.headers.get("content-type"))
+        self.customers.fetched += 1
+        self.customers.put(row, resp.headers.get("etag"))
+        return dict(row)
+
+    def list_customers(self, status: Optional[str] = None, limit: int = 50, timeout: Optional[float] = None):
+        return self.call_tool("list_customers", {"status": status, "limit": limit}, timeout)
+
+    def find_customer_by_email(self, email: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.call_tool("find_customer_by_email", {"email": email}, timeout)
+
+    def find_customer_by_phone(self, phone: str, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.call_tool("find_customer_by_phone", {"phone": phone}, timeout)
+
+    def update_customer(self, customer_id: int, data: Dict[str, Any], timeout: Optional[float] = None):
+        row = self.call_tool("update_customer", {"customer_id": customer_id, "data": data}, timeout)
+        if self.customers is not None:
+            self.customers.discard(customer_id)
+        return row
+
+    def create_ticket(self, customer_id: int, issue: str, priority: str = "medium",
+                      timeout: Optional[float] = None):
+        return self.call_tool(
+            "create_ticket", {"customer_id": customer_id, "issue": issue, "priority": priority}, timeout
+        )
+
+    def get_customer_history(self, customer_id: int, hot_only: bool = False, timeout: Optional[float] = None):
+        return self.call_tool("get_customer_history", {"customer_id": customer_id, "hot_only": hot_only}, timeout)
+
+    def get_customers(self, customer_ids: List[int], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.call_tool("get_customers", {"customer_ids": list(customer_ids)}, timeout)
+
+    def get_customer_histories(self, customer_ids: List[int], per_customer_limit: Optional[int] = None,
+                               hot_only: bool = False,
+                               timeout: Optional[float] = None) -> Dict[int, List[Dict[str, Any]]]:
+        result = self.call_tool(
+            "get_customer_histories",
+            {"customer_ids": list(customer_ids), "per_customer_limit": per_customer_limit, "hot_only": hot_only},
+            timeout,
+        )
+        # JSON object keys are strings; the binary format keeps them as ints
+        return {int(cid): tickets for cid, tickets in result.items()}
+
+    def list_open_tickets_for_customers(
+        self, customer_ids: List[int], priority: Optional[str] = None, timeout: Optional[float] = None
+    ):
+        return self.call_tool(
+            "list_open_tickets_for_customers", {"customer_ids": list(customer_ids), "priority": priority}, timeout
+        )
+
+    def update_ticket_status(self, ticket_id: int, status: str, customer_id: Optional[int] = None,
+                             timeout: Optional[float] = None):
+        return self.call_tool(
+            "update_ticket_status", {"ticket_id": ticket_id, "status": status, "customer_id": customer_id}, timeout
+        )
+
+    def get_triage_queue(self, limit: int = 10, priority: Optional[str] = None,
+                         customer_id: Optional[int] = None, timeout: Optional[float] = None):
+        return self.call_tool(
+            "get_triage_queue", {"limit": limit, "priority": priority, "customer_id": customer_id}, timeout
+        )
+
+    def get_backlog_stats(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.call_tool("get_backlog_stats", {}, timeout)
+
+    def get_customer_ticket_distribution(self, status: Optional[str] = None, top: int = 10,
+                                         timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.call_tool("get_customer_ticket_distribution", {"status": status, "top": top}, timeout)
 
+    def get_changes(self, since_seq: int = 0, limit: int = 100, wait_seconds: float = 0.0,
+                    shard: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        if timeout is not None:
+            wait_seconds = min(wait_seconds, timeout)
+        return self.call_tool(
+            "get_changes",
+            {"since_seq": since_seq, "limit": limit, "wait_seconds": wait_seconds, "shard": shard}, timeout,
+        )
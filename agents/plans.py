@@ -0,0 +1,75 @@
+# agents/plans.py
+"""
+Compiled per-scenario execution plans.
+
+For every known scenario the message path is fixed:
+
+    router → customer_data → router → support → router → user
+
+The two middle router hops only forward state. A compiled plan is the
+list of specialist agents a scenario needs after classification, so the
+coordinator can call them back to back:
+
+    router → customer_data → support → user
+
+Unknown scenarios (or a failed classification) have no plan and keep
+using the router's dynamic routing.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+# Scenarios the data agent can serve without a customer_id (list queries)
+LIST_SCENARIOS = ("active_customers_with_open_tickets", "high_priority_for_premium")
+
+KNOWN_SCENARIOS = (
+    "simple_get",
+    "coordinated_upgrade",
+    "open_tickets",
+    "refund_escalation",
+    "update_email_and_history",
+) + LIST_SCENARIOS
+
+
+def needs_customer_data(state: Dict[str, Any]) -> bool:
+    """Whether CustomerDataAgent has to run before SupportAgent."""
+    return bool(state.get("customer_id")) or state.get("scenario") in LIST_SCENARIOS
+
+
+def _always(state: Dict[str, Any]) -> bool:
+    return True
+
+
+@dataclass(frozen=True)
+class Stage:
+    agent: str
+    when: Callable[[Dict[str, Any]], bool] = _always
+
+
+@dataclass(frozen=True)
+class Plan:
+    scenario: str
+    stages: Tuple[Stage, ...]
+
+    def pipeline(self, state: Dict[str, Any]) -> List[str]:
+        """Agents to call, in order, for this particular request."""
+        return [s.agent for s in self.stages if s.when(state)]
+
+
+# Stage templates: every known scenario is "data (if needed) then support"
+_DEFAULT_STAGES = (Stage("customer_data", needs_customer_data), Stage("support"))
+
+
+class PlanCompiler:
+    def __init__(self, agents: Dict[str, Any]):
+        self.agents = agents
+
+    def compile(self, scenarios=KNOWN_SCENARIOS) -> Dict[str, Plan]:
+        plans = {}
+        for scenario in scenarios:
+            stages = _DEFAULT_STAGES
+            missing = [s.agent for s in stages if s.agent not in self.agents]
+            if missing:
+                raise ValueError(f"Plan for {scenario!r} needs unknown agents: {missing}")
+            plans[scenario] = Plan(scenario, stages)
+        return plans
@@ -0,0 +1,214 @@
+# agents/pool.py
+"""
+Multi-process coordinator pool.
+
+Agent orchestration (prompt building, JSON parsing, state copies, logging)
+is Python-bound, so one A2ACoordinator uses one core. CoordinatorPool starts
+N worker processes, each with its own coordinator (agents, MCP client / DB
+connections, LLM client, SessionStore), and feeds them over queues:
+
+    with CoordinatorPool(workers=4) as pool:
+        fut = pool.submit("Get customer information for ID 5", session_id="s1")
+        print(fut.result()["answer"])
+
+- Session affinity: every turn of a session goes to the same worker
+  (crc32(session_id) % N) through that worker's own FIFO queue, so session
+  context is reused and turns run in order. Queries without a session go
+  to the worker with the fewest pending jobs.
+- Results come back on one shared queue; a collector thread resolves the
+  concurrent.futures.Future returned by submit(). Results are the same
+  dicts run_batch writes ({"answer", "log", "latency_ms", "error", ...}).
+- close() is graceful: workers finish everything already queued, then
+  exit. Workers ignore SIGINT so Ctrl-C in the parent shuts down through
+  close() instead of killing jobs mid-flight. A worker that dies fails its
+  pending futures instead of hanging them and gets no more work: its
+  sessions move to the remaining workers (their context starts over), and
+  once no worker is left submit() returns an already failed future.
+"""
+
+import itertools
+import queue
+import signal
+import threading
+import zlib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .batch import _default_factory, _init_worker, _run_one
+
+_STOP = None
+
+
+def _worker_main(index: int, factory: Callable[[], Any], include_log: bool, inbox, outbox):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_worker(factory)
+    outbox.put(("ready", index, None, None))
+    while True:
+        job = inbox.get()
+        if job is _STOP:
+            break
+        job_id, item = job
+        outbox.put(("result", index, job_id, _run_one(item, include_log)))
+    outbox.put(("exit", index, None, None))
+
+
+class CoordinatorPool:
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        coordinator_factory: Callable[[], Any] = _default_factory,
+        include_log: bool = True,
+        start_method: Optional[str] = None,
+    ):
+        import multiprocessing
+        import os
+
+        self.workers = workers or os.cpu_count() or 1
+        ctx = multiprocessing.get_context(start_method)
+        self._outbox = ctx.Queue()
+        self._inboxes = [ctx.Queue() for _ in range(self.workers)]
+        self._procs = [
+            ctx.Process(
+                target=_worker_main,
+                args=(i, coordinator_factory, include_log, self._inboxes[i], self._outbox),
+                name=f"coordinator-{i}",
+                daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for p in self._procs:
+            p.start()
+
+        self._job_ids = itertools.count()
+        self._futures: Dict[int, Tuple[int, Future]] = {}   # job id → (worker, future)
+        self._pending = [0] * self.workers
+        self.completed = [0] * self.workers
+        self.alive = [True] * self.workers
+        self._lock = threading.Lock()
+        self._closed = False
+        self._started = 0
+        self.ready = threading.Event()   # set once every worker built its coordinator
+        self._collector = threading.Thread(target=self._collect, name="pool-collector", daemon=True)
+        self._collector.start()
+
+    # ------------------------------------------------------
+    # Submitting
+    # ------------------------------------------------------
+    def worker_for(self, session_id: Optional[str]) -> Optional[int]:
+        """Worker that runs the next job of `session_id` (None: no worker alive)."""
+        with self._lock:
+            return self._worker_for(session_id)
+
+    def _worker_for(self, session_id: Optional[str]) -> Optional[int]:
+        # Caller holds the lock
+        alive = [i for i in range(self.workers) if self.alive[i]]
+        if not alive:
+            return None
+        if session_id is not None:
+            h = zlib.crc32(str(session_id).encode("utf-8"))
+            home = h % self.workers
+            # Sessions of a dead worker are spread over the others
+            return home if self.alive[home] else alive[h % len(alive)]
+        return min(alive, key=self._pending.__getitem__)
+
+    def submit(self, query: str, session_id: Optional[str] = None, item_id: Any = None) -> Future:
+        """Queue one query; the future resolves to the run_batch-style result dict."""
+        if self._closed:
+            raise RuntimeError("CoordinatorPool is closed")
+        fut: Future = Future()
+        with self._lock:
+            # Same lock as _reap_dead: a job is never queued to a worker already reaped
+            worker = self._worker_for(session_id)
+            if worker is not None:
+                job_id = next(self._job_ids)
+                self._futures[job_id] = (worker, fut)
+                self._pending[worker] += 1
+        if worker is None:
+            fut.set_exception(RuntimeError("no coordinator worker is alive"))
+            return fut
+        item = {"id": item_id, "query": query, "session_id": session_id}
+        self._inboxes[worker].put((job_id, item))
+        return fut
+
+    def run(self, query: str, session_id: Optional[str] = None) -> Tuple[str, List[str]]:
+        """Blocking A2ACoordinator.run() equivalent."""
+        result = self.submit(query, session_id).result()
+        if result["error"]:
+            raise RuntimeError(result["error"])
+        return result["answer"], result["log"]
+
+    # ------------------------------------------------------
+    # Collecting
+    # ------------------------------------------------------
+    def _collect(self):
+        exited = set()
+        while len(exited) < self.workers:
+            try:
+                kind, worker, job_id, result = self._outbox.get(timeout=0.5)
+            except queue.Empty:
+                self._reap_dead(exited)
+                continue
+            if kind == "result":
+                with self._lock:
+                    entry = self._futures.pop(job_id, None)
+                    if entry is None:  # already failed by _reap_dead
+                        continue
+                    self._pending[worker] -= 1
+                    self.completed[worker] += 1
+                entry[1].set_result(result)
+            elif kind == "ready":
+                self._started += 1
+                if self._started == self.workers:
+                    self.ready.set()
+            elif kind == "exit":
+                exited.add(worker)
+
+    def _reap_dead(self, exited: set):
+        # A clean exit always announces itself with an "exit" message
+        for i, p in enumerate(self._procs):
+            if i not in exited and not p.is_alive() and p.exitcode != 0:
+                exited.add(i)
+                self._fail_pending(i, f"coordinator worker {i} exited with code {p.exitcode}", dead=True)
+
+    def _fail_pending(self, worker: int, reason: str, dead: bool = False):
+        with self._lock:
+            if dead:
+                self.alive[worker] = False
+            lost = [jid for jid, (w, _) in self._futures.items() if w == worker]
+            futs = [self._futures.pop(jid)[1] for jid in lost]
+            self._pending[worker] = 0
+        for fut in futs:
+            fut.set_exception(RuntimeError(reason))
+
+    # ------------------------------------------------------
+    # Shutdown
+    # ------------------------------------------------------
+    def close(self, timeout: Optional[float] = None):
+        """
+        Stop accepting work, let workers drain their queues and exit.
+        Workers still running after `timeout` seconds are terminated and
+        their pending futures fail.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for inbox in self._inboxes:
+            inbox.put(_STOP)
+        for p in self._procs:
+            p.join(timeout)
+        for p in self._procs:
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        self._collector.join()
+        for i in range(self.workers):
+            self._fail_pending(i, "CoordinatorPool closed before the job ran")
+        for q in [self._outbox, *self._inboxes]:
+            q.close()
+            q.join_thread()
+
+    def __enter__(self) -> "CoordinatorPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,118 @@
+# agents/prefetch.py
+"""
+Speculative customer prefetch.
+
+Most queries name the customer in plain text ("customer ID 12345"), so
+the router can start get_customer + get_customer_history for those IDs
+while the LLM classification is still running. If the classified
+customer_id matches a prefetched ID the result is used; otherwise it is
+discarded.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# "customer 12345", "customer ID 12345", "ID: 5", "#42"
+CUSTOMER_ID_RE = re.compile(r"(?:\bcustomer\s*(?:id)?|\bid|#)\s*[:#]?\s*(\d{1,9})\b", re.IGNORECASE)
+
+
+def candidate_customer_ids(text: str, limit: int = 2) -> List[int]:
+    ids = []
+    for m in CUSTOMER_ID_RE.finditer(text):
+        cid = int(m.group(1))
+        if cid not in ids:
+            ids.append(cid)
+        if len(ids) == limit:
+            break
+    return ids
+
+
+@dataclass
+class PrefetchStats:
+    requests: int = 0      # queries where at least one prefetch was started
+    hits: int = 0          # classified customer_id was prefetched
+    misses: int = 0        # prefetched, but classification picked another / no ID
+    discarded: int = 0     # individual prefetches thrown away
+    saved_ms: float = 0.0  # fetch time hidden behind classification
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+
+@dataclass
+class PrefetchResult:
+    customer: Optional[Dict[str, Any]]
+    history: List[Dict[str, Any]]
+    fetch_ms: float
+
+
+class CustomerPrefetcher:
+    def __init__(self, mcp_client, max_workers: int = 4, max_candidates: int = 2):
+        self.mcp = mcp_client
+        self.max_workers = max_workers
+        self.max_candidates = max_candidates
+        self.stats = PrefetchStats()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="prefetch")
+            return self._executor
+
+    def _fetch(self, cid: int) -> PrefetchResult:
+        start = time.perf_counter()
+        customer = self.mcp.get_customer(cid)
+        history = self.mcp.get_customer_history(cid) if customer else []
+        return PrefetchResult(customer, history, (time.perf_counter() - start) * 1000)
+
+    def start(self, text: str, skip: Optional[int] = None) -> Dict[int, Any]:
+        """Start fetches for IDs seen in `text`; returns {customer_id: Future}."""
+        ids = [c for c in candidate_customer_ids(text, self.max_candidates) if c != skip]
+        if not ids:
+            return {}
+        pool = self._pool()
+        return {cid: pool.submit(self._fetch, cid) for cid in ids}
+
+    def claim(self, futures: Dict[int, Any], customer_id, timeout: Optional[float] = None) -> Optional[PrefetchResult]:
+        """
+        Take the prefetch for the classified customer_id (waiting up to
+        `timeout` seconds if it is still running) and discard the rest.
+        """
+        if not futures:
+            return None
+        try:
+            cid = int(customer_id) if customer_id is not None else None
+        except (TypeError, ValueError):
+            cid = None
+
+        result = None
+        waited_ms = 0.0
+        for fid, fut in futures.items():
+            if fid == cid:
+                wait_start = time.perf_counter()
+                try:
+                    result = fut.result(timeout=max(timeout, 0.0) if timeout is not None else None)
+                except Exception:  # failed or out of budget: the data agent refetches
+                    fut.cancel()
+                    result = None
+                waited_ms = (time.perf_counter() - wait_start) * 1000
+            else:
+                fut.cancel()
+
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.discarded += len(futures) - (result is not None)
+            if result is not None:
+                self.stats.hits += 1
+                self.stats.saved_ms += max(0.0, result.fetch_ms - waited_ms)
+            else:
+                self.stats.misses += 1
+        return result
@@ -0,0 +1,196 @@
+# agents/profiling.py
+"""
+Profiling mode for coordinator runs.
+
+Two profilers are supported:
+
+- "cprofile": deterministic cProfile, written as a .pstats file
+  (open with `python -m pstats` or snakeviz).
+- "sample":   a stack-sampling thread, written as collapsed stacks
+  ("frame;frame;frame <count>" per line), ready for flamegraph.pl
+  or speedscope.
+
+The per-agent summary comes from the coordinator's own step timings
+(wall + CPU per agent.handle call), so LLM and DB time is attributed
+to the agent that triggered it.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+PROFILE_MODES = ("cprofile", "sample")
+
+
+# ------------------------------------------------------
+# Sampling profiler
+# ------------------------------------------------------
+class StackSampler:
+    """
+    Samples the Python stacks of all other threads every `interval` seconds.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def write_collapsed(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, n: int) -> List[Tuple[str, float]]:
+        """Self time per leaf function, in ms."""
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        return [(name, count * self.interval * 1000) for name, count in leaf.most_common(n)]
+
+
+def _frame_label(code) -> str:
+    return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+
+# ------------------------------------------------------
+# Report
+# ------------------------------------------------------
+@dataclass
+class ProfileReport:
+    mode: str
+    output_path: Optional[Path]
+    runs: int
+    total_wall_ms: float
+    agents: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    functions: List[Tuple[str, float]] = field(default_factory=list)
+
+    def format(self) -> str:
+        lines = [
+            f"PROFILE mode={self.mode} runs={self.runs} "
+            f"total_wall={self.total_wall_ms:.1f}ms output={self.output_path}",
+            "",
+            f"{'agent':<16}{'calls':>8}{'wall_ms':>12}{'cpu_ms':>12}",
+        ]
+        for name, t in sorted(self.agents.items(), key=lambda kv: -kv[1]["wall_ms"]):
+            lines.append(f"{name:<16}{int(t['calls']):>8}{t['wall_ms']:>12.1f}{t['cpu_ms']:>12.1f}")
+
+        lines.append("")
+        lines.append(f"{'self_ms':>10}  function")
+        for name, ms in self.functions:
+            lines.append(f"{ms:>10.1f}  {name}")
+        return "\n".join(lines)
+
+
+def summarize_timings(timings: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """Aggregate coordinator step timings by agent."""
+    agents: Dict[str, Dict[str, float]] = defaultdict(lambda: {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0})
+    for t in timings:
+        a = agents[t["agent"]]
+        a["calls"] += 1
+        a["wall_ms"] += t["wall_ms"]
+        a["cpu_ms"] += t["cpu_ms"]
+    return dict(agents)
+
+
+def _pstats_top(profiler: cProfile.Profile, n: int) -> List[Tuple[str, float]]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, func), (_cc, _nc, tottime, _ct, _callers) in stats.stats.items():
+        rows.append((f"{Path(filename).stem}:{lineno}({func})", tottime * 1000))
+    rows.sort(key=lambda r: -r[1])
+    return rows[:n]
+
+
+# ------------------------------------------------------
+# Entry point
+# ------------------------------------------------------
+def profile_runs(
+    coordinator,
+    queries: Sequence[str],
+    mode: str = "cprofile",
+    output: Optional[str] = None,
+    top: int = 20,
+    interval: float = 0.005,
+):
+    """
+    Run `queries` through `coordinator` under a profiler.
+
+    Returns (results, report) where results is a list of (answer, log).
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode!r} (expected one of {PROFILE_MODES})")
+
+    if output is None:
+        output = "coordinator.pstats" if mode == "cprofile" else "coordinator.collapsed"
+    output_path = Path(output)
+
+    results = []
+    timings: List[Dict[str, Any]] = []
+
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    sampler = StackSampler(interval) if mode == "sample" else None
+
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    else:
+        sampler.start()
+    try:
+        for q in queries:
+            results.append(coordinator.run(q))
+            timings.extend(coordinator.last_timings)
+    finally:
+        if profiler:
+            profiler.disable()
+        else:
+            sampler.stop()
+    total_wall_ms = (time.perf_counter() - start) * 1000
+
+    if profiler:
+        profiler.dump_stats(output_path)
+        functions = _pstats_top(profiler, top)
+    else:
+        sampler.write_collapsed(output_path)
+        functions = sampler.top_functions(top)
+
+    report = ProfileReport(
+        mode=mode,
+        output_path=output_path,
+        runs=len(queries),
+        total_wall_ms=total_wall_ms,
+        agents=summarize_timings(timings),
+        functions=functions,
+    )
+    return results, report
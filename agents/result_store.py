@@ -0,0 +1,77 @@
+# agents/result_store.py
+"""
+Per-conversation store for large tool results.
+
+CustomerDataAgent used to put whole result lists (active_customers,
+open_tickets, customer_history, ...) into A2AMessage.state, so every hop
+carried them and every [STEP] log line printed them in full. Instead, a
+list longer than `min_rows` goes into the conversation's ResultStore and
+the state holds a small ResultHandle:
+
+    state["active_customers"] = message.results.put("active_customers", customers)
+    # log: state={..., 'active_customers': <active_customers#1: 1000 rows>}
+
+Consumers resolve handles when they actually need the rows:
+
+    view = message.results.resolve(state)      # shallow copy, handles → lists
+
+A2ACoordinator.run() creates one store per conversation turn, attaches it
+to every message (A2AMessage.results, like the deadline) and clears it when
+the turn ends, so payloads are released as soon as the answer is built.
+Handles are process-local; A2AMessage.to_wire() resolves them first.
+"""
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+# Lists up to this many rows stay inline in state
+HANDLE_MIN_ROWS = 20
+
+
+@dataclass(frozen=True)
+class ResultHandle:
+    id: int
+    kind: str
+    rows: int
+
+    def __repr__(self) -> str:
+        return f"<{self.kind}#{self.id}: {self.rows} rows>"
+
+
+class ResultStore:
+    def __init__(self, min_rows: int = HANDLE_MIN_ROWS):
+        self.min_rows = min_rows
+        self._payloads: Dict[int, List[Any]] = {}
+        self._ids = itertools.count(1)
+        self.rows_stored = 0
+
+    def put(self, kind: str, payload: List[Any]):
+        """Store `payload` and return its handle (or the payload itself if it is small)."""
+        if len(payload) <= self.min_rows:
+            return payload
+        handle = ResultHandle(next(self._ids), kind, len(payload))
+        self._payloads[handle.id] = payload
+        self.rows_stored += len(payload)
+        return handle
+
+    def get(self, value: Any) -> Any:
+        """Payload behind a handle; any other value is returned unchanged."""
+        if not isinstance(value, ResultHandle):
+            return value
+        try:
+            return self._payloads[value.id]
+        except KeyError:
+            raise KeyError(f"{value!r} was released with its conversation") from None
+
+    def resolve(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Shallow copy of `state` with every handle replaced by its payload (`state` itself if it has none)."""
+        if not any(isinstance(v, ResultHandle) for v in state.values()):
+            return state
+        return {k: self.get(v) for k, v in state.items()}
+
+    def clear(self):
+        self._payloads.clear()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
@@ -0,0 +1,144 @@
+# agents/session_store.py
+"""
+Bounded store of conversation sessions.
+
+A session remembers what earlier turns already resolved (customer record,
+ticket history, intent classifications) so follow-up questions can skip
+the LLM classification and the MCP fetches.
+
+Eviction:
+- LRU on session count (max_sessions)
+- TTL since last access (ttl seconds)
+- memory budget (max_bytes, estimated from the JSON size of each session)
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# State keys carried from one turn of a conversation to the next
+SESSION_KEYS = ("customer_id", "customer", "customer_history", "customer_fetch_ms")
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+@dataclass
+class Session:
+    session_id: str
+    context: Dict[str, Any] = field(default_factory=dict)
+    previous_intents: List[Dict[str, Any]] = field(default_factory=list)
+    turns: int = 0
+    saved_ms: float = 0.0
+    last_access: float = field(default_factory=time.monotonic)
+    size_bytes: int = 0
+
+    def initial_state(self) -> Dict[str, Any]:
+        """State to seed the next turn with."""
+        state = {"session_id": self.session_id, **self.context}
+        if self.previous_intents:
+            state["previous_intents"] = list(self.previous_intents)
+        return state
+
+
+class SessionStore:
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        ttl: float = 1800.0,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_intents: int = 5,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_intents = max_intents
+
+        self.total_bytes = 0
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Session:
+        """Return the live session for session_id, creating it if needed."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_access = now
+            return session
+
+    def update(self, session: Session, state: Dict[str, Any], query: str):
+        """Record the outcome of a finished turn."""
+        with self._lock:
+            session.turns += 1
+            session.saved_ms += state.get("saved_ms", 0.0)
+            session.context = {k: state[k] for k in SESSION_KEYS if state.get(k) is not None}
+
+            if not state.get("intent_reused"):
+                session.previous_intents.append({
+                    "query": normalize_query(query),
+                    "intents": state.get("intents"),
+                    "scenario": state.get("scenario"),
+                    "customer_id": state.get("customer_id"),
+                    "classify_ms": state.get("classify_ms", 0.0),
+                })
+                del session.previous_intents[:-self.max_intents]
+
+            size = len(json.dumps([session.context, session.previous_intents], default=str))
+            if self._sessions.get(session.session_id) is not session:
+                # Evicted while the turn ran: its bytes were released then
+                session.size_bytes = size
+                return
+            self.total_bytes += size - session.size_bytes
+            session.size_bytes = size
+
+            self._sessions.move_to_end(session.session_id)
+            self._enforce_budget()
+
+    def drop(self, session_id: str):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self.total_bytes -= session.size_bytes
+
+    # ------------------------------------------------------
+    # Eviction (caller holds the lock)
+    # ------------------------------------------------------
+    def _expire(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_access <= self.ttl:
+                break
+            self._evict_oldest()
+
+    def _enforce_budget(self):
+        while len(self._sessions) > self.max_sessions or (
+            self.total_bytes > self.max_bytes and len(self._sessions) > 1
+        ):
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        _, session = self._sessions.popitem(last=False)
+        self.total_bytes -= session.size_bytes
+        self.evictions += 1
+
+
+def find_previous_intent(state: Dict[str, Any], query: str) -> Optional[Dict[str, Any]]:
+    """Classification of an identical earlier query in this session, if any."""
+    key = normalize_query(query)
+    for entry in reversed(state.get("previous_intents") or []):
+        if entry["query"] == key:
+            return entry
+    return None
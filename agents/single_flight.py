@@ -0,0 +1,189 @@
+# agents/single_flight.py
+"""
+Single-flight execution of identical concurrent calls.
+
+During a burst, many conversations ask for the same customer at the same
+moment (get_customer / get_customer_history), and identical queries send
+the same classification prompt to the LLM. With a SingleFlight group the
+first caller for a key runs the call; callers arriving while it is in
+flight wait for it and share its result (or exception) instead of running
+their own:
+
+    value, shared = TOOL_FLIGHTS.do(key, tools.get_customer, 5)
+
+Nothing is cached: once the call returns the key is free again, so a
+later caller sees fresh data.
+
+Every caller waits with its own timeout. With an `executor` the call runs
+there, detached from all callers, so the first caller's deadline does not
+cut it short for the others (MCPClient reads). Without one the first
+caller runs it inline, bounded by whatever budget it passes to the call;
+`rerun_on` names the exceptions meaning "that caller ran out of time",
+after which a waiter runs the call again with its remaining budget
+(BaseAgent.call_llm). Only reads should go through a group, and
+writers call forget_all() after committing: a read issued after a write
+must not join a flight that started before it.
+
+Keys are built by call_key() from the normalized call arguments:
+positional / keyword spelling and defaults are bound through the
+function's signature, digit strings passed for `int` parameters become
+ints and lists become tuples, so get_customer(5) and
+get_customer(customer_id="5") collapse. Arguments of other types are kept
+as given: find_customer_by_phone("05550107") and ("5550107") run
+different queries.
+
+Two process-wide groups are used: TOOL_FLIGHTS (MCPClient reads, shared by
+every client in the process, e.g. the per-thread coordinators of
+agents.batch) and LLM_FLIGHTS (BaseAgent.call_llm). `collapsed` counts the
+calls that were served by another caller's execution.
+"""
+
+import inspect
+import threading
+import time
+import typing
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Type
+
+_ANY = inspect.Parameter.empty
+
+
+def _accepts_int(annotation: Any) -> bool:
+    """int, or Optional[int]; not unions that also take a str."""
+    if annotation is int:
+        return True
+    if typing.get_origin(annotation) is typing.Union:
+        args = typing.get_args(annotation)
+        return int in args and str not in args
+    return False
+
+
+def _item_annotation(annotation: Any) -> Any:
+    if typing.get_origin(annotation) in (list, tuple):
+        args = typing.get_args(annotation)
+        if args and args[-1] is not Ellipsis:
+            return args[0]
+    return _ANY
+
+
+def _normalize(value: Any, annotation: Any = _ANY) -> Hashable:
+    if isinstance(value, str):
+        return int(value) if value.isdigit() and _accepts_int(annotation) else value
+    if isinstance(value, (list, tuple)):
+        item = _item_annotation(annotation)
+        return tuple(_normalize(v, item) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+_signatures: Dict[Callable, Optional[inspect.Signature]] = {}
+
+
+def call_key(fn: Callable, *args, **kwargs) -> Hashable:
+    """Key identifying fn(*args, **kwargs) regardless of how the arguments are spelled."""
+    try:
+        sig = _signatures[fn]
+    except KeyError:
+        try:
+            sig = inspect.signature(fn)
+        except (TypeError, ValueError):
+            sig = None
+        _signatures[fn] = sig
+    if sig is not None:
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return fn, tuple(
+            (name, _normalize(value, sig.parameters[name].annotation))
+            for name, value in bound.arguments.items()
+        )
+    return fn, _normalize(args), _normalize(kwargs)
+
+
+def _share(result: Any) -> Any:
+    """Own top-level container for each waiter (rows inside are shared)."""
+    if isinstance(result, list):
+        return list(result)
+    if isinstance(result, dict):
+        return dict(result)
+    return result
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, Future] = {}
+        self.executed = 0    # calls actually run
+        self.collapsed = 0   # calls that waited for another caller's run
+
+    def do(self, key: Hashable, fn: Callable, *args, timeout: Optional[float] = None,
+           executor: Optional[Executor] = None, rerun_on: Tuple[Type[BaseException], ...] = (),
+           **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) unless a call with the same key is in
+        flight; returns (result, shared). A waiter gives up after `timeout`
+        seconds with TimeoutError (the running call is not affected); so
+        does the caller that started the call when it runs on `executor`.
+        A waiter that gets one of `rerun_on` from another caller's run
+        starts over with what is left of its timeout.
+        """
+        started = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Future()
+                self.executed += 1
+                leader = True
+            else:
+                self.collapsed += 1
+                leader = False
+
+        if not leader:
+            try:
+                return _share(flight.result(timeout=timeout)), True
+            except rerun_on:
+                if timeout is not None:
+                    timeout -= time.monotonic() - started
+                    if timeout <= 0:
+                        raise TimeoutError from None
+                return self.do(key, fn, *args, timeout=timeout, executor=executor, rerun_on=rerun_on, **kwargs)
+
+        if executor is not None:
+            try:
+                executor.submit(self._run, key, flight, fn, args, kwargs)
+            except BaseException as e:
+                self._land(key, flight)
+                flight.set_exception(e)
+                raise
+            return flight.result(timeout=timeout), False
+        return self._run(key, flight, fn, args, kwargs), False
+
+    def _run(self, key: Hashable, flight: Future, fn: Callable, args, kwargs) -> Any:
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._land(key, flight)
+            flight.set_exception(e)
+            raise
+        self._land(key, flight)
+        flight.set_result(result)
+        return result
+
+    def _land(self, key: Hashable, flight: Future):
+        # Before the result is published: later callers start a new flight
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def forget_all(self):
+        """Calls started from now on do not join flights already in the air."""
+        with self._lock:
+            self._flights.clear()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+TOOL_FLIGHTS = SingleFlight()
+LLM_FLIGHTS = SingleFlight()
@@ -0,0 +1,133 @@
+# agents/templates.py
+"""
+Precompiled reply templates for deterministic scenarios.
+
+Purely factual answers ("Get customer information for ID 5") are fully
+determined by the data already in state, so SupportAgent renders them
+locally instead of paying for an LLM rewrite. Empathetic / escalation
+scenarios have no template and always go through the LLM.
+
+render(scenario, state) returns the reply text, or None when the scenario
+has no template or the state lacks what the template needs.
+"""
+
+from string import Template
+from typing import Any, Callable, Dict, List, Optional
+
+# ------------------------------------------------------
+# Line templates (shared with SupportAgent's formatters)
+# ------------------------------------------------------
+CUSTOMER_SUMMARY = Template("Customer #$id: $name (status: $status, email: $email)")
+TICKET_LINE = Template("Ticket #$id | status=$status | priority=$priority | issue=$issue")
+CUSTOMER_TICKETS_LINE = Template("- Customer #$id: $name ($count open ticket$plural)")
+
+# ------------------------------------------------------
+# Scenario templates
+# ------------------------------------------------------
+SIMPLE_GET = Template("$summary\n$tickets")
+CUSTOMER_NOT_FOUND = Template("No customer found with ID $customer_id.")
+OPEN_TICKETS = Template("Open tickets for $name (Customer #$id):\n$tickets")
+NO_OPEN_TICKETS = Template("$name (Customer #$id) has no open tickets.")
+HISTORY = Template("Ticket history for $name (Customer #$id):\n$tickets")
+ACTIVE_WITH_OPEN = Template("Active customers with open tickets ($count):\n$customers")
+HIGH_PRIORITY = Template("High-priority open tickets for premium customers ($count):\n$tickets")
+
+NO_TICKETS = "No tickets on record."
+
+
+def customer_summary(customer: Dict[str, Any]) -> str:
+    return CUSTOMER_SUMMARY.substitute(
+        id=customer["id"], name=customer["name"],
+        status=customer["status"], email=customer.get("email"),
+    )
+
+
+def ticket_line(t: Dict[str, Any]) -> str:
+    return TICKET_LINE.substitute(
+        id=t["id"], status=t["status"], priority=t["priority"], issue=t["issue"],
+    )
+
+
+def _ticket_block(tickets: List[Dict[str, Any]], limit: int = 10) -> str:
+    if not tickets:
+        return NO_TICKETS
+    lines = [ticket_line(t) for t in tickets[:limit]]
+    if len(tickets) > limit:
+        lines.append(f"... and {len(tickets) - limit} more")
+    return "\n".join(lines)
+
+
+# ------------------------------------------------------
+# Renderers
+# ------------------------------------------------------
+def _render_simple_get(state: Dict[str, Any]) -> Optional[str]:
+    customer = state.get("customer")
+    if not customer:
+        if state.get("customer_id") is None:
+            return None
+        return CUSTOMER_NOT_FOUND.substitute(customer_id=state["customer_id"])
+    history = state.get("customer_history") or []
+    tickets = f"Recent tickets:\n{_ticket_block(history, 5)}" if history else ""
+    return SIMPLE_GET.substitute(summary=customer_summary(customer), tickets=tickets).rstrip()
+
+
+def _render_open_tickets(state: Dict[str, Any]) -> Optional[str]:
+    customer = state.get("customer")
+    if not customer or "customer_history" not in state:
+        return None
+    open_tickets = [t for t in state["customer_history"] if t["status"] != "resolved"]
+    if not open_tickets:
+        return NO_OPEN_TICKETS.substitute(name=customer["name"], id=customer["id"])
+    return OPEN_TICKETS.substitute(
+        name=customer["name"], id=customer["id"], tickets=_ticket_block(open_tickets)
+    )
+
+
+def _render_history(state: Dict[str, Any]) -> Optional[str]:
+    customer = state.get("customer")
+    if not customer or "customer_history" not in state:
+        return None
+    return HISTORY.substitute(
+        name=customer["name"], id=customer["id"], tickets=_ticket_block(state["customer_history"])
+    )
+
+
+def _render_active_with_open(state: Dict[str, Any]) -> Optional[str]:
+    if "active_customers" not in state or "open_tickets" not in state:
+        return None
+    counts: Dict[Any, int] = {}
+    for t in state["open_tickets"]:
+        counts[t["customer_id"]] = counts.get(t["customer_id"], 0) + 1
+    lines = [
+        CUSTOMER_TICKETS_LINE.substitute(
+            id=c["id"], name=c["name"], count=counts[c["id"]],
+            plural="" if counts[c["id"]] == 1 else "s",
+        )
+        for c in state["active_customers"]
+        if c["id"] in counts
+    ]
+    return ACTIVE_WITH_OPEN.substitute(count=len(lines), customers="\n".join(lines) or "None.")
+
+
+def _render_high_priority(state: Dict[str, Any]) -> Optional[str]:
+    if "high_priority_tickets" not in state:
+        return None
+    tickets = state["high_priority_tickets"]
+    return HIGH_PRIORITY.substitute(count=len(tickets), tickets=_ticket_block(tickets, 20))
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    "simple_get": _render_simple_get,
+    "open_tickets": _render_open_tickets,
+    "update_email_and_history": _render_history,
+    "active_customers_with_open_tickets": _render_active_with_open,
+    "high_priority_for_premium": _render_high_priority,
+}
+
+# Scenarios that always get the LLM rewrite (tone matters more than speed)
+EMPATHETIC_SCENARIOS = ("refund_escalation", "coordinated_upgrade")
+
+
+def render(scenario: Optional[str], state: Dict[str, Any]) -> Optional[str]:
+    renderer = RENDERERS.get(scenario)
+    return renderer(state) if renderer else None
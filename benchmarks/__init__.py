@@ -0,0 +1,25 @@
+# benchmarks/__init__.py
+"""
+Benchmark scripts, run as modules from the repo root, e.g.:
+
+    python -m benchmarks.bench_read_snapshot
+
+- common.py               (temp databases + timing helpers)
+- bench_read_snapshot.py  (disk vs in-memory snapshot reads)
+- bench_group_commit.py   (commit-per-write vs group commit)
+- bench_sessions.py       (multi-turn latency with / without sessions)
+- bench_plans.py          (compiled plans vs router hops)
+- bench_prefetch.py       (speculative customer prefetch)
+- bench_templates.py      (template replies vs LLM rewrite)
+- bench_bulk.py           (bulk customer / history reads vs N single calls)
+- bench_triage.py         (triage index vs SQL ORDER BY ... LIMIT)
+- bench_indexes.py        (previous vs composite indexes at scale)
+- bench_pool.py           (CoordinatorPool throughput vs worker count)
+- bench_wire.py           (JSON vs msgpack vs columnar msgpack messages)
+- bench_results.py        (per-conversation memory: inline state vs result handles)
+- bench_archive.py        (tool latency before / after archiving resolved tickets)
+- bench_analytics.py      (NumPy backlog statistics vs SQL vs pure Python)
+- bench_single_flight.py  (burst workload with / without single-flight calls)
+- bench_contact_lookup.py (indexed email / phone lookup vs scans)
+- loadgen.py              (asyncio HTTP load generator for mcp_server.server)
+"""
@@ -0,0 +1,123 @@
+# benchmarks/bench_analytics.py
+"""
+Backlog statistics three ways: the NumPy column store (mcp_server.analytics),
+equivalent SQL (GROUP BY plus the backlog ages fetched for percentiles,
+which SQLite lacks), and pure Python over the ticket rows. Also the cost
+of the initial column load and of an incremental refresh after a burst of
+writes.
+
+    python -m benchmarks.bench_analytics --customers 100000 --tickets 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+
+from mcp_server import analytics, db
+
+from .common import print_table, temp_database, time_calls
+
+SQL_BACKLOG = """
+    SELECT priority, status, COUNT(*) FROM tickets
+    WHERE status IN ('open', 'in_progress') GROUP BY priority, status
+"""
+SQL_BACKLOG_AGES = """
+    SELECT priority, (julianday('now') - julianday(created_at)) FROM tickets
+    WHERE status IN ('open', 'in_progress')
+"""
+SQL_PER_CUSTOMER = "SELECT customer_id, COUNT(*) FROM tickets GROUP BY customer_id"
+
+
+def _quantiles(values):
+    values.sort()
+    return [values[min(len(values) - 1, int(p / 100 * len(values)))] for p in analytics.PERCENTILES]
+
+
+def sql_backlog(conn):
+    counts = conn.execute(SQL_BACKLOG).fetchall()
+    ages = {}
+    for priority, age in conn.execute(SQL_BACKLOG_AGES):
+        ages.setdefault(priority, []).append(age)
+    return counts, {p: _quantiles(a) for p, a in ages.items()}
+
+
+def sql_distribution(conn):
+    counts = [n for _, n in conn.execute(SQL_PER_CUSTOMER)]
+    return statistics.fmean(counts), _quantiles(counts), max(counts)
+
+
+def python_rows(conn):
+    # What a client of the row tools would hold: one dict per ticket
+    return [db.dictify(r) for r in conn.execute("SELECT * FROM tickets")]
+
+
+def python_backlog(rows, now):
+    counts, ages = Counter(), {}
+    for t in rows:
+        if t["status"] != "resolved":
+            counts[(t["priority"], t["status"])] += 1
+            created = time.mktime(time.strptime(t["created_at"], "%Y-%m-%d %H:%M:%S"))
+            ages.setdefault(t["priority"], []).append((now - created) / 86400)
+    return counts, {p: _quantiles(a) for p, a in ages.items()}
+
+
+def python_distribution(rows):
+    counts = list(Counter(t["customer_id"] for t in rows).values())
+    return statistics.fmean(counts), _quantiles(counts), max(counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=1000, help="Writes before the refresh measurement.")
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets):
+        start = time.perf_counter()
+        analytics.reset_index()
+        index = analytics.get_index()
+        load_s = time.perf_counter() - start
+
+        conn = db.get_connection()
+        try:
+            sql_backlog(conn)  # warm the page cache
+            start = time.perf_counter()
+            rows = python_rows(conn)
+            rows_s = time.perf_counter() - start
+            now = time.time()
+            n = args.calls
+            results = {
+                "numpy backlog_stats": time_calls(lambda i: index.backlog_stats(), n),
+                "sql backlog": time_calls(lambda i: sql_backlog(conn), n),
+                "python backlog (rows)": time_calls(lambda i: python_backlog(rows, now), max(n // 4, 1)),
+                "numpy distribution": time_calls(lambda i: index.customer_ticket_distribution(), n),
+                "sql distribution": time_calls(lambda i: sql_distribution(conn), n),
+                "python distribution": time_calls(lambda i: python_distribution(rows), max(n // 4, 1)),
+            }
+        finally:
+            conn.close()
+        del rows
+
+        rng = random.Random(7)
+        for _ in range(args.writes):
+            if rng.random() < 0.5:
+                db.create_ticket(rng.randint(1, args.customers), "Bench ticket", rng.choice(["low", "medium", "high"]))
+            else:
+                db.update_ticket_status(rng.randint(1, args.tickets), rng.choice(["open", "in_progress", "resolved"]))
+        start = time.perf_counter()
+        patched = index.refresh()
+        refresh_s = time.perf_counter() - start
+        analytics.reset_index()
+
+    print(f"\ncolumn load: {load_s * 1000:.0f}ms for {args.tickets} tickets; "
+          f"rows as dicts (python baseline): {rows_s * 1000:.0f}ms")
+    print(f"refresh after {args.writes} writes: {patched} tickets re-read in {refresh_s * 1000:.1f}ms")
+    print_table("aggregate latency", results)
+
+
+if __name__ == "__main__":
+    main()
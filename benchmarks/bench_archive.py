@@ -0,0 +1,108 @@
+# benchmarks/bench_archive.py
+"""
+Hot / cold ticket partitioning: tool latency before and after moving old
+resolved tickets into tickets_archive, plus the archive job's throughput
+and its longest batch (the longest time it holds the write lock).
+Customer #1 gets many extra old resolved tickets (an integration account).
+
+    python -m benchmarks.bench_archive --customers 100000 --tickets 1000000
+"""
+
+import argparse
+import random
+import time
+
+from mcp_server import archive, db
+
+from .bench_indexes import HOT_CUSTOMER, add_hot_customer
+from .common import print_table, temp_database, time_calls
+
+STATUS_COUNTS = "SELECT status, COUNT(*) FROM tickets GROUP BY status"
+
+
+def status_counts():
+    conn = db.get_connection()
+    try:
+        return conn.execute(STATUS_COUNTS).fetchall()
+    finally:
+        conn.close()
+
+
+def run_tools(customers: int, n: int, seed: int, archived: bool):
+    rng = random.Random(seed)
+    ids = [rng.randint(1, customers) for _ in range(n)]
+    batches = [[rng.randint(1, customers) for _ in range(50)] for _ in range(n)]
+    rows = {
+        "get_customer_history": time_calls(lambda i: db.get_customer_history(ids[i]), n),
+        "hot customer history": time_calls(lambda i: db.get_customer_history(HOT_CUSTOMER), n // 10 or 1),
+        "get_customer_histories(50, 5)": time_calls(
+            lambda i: db.get_customer_histories(batches[i], per_customer_limit=5), n
+        ),
+        "list_open_tickets(50)": time_calls(lambda i: db.list_open_tickets_for_customers(batches[i]), n),
+        "ticket status counts": time_calls(lambda i: status_counts(), n // 10 or 1),
+    }
+    if archived:
+        rows["history hot_only"] = time_calls(lambda i: db.get_customer_history(ids[i], hot_only=True), n)
+        rows["hot customer hot_only"] = time_calls(
+            lambda i: db.get_customer_history(HOT_CUSTOMER, hot_only=True), n // 10 or 1
+        )
+    return rows
+
+
+def run_archive(days: float, batch_size: int):
+    """archive_resolved one batch at a time, to time each write transaction."""
+    moved, longest = 0, 0.0
+    start = time.perf_counter()
+    while True:
+        batch_start = time.perf_counter()
+        n = archive.archive_resolved(days, batch_size=batch_size, max_batches=1)
+        longest = max(longest, time.perf_counter() - batch_start)
+        if not n:
+            break
+        moved += n
+    return moved, time.perf_counter() - start, longest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--hot-tickets", type=int, default=20_000, help="Old resolved tickets of customer #1.")
+    parser.add_argument("--older-than-days", type=float, default=90)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM after archiving (rebuilds the file).")
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets) as path:
+        conn = db.get_connection(path)
+        conn.executemany(
+            "INSERT INTO tickets (customer_id, issue, status, priority, created_at) "
+            "VALUES (?, ?, 'resolved', 'low', datetime('now', ?))",
+            [(HOT_CUSTOMER, f"Old hot issue #{i}", f"-{100 + i % 200} days") for i in range(args.hot_tickets)],
+        )
+        conn.commit()
+        conn.close()
+        add_hot_customer(path, args.hot_tickets // 10)   # and some recent ones
+
+        run_tools(args.customers, 20, 1, archived=False)   # warm the page cache
+        before = run_tools(args.customers, args.calls, 7, archived=False)
+
+        moved, elapsed, longest = run_archive(args.older_than_days, args.batch_size)
+        hot = status_counts()
+        print(f"\narchived {moved} tickets in {elapsed:.1f}s ({moved / elapsed:.0f}/s), "
+              f"longest batch {longest * 1000:.1f}ms; hot table now {sum(c for _, c in hot)} tickets")
+
+        if args.vacuum:
+            conn = db.get_connection(path)
+            conn.execute("VACUUM")
+            conn.close()
+        run_tools(args.customers, 20, 1, archived=True)
+        after = run_tools(args.customers, args.calls, 7, archived=True)
+
+    print_table("before archiving", before)
+    print_table("after archiving (merged hot + archive unless hot_only)", after)
+
+
+if __name__ == "__main__":
+    main()
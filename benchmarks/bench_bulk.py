@@ -0,0 +1,54 @@
+# benchmarks/bench_bulk.py
+"""
+Bulk reads: get_customers / get_customer_histories vs N single
+get_customer / get_customer_history calls for the same ids.
+
+    python -m benchmarks.bench_bulk --customers 100000 --tickets 500000 --batch 10 100 1000
+"""
+
+import argparse
+import random
+
+from mcp_server import db
+
+from .common import print_table, temp_database, time_calls
+
+
+def run_batch(customers: int, batch: int, rounds: int, history_limit: int, seed: int):
+    rng = random.Random(seed)
+    batches = [[rng.randint(1, customers) for _ in range(batch)] for _ in range(rounds)]
+    return {
+        "N x get_customer": time_calls(lambda i: [db.get_customer(c) for c in batches[i]], rounds),
+        "get_customers": time_calls(lambda i: db.get_customers(batches[i]), rounds),
+        "N x get_customer_history": time_calls(
+            lambda i: [db.get_customer_history(c)[:history_limit] for c in batches[i]], rounds
+        ),
+        "get_customer_histories": time_calls(
+            lambda i: db.get_customer_histories(batches[i], per_customer_limit=history_limit), rounds
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--history-limit", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets):
+        results = {
+            n: run_batch(args.customers, n, args.rounds, args.history_limit, seed=n)
+            for n in args.batch
+        }
+
+    for n, rows in results.items():
+        print_table(f"{n} ids per call ({args.rounds} rounds)", rows)
+        print(f"  speedup (p50): get_customers {rows['N x get_customer']['p50_us'] / rows['get_customers']['p50_us']:.1f}x, "
+              f"get_customer_histories {rows['N x get_customer_history']['p50_us'] / rows['get_customer_histories']['p50_us']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
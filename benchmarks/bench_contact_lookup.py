@@ -0,0 +1,72 @@
+# benchmarks/bench_contact_lookup.py
+"""
+Customer lookup by email / phone: the indexed find_customer_by_* tools vs
+the same predicate as a full table scan (NOT INDEXED) and vs the old
+route of listing customers and scanning them in Python. Also the time to
+build idx_customers_phone_digits.
+
+    python -m benchmarks.bench_contact_lookup --customers 1000000
+"""
+
+import argparse
+import random
+import time
+
+from mcp_server import db
+from mcp_server.database_setup import PHONE_DIGITS
+
+from .common import print_table, temp_database, time_calls
+
+EMAIL_SCAN = "SELECT * FROM customers NOT INDEXED WHERE email IN (?, ?)"
+PHONE_SCAN = f"SELECT * FROM customers NOT INDEXED WHERE {PHONE_DIGITS} IN (?, ?)"
+
+
+def scan(sql, params):
+    return db._fetch_all(db.DB_PATH, sql, params)
+
+
+def list_and_scan(email):
+    return [c for c in db.list_customers(limit=10 ** 9) if c["email"] == email]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--tickets", type=int, default=10_000)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--scan-calls", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets) as path:
+        conn = db.get_connection(path)
+        conn.execute("DROP INDEX idx_customers_phone_digits")
+        start = time.perf_counter()
+        conn.execute(f"CREATE INDEX idx_customers_phone_digits ON customers({PHONE_DIGITS})")
+        build_s = time.perf_counter() - start
+        conn.close()
+
+        rng = random.Random(7)
+        ids = [rng.randint(1, args.customers) for _ in range(args.calls)]
+        emails = [f"customer{n}@example.com" for n in ids]
+        phones = [f"(555) {n:07d}" for n in ids]   # stored as +1-555-NNNNNNN
+        n, k = args.calls, args.scan_calls
+
+        db.find_customers_by_email(emails[0])   # warm the page cache
+        rows = {
+            "find_customer_by_email": time_calls(lambda i: db.find_customers_by_email(emails[i]), n),
+            "find_customer_by_phone": time_calls(lambda i: db.find_customers_by_phone(phones[i]), n),
+            "email, full scan": time_calls(lambda i: scan(EMAIL_SCAN, (emails[i], emails[i])), k),
+            "phone, full scan": time_calls(
+                lambda i: scan(PHONE_SCAN, (db.phone_digits(phones[i]), "1" + db.phone_digits(phones[i]))), k
+            ),
+            "list_customers + scan": time_calls(lambda i: list_and_scan(emails[i]), max(k // 2, 1)),
+        }
+        found = sum(bool(db.find_customers_by_phone(p)) for p in phones[:100])
+
+    print(f"\n{args.customers} customers; idx_customers_phone_digits built in {build_s * 1000:.0f}ms; "
+          f"{found}/100 reformatted phone numbers found")
+    print_table("lookup latency", rows)
+
+
+if __name__ == "__main__":
+    main()
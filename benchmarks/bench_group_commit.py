@@ -0,0 +1,58 @@
+# benchmarks/bench_group_commit.py
+"""
+Write throughput: one commit per write vs the group-commit queue.
+
+    python -m benchmarks.bench_group_commit --threads 16 --writes 2000
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mcp_server import db
+
+from .common import temp_database
+
+
+def run_writes(threads: int, writes: int, customers: int) -> float:
+    def one(i: int):
+        cid = 1 + i % customers
+        if i % 4 == 0:
+            db.update_customer(cid, {"status": "active"})
+        else:
+            db.create_ticket(cid, f"Bench issue {i}", "medium")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(writes)))
+    return writes / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=2_000)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait", type=float, default=0.002)
+    args = parser.parse_args(argv)
+
+    customers = 1_000
+    with temp_database(customers, 5_000):
+        direct = run_writes(args.threads, args.writes, customers)
+
+        db.enable_group_commit(max_batch=args.max_batch, max_wait=args.max_wait)
+        try:
+            grouped = run_writes(args.threads, args.writes, customers)
+            wq = db._write_queue
+            avg_batch = wq.writes / max(wq.batches, 1)
+        finally:
+            db.disable_group_commit()
+
+    print(f"\n{args.writes} writes (75% create_ticket / 25% update_customer), {args.threads} threads")
+    print(f"  commit per write : {direct:>10.0f} writes/s")
+    print(f"  group commit     : {grouped:>10.0f} writes/s  (avg batch {avg_batch:.1f})")
+    print(f"  speedup          : {grouped / direct:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_indexes.py
+"""
+Tool query latency on a generated dataset with the previous index set
+(customers(email), tickets(customer_id), tickets(status)) vs the
+composite indexes matched to each query. Customer #1 gets many extra
+tickets, where the history sort shows up.
+
+    python -m benchmarks.bench_indexes --customers 100000 --tickets 1000000
+"""
+
+import argparse
+import random
+
+from mcp_server import db
+from mcp_server.database_setup import DatabaseSetup
+
+from .common import print_table, temp_database, time_calls
+
+NEW_INDEXES = ("idx_customers_status_id", "idx_tickets_customer_created", "idx_tickets_customer_status")
+
+
+HOT_CUSTOMER = 1
+
+
+def run_tools(customers: int, n: int, seed: int):
+    rng = random.Random(seed)
+    ids = [rng.randint(1, customers) for _ in range(n)]
+    batches = [[rng.randint(1, customers) for _ in range(50)] for _ in range(n)]
+    return {
+        "hot customer history": time_calls(lambda i: db.get_customer_history(HOT_CUSTOMER), n // 10 or 1),
+        "hot customer newest 5": time_calls(
+            lambda i: db.get_customer_histories([HOT_CUSTOMER], per_customer_limit=5), n
+        ),
+        "list_customers(disabled)": time_calls(lambda i: db.list_customers(status="disabled"), n),
+        "get_customer_history": time_calls(lambda i: db.get_customer_history(ids[i]), n),
+        "get_customer_histories(50, 5)": time_calls(
+            lambda i: db.get_customer_histories(batches[i], per_customer_limit=5), n
+        ),
+        "list_open_tickets(50, high)": time_calls(
+            lambda i: db.list_open_tickets_for_customers(batches[i], priority="high"), n
+        ),
+    }
+
+
+def add_hot_customer(path, tickets: int):
+    """One customer with many tickets (a reseller / integration account)."""
+    conn = db.get_connection(path)
+    try:
+        conn.executemany(
+            "INSERT INTO tickets (customer_id, issue, status, priority, created_at) "
+            "VALUES (?, ?, 'resolved', 'low', datetime('now', ?))",
+            [(HOT_CUSTOMER, f"Hot issue #{i}", f"-{i} minutes") for i in range(tickets)],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def use_old_indexes(path):
+    conn = db.get_connection(path)
+    try:
+        for name in NEW_INDEXES:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute("CREATE INDEX idx_tickets_customer_id ON tickets(customer_id)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--hot-tickets", type=int, default=20_000, help="Tickets of customer #1.")
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets) as path:
+        add_hot_customer(path, args.hot_tickets)
+        use_old_indexes(path)
+        run_tools(args.customers, args.calls, seed=0)  # warm the page cache
+        old = run_tools(args.customers, args.calls, seed=1)
+
+        setup = DatabaseSetup(str(path))
+        setup.connect()
+        setup.create_tables()  # idempotent: adds the current index set
+        setup.close()
+        run_tools(args.customers, args.calls, seed=0)
+        new = run_tools(args.customers, args.calls, seed=1)
+
+    print_table("Previous indexes", old)
+    print_table("Composite indexes", new)
+    print("\nSpeedup (p50):")
+    for name in new:
+        print(f"  {name:<30}{old[name]['p50_us'] / new[name]['p50_us']:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_plans.py
+"""
+Hop count and latency: compiled scenario plans vs router-driven routing.
+
+LLM calls are stubbed (zero latency by default) so the numbers isolate
+the orchestration overhead: extra router hops, state copies and logging.
+
+    python -m benchmarks.bench_plans --runs 200
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from agents.coordinator import DEMO_SCENARIOS, A2ACoordinator
+
+from .common import stub_llms, temp_database
+
+
+def measure(coord, queries, runs):
+    hops = 0
+    start = time.perf_counter()
+    for i in range(runs):
+        coord.run(queries[i % len(queries)])
+        hops += len(coord.last_timings)
+    elapsed = time.perf_counter() - start
+    return hops / runs, elapsed / runs * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5, help="Interleaved rounds; best round is reported")
+    parser.add_argument("--llm-ms", type=float, default=0.0, help="Simulated latency per LLM call")
+    args = parser.parse_args(argv)
+
+    queries = [q.replace("12345", "42") for q in DEMO_SCENARIOS]
+    llm_s = args.llm_ms / 1000
+
+    with temp_database(10_000, 50_000):
+        routed = stub_llms(A2ACoordinator(use_plans=False), llm_s, llm_s)
+        planned = stub_llms(A2ACoordinator(use_plans=True), llm_s, llm_s)
+        # Agents print progress; keep terminal I/O out of the measurement
+        with contextlib.redirect_stdout(io.StringIO()):
+            measure(planned, queries, len(queries))  # warm-up
+            rounds = [
+                (measure(routed, queries, args.runs), measure(planned, queries, args.runs))
+                for _ in range(args.rounds)
+            ]
+        r_hops, r_ms = min((r for r, _ in rounds), key=lambda x: x[1])
+        p_hops, p_ms = min((p for _, p in rounds), key=lambda x: x[1])
+
+    print(f"\n{'':<12}{'hops/query':>12}{'ms/query':>12}")
+    print(f"{'routed':<12}{r_hops:>12.2f}{r_ms:>12.3f}")
+    print(f"{'planned':<12}{p_hops:>12.2f}{p_ms:>12.3f}")
+    print(f"\nhops saved: {r_hops - p_hops:.2f}/query, latency saved: {r_ms - p_ms:.3f}ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_pool.py
+"""
+CoordinatorPool throughput vs worker count. LLM latency is stubbed to zero
+so each query is pure agent + DB work (CPU-bound); throughput should grow
+roughly linearly up to the number of cores.
+
+    python -m benchmarks.bench_pool --queries 2000 --workers 1 2 4 8
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from agents.pool import CoordinatorPool
+
+from .common import stub_llms, temp_database
+
+QUERIES = [
+    "Get customer information for ID {cid}",
+    "Show open tickets for customer {cid}",
+    "Show me all active customers who have open tickets",
+]
+
+
+def make_coordinator():
+    from agents.coordinator import A2ACoordinator
+
+    return stub_llms(A2ACoordinator(), 0.0, 0.0)
+
+
+def run(workers, n, sessions):
+    with contextlib.redirect_stdout(io.StringIO()):
+        pool = CoordinatorPool(workers=workers, coordinator_factory=make_coordinator, include_log=False)
+        pool.ready.wait()
+        start = time.perf_counter()
+        futures = [
+            pool.submit(
+                QUERIES[i % len(QUERIES)].format(cid=1 + i % 1000),
+                session_id=f"s{i % sessions}" if sessions else None,
+            )
+            for i in range(n)
+        ]
+        errors = sum(1 for f in futures if f.result()["error"])
+        elapsed = time.perf_counter() - start
+        pool.close()
+    return n / elapsed, errors, pool.completed
+
+
+def main(argv=None):
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, cores} & set(range(1, cores + 1))))
+    parser.add_argument("--sessions", type=int, default=0,
+                        help="Spread queries over N sessions (0 = no sessions, least-loaded routing).")
+    args = parser.parse_args(argv)
+
+    with temp_database(10_000, 50_000):
+        print(f"\n{args.queries} queries, {cores} cores")
+        print(f"{'workers':>8} {'queries/s':>10} {'speedup':>8} {'errors':>7}  per-worker")
+        base = None
+        for workers in args.workers:
+            qps, errors, completed = run(workers, args.queries, args.sessions)
+            base = base or qps
+            print(f"{workers:>8} {qps:10.1f} {qps / base:7.2f}x {errors:>7}  {completed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_prefetch.py
+"""
+Speculative customer prefetch: latency with and without prefetching while
+the (stubbed) intent classification runs.
+
+    python -m benchmarks.bench_prefetch --classify-ms 300 --mcp-ms 40
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from agents.coordinator import A2ACoordinator
+
+from .common import stub_llms, temp_database
+
+QUERIES = [
+    "Get customer information for ID {cid}",
+    "I'm customer {cid} and need help upgrading my account",
+    "I need help with my account, customer ID {cid}",
+    "I want to cancel my subscription but I'm having billing issues",  # no ID → no prefetch
+]
+
+
+def slow_mcp(coord, delay_s: float):
+    """Simulate a remote MCP server: add latency to each read tool call."""
+    for name in ("get_customer", "get_customer_history"):
+        fn = getattr(coord.mcp, name)
+
+        def slowed(*args, _fn=fn, **kwargs):
+            time.sleep(delay_s)
+            return _fn(*args, **kwargs)
+
+        setattr(coord.mcp, name, slowed)
+    return coord
+
+
+def run(coord, n):
+    start = time.perf_counter()
+    for i in range(n):
+        coord.run(QUERIES[i % len(QUERIES)].format(cid=1 + i % 1000))
+    return (time.perf_counter() - start) / n * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--classify-ms", type=float, default=300)
+    parser.add_argument("--mcp-ms", type=float, default=40)
+    args = parser.parse_args(argv)
+
+    with temp_database(10_000, 50_000), contextlib.redirect_stdout(io.StringIO()):
+        results = {}
+        for prefetch in (False, True):
+            coord = stub_llms(A2ACoordinator(), args.classify_ms / 1000, 0)
+            if not prefetch:
+                coord.router.prefetcher = None
+            slow_mcp(coord, args.mcp_ms / 1000)
+            results[prefetch] = (run(coord, args.queries), coord.router.prefetcher)
+
+    base_ms, _ = results[False]
+    pref_ms, prefetcher = results[True]
+    stats = prefetcher.stats
+    print(f"\nclassify={args.classify_ms:g}ms, MCP call={args.mcp_ms:g}ms, {args.queries} queries")
+    print(f"  no prefetch : {base_ms:8.1f} ms/query")
+    print(f"  prefetch    : {pref_ms:8.1f} ms/query")
+    print(f"  hit rate    : {stats.hit_rate:8.1%}  ({stats.hits} hits, {stats.misses} misses, "
+          f"{stats.discarded} discarded)")
+    print(f"  saved       : {stats.saved_ms / max(stats.hits, 1):8.1f} ms per hit (measured by prefetcher)")
+
+
+if __name__ == "__main__":
+    main()
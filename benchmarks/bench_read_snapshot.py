@@ -0,0 +1,87 @@
+# benchmarks/bench_read_snapshot.py
+"""
+Read latency: on-disk SQLite vs the in-memory read snapshot.
+
+With --write-every N a ticket is created before every N-th read (not
+timed), so the snapshot is refreshed in the background while reads go on;
+the table reports how many copies readers had to wait for.
+
+    python -m benchmarks.bench_read_snapshot --customers 100000 --tickets 500000
+    python -m benchmarks.bench_read_snapshot --write-every 10
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from mcp_server import db
+
+from .common import percentile, print_table, temp_database, time_calls
+
+
+def time_reads(fn, n: int, write_every: int, customers: int):
+    """time_calls(fn, n) with an untimed create_ticket before every write_every-th call."""
+    if not write_every:
+        return time_calls(fn, n)
+    samples = []
+    for i in range(n):
+        if i % write_every == 0:
+            db.create_ticket(i % customers + 1, "Snapshot bench ticket", "low")
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "n": n,
+        "mean_us": statistics.fmean(samples),
+        "p50_us": percentile(samples, 50),
+        "p95_us": percentile(samples, 95),
+        "p99_us": percentile(samples, 99),
+    }
+
+
+def run_reads(customers: int, n: int, seed: int, write_every: int = 0):
+    rng = random.Random(seed)
+    ids = [rng.randint(1, customers) for _ in range(n)]
+    return {
+        "get_customer": time_reads(lambda i: db.get_customer(ids[i]), n, write_every, customers),
+        "list_customers(active, 50)": time_reads(
+            lambda i: db.list_customers(status="active"), n, write_every, customers
+        ),
+        "get_customer_history": time_reads(lambda i: db.get_customer_history(ids[i]), n, write_every, customers),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=2_000)
+    parser.add_argument("--staleness", type=float, default=5.0)
+    parser.add_argument("--write-every", type=int, default=0, help="Create a ticket before every N-th read.")
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets) as path:
+        disk = run_reads(args.customers, args.calls, seed=1, write_every=args.write_every)
+
+        db.enable_read_snapshot(max_staleness=args.staleness)
+        try:
+            db.get_customer(1)  # initial copy, not part of the measurement
+            snap = run_reads(args.customers, args.calls, seed=1, write_every=args.write_every)
+            copies = db._snapshots[path]
+            refreshes, waited = copies.refreshes - copies.sync_refreshes, copies.sync_refreshes - 1
+        finally:
+            db.disable_read_snapshot()
+
+    writes = f", a write every {args.write_every} reads" if args.write_every else ""
+    print_table(f"On-disk reads{writes}", disk)
+    print_table(f"Snapshot reads (max_staleness={args.staleness}s{writes})", snap)
+    print(f"\nsnapshot copies: {refreshes} in the background, {waited} waited for by readers")
+    print("\nSpeedup (p50):")
+    for name in disk:
+        print(f"  {name:<28}{disk[name]['p50_us'] / snap[name]['p50_us']:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_results.py
+"""
+Per-conversation memory with large results inline in A2AMessage.state vs
+parked in the turn's ResultStore (handles in state). Runs the
+"active customers with open tickets" scenario with a large list limit and
+measures, with tracemalloc, the peak memory of one run() and what is
+still held afterwards (answer + log).
+
+    python -m benchmarks.bench_results --customers 100000 --tickets 500000 --limit 1000 10000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+from agents.coordinator import A2ACoordinator
+from agents.result_store import HANDLE_MIN_ROWS
+
+from .common import temp_database
+
+QUERY = "Show me all active customers who have open tickets"
+
+
+def make_coordinator(handle_min_rows: int, limit: int):
+    coord = A2ACoordinator(handle_min_rows=handle_min_rows)
+    classification = {"intents": ["list"], "customer_id": None, "scenario": "active_customers_with_open_tickets"}
+    coord.router.llm = lambda system, user, **kw: json.dumps(classification)
+    coord.support_agent.llm = lambda system, user, **kw: user
+    coord.router.prefetcher = None
+    coord.customer_data_agent.list_limit = limit
+    return coord
+
+
+def measure(handle_min_rows: int, limit: int):
+    coord = make_coordinator(handle_min_rows, limit)
+    with contextlib.redirect_stdout(io.StringIO()):
+        coord.run(QUERY)  # warm caches / lazy imports
+        tracemalloc.start()
+        start = time.perf_counter()
+        answer, log = coord.run(QUERY)
+        elapsed = time.perf_counter() - start
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    log_bytes = sum(len(line.encode("utf-8")) for line in log)
+    return peak, retained, log_bytes, elapsed * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--tickets", type=int, default=250_000)
+    parser.add_argument("--limit", type=int, nargs="+", default=[1000, 10_000])
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets):
+        for limit in args.limit:
+            print(f"\nactive customers with open tickets, list limit {limit}")
+            print(f"{'mode':<10}{'peak_MB':>10}{'retained_MB':>13}{'log_KB':>10}{'run_ms':>10}")
+            for mode, min_rows in (("inline", 10 ** 9), ("handles", HANDLE_MIN_ROWS)):
+                peak, retained, log_bytes, ms = measure(min_rows, limit)
+                print(f"{mode:<10}{peak / 2**20:>10.2f}{retained / 2**20:>13.2f}{log_bytes / 1024:>10.1f}{ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
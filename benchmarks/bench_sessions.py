@@ -0,0 +1,51 @@
+# benchmarks/bench_sessions.py
+"""
+Per-turn latency of a multi-turn conversation with and without sessions.
+
+    python -m benchmarks.bench_sessions --turns 3 --classify-ms 300
+"""
+
+import argparse
+import time
+
+from agents.coordinator import A2ACoordinator
+
+from .common import stub_llms, temp_database
+
+CONVERSATION = [
+    "Get customer information for ID 42",
+    "Get customer information for ID 42",
+    "Can you check again? customer 42",
+]
+
+
+def run_turns(coord, turns, session_id):
+    out = []
+    for i in range(turns):
+        start = time.perf_counter()
+        coord.run(CONVERSATION[i % len(CONVERSATION)], session_id=session_id)
+        out.append((time.perf_counter() - start) * 1000)
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--classify-ms", type=float, default=300)
+    parser.add_argument("--rewrite-ms", type=float, default=0)
+    args = parser.parse_args(argv)
+
+    with temp_database(10_000, 50_000):
+        coord = stub_llms(A2ACoordinator(), args.classify_ms / 1000, args.rewrite_ms / 1000)
+        cold = run_turns(coord, args.turns, session_id=None)
+        warm = run_turns(coord, args.turns, session_id="bench")
+        session = coord.sessions.get("bench")
+
+    print(f"\n{'turn':<6}{'no session ms':>16}{'session ms':>14}{'saved ms':>12}")
+    for i, (c, w) in enumerate(zip(cold, warm), 1):
+        print(f"{i:<6}{c:>16.1f}{w:>14.1f}{c - w:>12.1f}")
+    print(f"\nSession-reported saving: {session.saved_ms:.1f}ms over {session.turns} turns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+# benchmarks/bench_single_flight.py
+"""
+Burst workload with and without single-flight deduplication. Each round
+starts `--burst` conversations at the same instant (one coordinator per
+thread, as in agents.batch thread mode); `--hot` of them are the same
+query about customer #1, an account with many tickets, the rest are about
+random customers. LLMs are stubbed with sleeps; the stubs are shared by
+all coordinators, like the real backend.
+
+Reports LLM calls and tool executions actually run, how many were
+collapsed into another caller's call, and per-conversation latency.
+
+    python -m benchmarks.bench_single_flight --burst 32 --hot 0.75 --rounds 5
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import threading
+import time
+
+from agents.coordinator import A2ACoordinator
+from agents.single_flight import LLM_FLIGHTS, TOOL_FLIGHTS
+
+from .bench_indexes import HOT_CUSTOMER, add_hot_customer
+from .common import percentile, stub_llms, temp_database
+
+HOT_QUERY = f"Show open tickets for customer {HOT_CUSTOMER}"
+COLD_QUERY = "Get customer information for ID {cid}"
+
+
+def make_coordinators(n, classify_latency, rewrite_latency, single_flight):
+    first = stub_llms(A2ACoordinator(), classify_latency, rewrite_latency)
+    calls = {"llm": 0}
+    router_llm, support_llm = first.router.llm, first.support_agent.llm
+
+    def counted(llm):
+        def run(system_prompt, user_prompt, **kwargs):
+            calls["llm"] += 1
+            return llm(system_prompt, user_prompt, **kwargs)
+        return run
+
+    router_llm, support_llm = counted(router_llm), counted(support_llm)
+    coords = [first] + [A2ACoordinator() for _ in range(n - 1)]
+    for coord in coords:
+        coord.router.llm, coord.support_agent.llm = router_llm, support_llm
+        coord.router.prefetcher = None
+        if not single_flight:
+            coord.mcp.flights = None
+            for agent in coord.agents.values():
+                agent.llm_flights = None
+    return coords, calls
+
+
+def run(args, single_flight):
+    coords, calls = make_coordinators(args.burst, args.classify_latency, args.rewrite_latency, single_flight)
+    rng = random.Random(7)
+    latencies = []
+    tool_before = (TOOL_FLIGHTS.executed, TOOL_FLIGHTS.collapsed)
+    llm_before = LLM_FLIGHTS.collapsed
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        queries = [
+            HOT_QUERY if rng.random() < args.hot else COLD_QUERY.format(cid=rng.randint(2, args.customers))
+            for _ in range(args.burst)
+        ]
+        barrier = threading.Barrier(args.burst)
+
+        def worker(i):
+            barrier.wait()
+            t0 = time.perf_counter()
+            coords[i].run(queries[i])
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.burst)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "llm_calls": calls["llm"],
+        "llm_collapsed": LLM_FLIGHTS.collapsed - llm_before,
+        "tool_runs": TOOL_FLIGHTS.executed - tool_before[0] if single_flight else None,
+        "tool_collapsed": TOOL_FLIGHTS.collapsed - tool_before[1],
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "elapsed_s": elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--tickets", type=int, default=50_000)
+    parser.add_argument("--hot-tickets", type=int, default=20_000, help="Tickets of customer #1.")
+    parser.add_argument("--burst", type=int, default=32, help="Conversations started together.")
+    parser.add_argument("--hot", type=float, default=0.75, help="Share of the burst asking the hot query.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--classify-latency", type=float, default=0.3)
+    parser.add_argument("--rewrite-latency", type=float, default=0.6)
+    args = parser.parse_args(argv)
+
+    with temp_database(args.customers, args.tickets) as path:
+        add_hot_customer(path, args.hot_tickets)
+        rows = {mode: run(args, mode == "single-flight") for mode in ("off", "single-flight")}
+
+    print(f"\n{args.rounds} bursts of {args.burst} conversations, {args.hot:.0%} hot query")
+    print(f"{'':<15}{'llm_calls':>10}{'llm_coll':>10}{'tool_runs':>10}{'tool_coll':>10}"
+          f"{'p50_ms':>9}{'p95_ms':>9}{'total_s':>9}")
+    for mode, r in rows.items():
+        tool_runs = "-" if r["tool_runs"] is None else r["tool_runs"]
+        print(f"{mode:<15}{r['llm_calls']:>10}{r['llm_collapsed']:>10}{tool_runs:>10}{r['tool_collapsed']:>10}"
+              f"{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{r['elapsed_s']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_templates.py
+"""
+Template fast path: per-scenario latency with rewrite="auto" (templates for
+factual scenarios) vs rewrite="always" (LLM rewrite for every reply), using
+stubbed LLM latency.
+
+    python -m benchmarks.bench_templates --classify-ms 300 --rewrite-ms 600
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from agents.coordinator import A2ACoordinator
+
+from .common import stub_llms, temp_database
+
+SCENARIOS = {
+    "simple_get": ("Get customer information for ID {cid}", {"customer_id": "{cid}"}),
+    "open_tickets": ("Show open tickets for customer {cid}", {"customer_id": "{cid}"}),
+    "update_email_and_history": ("Update email for customer {cid} and show history", {"customer_id": "{cid}"}),
+    "active_customers_with_open_tickets": ("Show me all active customers who have open tickets", {}),
+    "high_priority_for_premium": ("High-priority tickets for premium customers", {}),
+    "refund_escalation": ("Customer {cid} wants a refund for a double charge", {"customer_id": "{cid}"}),
+}
+
+
+def make_coordinator(rewrite, scenario, cid, classify_s, rewrite_s):
+    coord = stub_llms(A2ACoordinator(rewrite=rewrite), classify_s, rewrite_s)
+    _, extra = SCENARIOS[scenario]
+    classification = {"intents": [scenario], "scenario": scenario, "customer_id": None}
+    classification.update({k: int(v.format(cid=cid)) for k, v in extra.items()})
+
+    def classify(system_prompt, user_prompt, **kwargs):
+        time.sleep(classify_s)
+        return json.dumps(classification)
+
+    coord.router.llm = classify
+    coord.router.prefetcher = None  # isolate the rewrite cost
+    return coord
+
+
+def run(rewrite, scenario, n, classify_s, rewrite_s):
+    total = 0.0
+    for i in range(n):
+        cid = 1 + i % 1000
+        coord = make_coordinator(rewrite, scenario, cid, classify_s, rewrite_s)
+        query = SCENARIOS[scenario][0].format(cid=cid)
+        start = time.perf_counter()
+        coord.run(query)
+        total += time.perf_counter() - start
+    return total / n * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=5, help="Queries per scenario and mode.")
+    parser.add_argument("--classify-ms", type=float, default=300)
+    parser.add_argument("--rewrite-ms", type=float, default=600)
+    args = parser.parse_args(argv)
+    classify_s, rewrite_s = args.classify_ms / 1000, args.rewrite_ms / 1000
+
+    with temp_database(10_000, 50_000):
+        print(f"\nclassify={args.classify_ms:g}ms, rewrite={args.rewrite_ms:g}ms, {args.queries} queries/scenario")
+        print(f"{'scenario':<36} {'always':>10} {'auto':>10} {'saved':>8}")
+        for scenario in SCENARIOS:
+            with contextlib.redirect_stdout(io.StringIO()):
+                always = run("always", scenario, args.queries, classify_s, rewrite_s)
+                auto = run("auto", scenario, args.queries, classify_s, rewrite_s)
+            print(f"{scenario:<36} {always:8.1f}ms {auto:8.1f}ms {1 - auto / always:7.0%}")
+
+
+if __name__ == "__main__":
+    main()
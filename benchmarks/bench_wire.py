@@ -0,0 +1,93 @@
+# benchmarks/bench_wire.py
+"""
+Wire formats: encode / decode time and payload size of A2AMessages with
+real CustomerDataAgent states, as JSON, MessagePack (row dicts) and
+MessagePack with columnar tables.
+
+    python -m benchmarks.bench_wire --customers 100000 --tickets 500000 --rows 50 1000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from agents.base_agent import A2AMessage
+from agents.customer_data_agent import CustomerDataAgent
+from agents.mcp_client import MCPClient
+from mcp_server import db, wire
+
+from .common import temp_database
+
+
+def build_states(rows: int):
+    agent = CustomerDataAgent(MCPClient())
+    states = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for scenario, extra in (
+            ("update_email_and_history", {"customer_id": 7}),
+            ("active_customers_with_open_tickets", {}),
+        ):
+            msg = A2AMessage("router", "customer_data", "agent", "fetch", {"scenario": scenario, **extra})
+            states[scenario] = agent.handle(msg).state
+    # Same scenario at a larger page size than the agent's default of 50
+    customers = db.list_customers(status="active", limit=rows)
+    states[f"active_customers (limit={rows})"] = {
+        "scenario": "active_customers_with_open_tickets",
+        "active_customers": customers,
+        "open_tickets": db.list_open_tickets_for_customers([c["id"] for c in customers]),
+    }
+    return states
+
+
+def measure(message: A2AMessage, content_type: str, columnar: bool, rounds: int):
+    def encode():
+        if columnar:
+            return message.to_wire(content_type)
+        return wire.encode({"sender": message.sender, "receiver": message.receiver, "role": message.role,
+                            "content": message.content, "state": message.state, "budget": None},
+                           content_type, columnar=False)
+
+    data = encode()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode()
+    enc_us = (time.perf_counter() - start) / rounds * 1e6
+    start = time.perf_counter()
+    for _ in range(rounds):
+        A2AMessage.from_wire(data, content_type)
+    dec_us = (time.perf_counter() - start) / rounds * 1e6
+    return len(data), enc_us, dec_us
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    formats = [("json", wire.JSON, True)]
+    if wire.binary_available():
+        formats += [("msgpack rows", wire.BINARY, False), ("msgpack columnar", wire.BINARY, True)]
+    else:
+        print("msgpack is not installed: JSON only")
+
+    with temp_database(args.customers, args.tickets):
+        states = {}
+        for rows in args.rows:
+            states.update(build_states(rows))
+        for name, state in states.items():
+            message = A2AMessage("customer_data", "router", "agent", "ready", state)
+            print(f"\n{name}")
+            print(f"{'format':<18}{'bytes':>10}{'vs json':>9}{'encode_us':>11}{'decode_us':>11}")
+            base = None
+            for label, content_type, columnar in formats:
+                size, enc_us, dec_us = measure(message, content_type, columnar, args.rounds)
+                base = base or size
+                print(f"{label:<18}{size:>10}{size / base:>8.0%}{enc_us:>11.1f}{dec_us:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
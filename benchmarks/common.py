@@ -0,0 +1,112 @@
+# benchmarks/common.py
+import contextlib
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from mcp_server import db
+from mcp_server.database_setup import DatabaseSetup
+
+
+@contextlib.contextmanager
+def temp_database(customers: int = 10_000, tickets: int = 50_000, seed: int = 42):
+    """
+    Build a generated database in a temp dir and point mcp_server.db at it.
+    Yields the database path.
+    """
+    tmpdir = Path(tempfile.mkdtemp(prefix="a2a-bench-"))
+    path = tmpdir / "customers.db"
+    setup = DatabaseSetup(str(path))
+    setup.connect()
+    setup.create_tables()
+    setup.create_triggers()
+    setup.insert_generated_data(customers, tickets, seed=seed)
+    setup.close()
+
+    old_path = db.DB_PATH
+    db.DB_PATH = path
+    try:
+        yield path
+    finally:
+        db.DB_PATH = old_path
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def time_calls(fn: Callable[[int], object], n: int) -> Dict[str, float]:
+    """Call fn(i) n times; return latency stats in microseconds."""
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        "n": n,
+        "mean_us": statistics.fmean(samples),
+        "p50_us": percentile(samples, 50),
+        "p95_us": percentile(samples, 95),
+        "p99_us": percentile(samples, 99),
+    }
+
+
+def print_table(title: str, rows: Dict[str, Dict[str, float]]):
+    print(f"\n{title}")
+    print(f"{'':<28}{'mean_us':>10}{'p50_us':>10}{'p95_us':>10}{'p99_us':>10}")
+    for name, r in rows.items():
+        print(f"{name:<28}{r['mean_us']:>10.1f}{r['p50_us']:>10.1f}{r['p95_us']:>10.1f}{r['p99_us']:>10.1f}")
+
+
+# ------------------------------------------------------
+# Stub LLMs (simulated latency, no network)
+# ------------------------------------------------------
+def fake_classification(query: str) -> Dict[str, object]:
+    """Keyword classifier standing in for the LLM intent classifier."""
+    import re
+
+    q = query.lower()
+    m = re.search(r"\b(?:id|customer)\s*#?\s*(\d+)", q)
+    customer_id = int(m.group(1)) if m else None
+
+    if "refund" in q or "charged twice" in q:
+        scenario = "refund_escalation"
+    elif "upgrad" in q:
+        scenario = "coordinated_upgrade"
+    elif "email" in q and "history" in q:
+        scenario = "update_email_and_history"
+    elif "active customers" in q:
+        scenario = "active_customers_with_open_tickets"
+    elif "high-priority" in q or "high priority" in q:
+        scenario = "high_priority_for_premium"
+    elif "ticket" in q:
+        scenario = "open_tickets"
+    else:
+        scenario = "simple_get"
+    return {"intents": [scenario], "customer_id": customer_id, "scenario": scenario}
+
+
+def stub_llms(coordinator, classify_latency: float = 0.3, rewrite_latency: float = 0.6):
+    """Replace the router / support LLM calls with sleeps of typical latency."""
+    import json
+
+    def classify(system_prompt, user_prompt, **kwargs):
+        time.sleep(classify_latency)
+        return json.dumps(fake_classification(user_prompt.split("\n")[0]))
+
+    def rewrite(system_prompt, user_prompt, **kwargs):
+        time.sleep(rewrite_latency)
+        draft = user_prompt.split("Draft reply:\n", 1)[-1]
+        return draft.split("\n\nRewrite", 1)[0]
+
+    coordinator.router.llm = classify
+    coordinator.support_agent.llm = rewrite
+    return coordinator
@@ -0,0 +1,396 @@
+# benchmarks/loadgen.py
+"""
+asyncio load generator for the MCP server (POST /tools/call).
+
+Replays a weighted mix of tool calls over keep-alive HTTP/1.1 connections,
+either closed-loop (a fixed number of concurrent clients) or open-loop
+(Poisson arrivals at a fixed rate, latency measured from the scheduled
+start so server queueing is not hidden). Reports throughput, error rate
+and p50/p95/p99/max latency per tool, as text and optionally JSON.
+
+    uvicorn mcp_server.server:app --port 8000 &
+    python -m benchmarks.loadgen --concurrency 32 --duration 10
+    python -m benchmarks.loadgen --rate 500 --duration 10 --json load.json
+    python -m benchmarks.loadgen --serve --concurrency 16   # server in this process
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .common import percentile
+
+TOOLS = ("get_customer", "list_customers", "get_customer_history", "update_customer", "create_ticket")
+
+DEFAULT_MIX = {
+    "get_customer": 50,
+    "list_customers": 10,
+    "get_customer_history": 25,
+    "update_customer": 10,
+    "create_ticket": 5,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"get_customer=60,create_ticket=5" → {"get_customer": 60.0, "create_ticket": 5.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in TOOLS:
+            raise ValueError(f"Unknown tool in mix: {name!r} (choose from {', '.join(TOOLS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class RequestFactory:
+    """Draws (tool, arguments) pairs from the weighted mix."""
+
+    def __init__(self, mix: Dict[str, float], customers: int, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.tools = list(mix)
+        self.weights = [mix[t] for t in self.tools]
+        self.customers = customers
+        self._ids = itertools.count(1)
+
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        tool = self.rng.choices(self.tools, self.weights)[0]
+        cid = self.rng.randint(1, self.customers)
+        if tool == "list_customers":
+            args: Dict[str, Any] = {"status": self.rng.choice(["active", "disabled"]), "limit": 20}
+        elif tool == "update_customer":
+            args = {"customer_id": cid, "data": {"phone": f"+1-555-{self.rng.randint(0, 9_999_999):07d}"}}
+        elif tool == "create_ticket":
+            args = {"customer_id": cid, "issue": "Load test ticket", "priority": "low"}
+        else:
+            args = {"customer_id": cid}
+        return tool, args
+
+    def body(self, tool: str, args: Dict[str, Any]) -> bytes:
+        return json.dumps({
+            "jsonrpc": "2.0",
+            "id": str(next(self._ids)),
+            "method": "tools/call",
+            "params": {"name": tool, "arguments": args},
+        }).encode()
+
+
+# ------------------------------------------------------
+# Minimal HTTP/1.1 keep-alive client
+# ------------------------------------------------------
+class HttpConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+        self.reusable = True
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> "HttpConnection":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, host)
+
+    async def post(self, path: str, body: bytes) -> Tuple[int, bytes]:
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            payload = b"".join(chunks)
+        else:
+            payload = await self.reader.readexactly(int(headers.get("content-length", 0)))
+
+        if headers.get("connection", "").lower() == "close":
+            self.reusable = False
+        return status, payload
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.opened = 0
+        self._idle: List[HttpConnection] = []
+
+    async def acquire(self) -> HttpConnection:
+        if self._idle:
+            return self._idle.pop()
+        self.opened += 1
+        return await HttpConnection.open(self.host, self.port)
+
+    def release(self, conn: HttpConnection, ok: bool):
+        if ok and conn.reusable:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    def close(self):
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+# ------------------------------------------------------
+# Results
+# ------------------------------------------------------
+@dataclass
+class ToolStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies_ms)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def record(self, latency_ms: float, error: Optional[str]):
+        self.latencies_ms.append(latency_ms)
+        if error:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def summary(self, duration: float) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        return {
+            "count": self.count,
+            "errors": self.error_count,
+            "error_rate": self.error_count / self.count if self.count else 0.0,
+            "error_kinds": dict(self.errors),
+            "throughput_rps": self.count / duration if duration else 0.0,
+            "p50_ms": percentile(lat, 50),
+            "p95_ms": percentile(lat, 95),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": lat[-1] if lat else 0.0,
+        }
+
+
+@dataclass
+class LoadReport:
+    mode: str
+    duration: float
+    tools: Dict[str, ToolStats]
+    connections: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = ToolStats()
+        for stats in self.tools.values():
+            total.latencies_ms.extend(stats.latencies_ms)
+            for kind, n in stats.errors.items():
+                total.errors[kind] = total.errors.get(kind, 0) + n
+        return {
+            "mode": self.mode,
+            "duration_s": self.duration,
+            "connections": self.connections,
+            "tools": {name: s.summary(self.duration) for name, s in sorted(self.tools.items())},
+            "total": total.summary(self.duration),
+        }
+
+    def format(self) -> str:
+        data = self.to_dict()
+        lines = [
+            f"{data['mode']}, {self.duration:.1f}s, {self.connections} connection(s)",
+            f"{'tool':<22}{'count':>8}{'err%':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)",
+        ]
+        rows = list(data["tools"].items()) + [("TOTAL", data["total"])]
+        for name, r in rows:
+            lines.append(
+                f"{name:<22}{r['count']:>8}{r['error_rate'] * 100:>6.1f}%{r['throughput_rps']:>9.1f}"
+                f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['max_ms']:>9.2f}"
+            )
+        errors = data["total"]["error_kinds"]
+        if errors:
+            lines.append("errors: " + ", ".join(f"{k}={v}" for k, v in sorted(errors.items())))
+        return "\n".join(lines)
+
+
+# ------------------------------------------------------
+# Load loops
+# ------------------------------------------------------
+async def _call(pool: ConnectionPool, path: str, body: bytes, timeout: float) -> Optional[str]:
+    """One tool call; returns an error kind or None."""
+    conn = None
+    ok = False
+    try:
+        conn = await asyncio.wait_for(pool.acquire(), timeout)
+        status, payload = await asyncio.wait_for(conn.post(path, body), timeout)
+        ok = True
+        if status >= 400:
+            return f"http_{status}"
+        if json.loads(payload).get("error"):
+            return "rpc_error"
+        return None
+    except asyncio.TimeoutError:
+        return "timeout"
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+        return "connection"
+    finally:
+        if conn is not None:
+            pool.release(conn, ok)
+
+
+async def run_load(
+    url: str = "http://127.0.0.1:8000",
+    mix: Optional[Dict[str, float]] = None,
+    concurrency: Optional[int] = 16,
+    rate: Optional[float] = None,
+    duration: float = 10.0,
+    requests: Optional[int] = None,
+    customers: int = 15,
+    timeout: float = 5.0,
+    max_in_flight: int = 1000,
+    seed: int = 0,
+) -> LoadReport:
+    """
+    Closed loop (`concurrency` clients back to back) unless `rate` is set,
+    in which case calls arrive open-loop at `rate` per second (at most
+    `max_in_flight` outstanding; arrivals beyond that count as "dropped").
+    Stops after `duration` seconds or `requests` calls, whichever is first.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname or "127.0.0.1", parts.port or 80
+    path = (parts.path.rstrip("/") or "") + "/tools/call"
+    factory = RequestFactory(mix or DEFAULT_MIX, customers, seed)
+    pool = ConnectionPool(host, port)
+    stats: Dict[str, ToolStats] = {}
+    budget = itertools.count() if requests is None else iter(range(requests))
+
+    start = time.perf_counter()
+    stop_at = start + duration
+
+    async def one(tool: str, args: Dict[str, Any], scheduled: float):
+        error = await _call(pool, path, factory.body(tool, args), timeout)
+        stats.setdefault(tool, ToolStats()).record((time.perf_counter() - scheduled) * 1000, error)
+
+    if rate is None:
+        async def client():
+            while time.perf_counter() < stop_at and next(budget, None) is not None:
+                tool, args = factory.next()
+                await one(tool, args, time.perf_counter())
+
+        await asyncio.gather(*(client() for _ in range(concurrency or 1)))
+        mode = f"closed loop, concurrency={concurrency}"
+    else:
+        in_flight = set()
+        arrival_rng = random.Random(seed + 1)
+        scheduled = start
+        while next(budget, None) is not None:
+            scheduled += arrival_rng.expovariate(rate)
+            if scheduled >= stop_at:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tool, args = factory.next()
+            if len(in_flight) >= max_in_flight:
+                stats.setdefault(tool, ToolStats()).record(0.0, "dropped")
+                continue
+            task = asyncio.ensure_future(one(tool, args, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        mode = f"open loop, rate={rate:g}/s"
+
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return LoadReport(mode=mode, duration=elapsed, tools=stats, connections=pool.opened)
+
+
+# ------------------------------------------------------
+# In-process server (needs fastapi + uvicorn)
+# ------------------------------------------------------
+def serve_in_thread(host: str = "127.0.0.1") -> Tuple[str, Any]:
+    """Start mcp_server.server:app with uvicorn on a free port; returns (url, server)."""
+    import socket
+    import threading
+
+    import uvicorn
+
+    from mcp_server.server import app
+
+    with socket.socket() as s:
+        s.bind((host, 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://{host}:{port}", server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="Run the server in this process (uvicorn).")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Weighted tool mix, e.g. get_customer=60,create_ticket=5")
+    loop = parser.add_mutually_exclusive_group()
+    loop.add_argument("--concurrency", type=int, default=16, help="Closed loop: concurrent clients.")
+    loop.add_argument("--rate", type=float, help="Open loop: arrivals per second.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument("--requests", type=int, help="Stop after this many calls.")
+    parser.add_argument("--customers", type=int, default=15, help="Customer ids are drawn from 1..N.")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-call timeout in seconds.")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the report as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    url, server = args.url, None
+    if args.serve:
+        url, server = serve_in_thread()
+
+    try:
+        report = asyncio.run(run_load(
+            url, args.mix,
+            concurrency=None if args.rate else args.concurrency,
+            rate=args.rate, duration=args.duration, requests=args.requests,
+            customers=args.customers, timeout=args.timeout,
+            max_in_flight=args.max_in_flight, seed=args.seed,
+        ))
+    finally:
+        if server is not None:
+            server.should_exit = True
+
+    print(report.format())
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.to_dict(), f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,4 +7,12 @@ Contains:
 - db.py              (low-level DB helpers)
 - tools.py           (MCP-style tool functions)
 - server.py          (bootstrap / entrypoint)
+- sharding.py        (hash sharding across N SQLite files)
+- snapshot.py        (in-memory read snapshot)
+- write_queue.py     (group-commit writer)
+- triage.py          (open-ticket priority index)
+- changes.py         (change-log feed / retention)
+- wire.py            (JSON / binary msgpack wire formats)
+- archive.py         (hot / cold partitioning of resolved tickets)
+- analytics.py       (NumPy column store for backlog statistics)
 """
@@ -0,0 +1,316 @@
+# mcp_server/analytics.py
+"""
+Column store of ticket facts for backlog / SLA statistics (NumPy).
+
+Questions like "open backlog by priority and median age" touch every
+ticket; answering them through the row tools means one dict per ticket.
+TicketColumns keeps five integer columns per database file instead:
+
+    id | customer_id | status code | priority code | created_at (epoch s)
+
+loaded in bulk from `tickets` and `tickets_archive`, sorted by id. The
+codes are computed by SQLite in the load query, so no Python object is
+built per ticket; aggregates are vectorized NumPy expressions:
+
+    backlog_stats()                 → open / in_progress counts and age
+                                      percentiles per priority
+    customer_ticket_distribution()  → tickets per customer (np.bincount)
+
+Incremental refresh follows the change log (changes.ChangeFeed, one
+cursor per file): every query first re-reads the tickets that changed
+since the last one by primary key and patches the columns in place
+(np.searchsorted on the id column), appends new ids and tombstones
+deleted ones. Archiving shows up as a delete from `tickets`; the re-read
+finds the row in `tickets_archive`. A cursor that fell behind log
+retention reloads its file. Because the log lives in the database, writes
+from other processes are picked up as well.
+
+NumPy is imported on first use, so the rest of the server runs without it.
+"""
+
+import itertools
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import changes, db, sharding
+from .triage import PRIORITY_RANK
+
+# Status codes; anything below RESOLVED is backlog
+STATUS_CODES = {"open": 0, "in_progress": 1, "resolved": 2}
+RESOLVED = STATUS_CODES["resolved"]
+DELETED = -1  # tombstone, dropped at the next compaction
+
+PERCENTILES = (50, 90, 99)
+
+_COLUMNS = """
+    SELECT id, customer_id,
+           CASE status WHEN 'open' THEN 0 WHEN 'in_progress' THEN 1 ELSE 2 END,
+           CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END,
+           CAST(strftime('%s', created_at) AS INTEGER)
+    FROM {table}
+"""
+LOAD_TICKET_COLUMNS = _COLUMNS.format(table="tickets") + " UNION ALL " + _COLUMNS.format(table="tickets_archive")
+# {ids}: placeholders for the changed ticket ids, bound twice
+READ_TICKET_COLUMNS = (
+    _COLUMNS.format(table="tickets") + " WHERE id IN ({ids}) UNION ALL "
+    + _COLUMNS.format(table="tickets_archive") + " WHERE id IN ({ids})"
+)
+
+QUERIES: Dict[str, str] = {
+    "load_ticket_columns": LOAD_TICKET_COLUMNS,
+    "read_ticket_columns": READ_TICKET_COLUMNS,
+}
+
+# Columns of the fetched rows
+_ID, _CUSTOMER, _STATUS, _PRIORITY, _CREATED = range(5)
+
+
+def _connect(path: Path):
+    conn = db.get_connection(path)
+    conn.row_factory = None  # plain tuples: several times cheaper than sqlite3.Row in bulk
+    return conn
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("ticket analytics need numpy (pip install numpy)") from None
+    return numpy
+
+
+def _as_columns(np, rows: List[Tuple]) -> "Any":
+    """(n, 5) int64 array, sorted by id, one row per id (hot table wins)."""
+    flat = itertools.chain.from_iterable(rows)
+    table = np.fromiter(flat, dtype=np.int64, count=5 * len(rows)).reshape(-1, 5)
+    # np.unique keeps the first occurrence: `tickets` rows come before the archive's
+    _, first = np.unique(table[:, _ID], return_index=True)
+    return table[first]
+
+
+class _FileColumns:
+    """Columns of one database file plus its change-log cursor."""
+
+    def __init__(self, path: Path, shard: Optional[int]):
+        self.path = path
+        self.shard = shard
+        self.feed: Optional[changes.ChangeFeed] = None
+        self.table = None
+        self.tombstones = 0
+
+    def load(self, np):
+        # Cursor first: changes committed while we read are re-applied
+        self.feed = changes.ChangeFeed(self.shard)
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(LOAD_TICKET_COLUMNS).fetchall()
+        finally:
+            conn.close()
+        self.table = _as_columns(np, rows)
+        self.tombstones = 0
+
+    def changed_ids(self, batch: int) -> Optional[List[int]]:
+        """Ticket ids changed since the last call (None: cursor was reset, reload)."""
+        ids = set()
+        while True:
+            page = self.feed.poll(limit=batch)
+            if self.feed.reset:
+                return None
+            ids.update(c["row_id"] for c in page if c["table_name"] == "tickets")
+            if len(page) < batch:
+                return sorted(ids)
+
+    def patch(self, np, ids: List[int]):
+        conn = _connect(self.path)
+        try:
+            rows = []
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows += conn.execute(READ_TICKET_COLUMNS.format(ids=placeholders), chunk + chunk).fetchall()
+        finally:
+            conn.close()
+
+        fresh = _as_columns(np, rows)
+        table = self.table
+        pos = np.searchsorted(table[:, _ID], fresh[:, _ID])
+        known = pos < len(table)
+        known[known] = table[pos[known], _ID] == fresh[known, _ID]
+        table[pos[known]] = fresh[known]
+
+        # Ids that no longer exist in either table
+        gone = np.setdiff1d(np.asarray(ids, dtype=np.int64), fresh[:, _ID], assume_unique=True)
+        at = np.searchsorted(table[:, _ID], gone)
+        at = at[at < len(table)]
+        at = at[np.isin(table[at, _ID], gone) & (table[at, _STATUS] != DELETED)]
+        table[at, _STATUS] = DELETED
+        self.tombstones += len(at)
+
+        added = fresh[~known]
+        if len(added):
+            table = np.concatenate([table, added])
+            if len(table) > len(added) and added[0, _ID] < self.table[-1, _ID]:
+                table = table[np.argsort(table[:, _ID], kind="stable")]
+            self.table = table
+
+        if self.tombstones > 1024 and self.tombstones * 2 > len(self.table):
+            self.table = self.table[self.table[:, _STATUS] != DELETED]
+            self.tombstones = 0
+
+
+class TicketColumns:
+    def __init__(self, change_batch: int = 1000):
+        self.change_batch = change_batch
+        self._files: List[_FileColumns] = []
+        self._lock = threading.RLock()
+
+        self.source: Optional[Tuple[Path, int]] = None  # (DB_PATH, shard count) built from
+        self.refreshes = 0   # incremental refreshes that patched something
+        self.reloads = 0     # files reloaded after a change-log reset
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(int((f.table[:, _STATUS] != DELETED).sum()) for f in self._files)
+
+    # ------------------------------------------------------
+    # Load / refresh
+    # ------------------------------------------------------
+    def build(self) -> "TicketColumns":
+        """Load the columns of every database file of the current layout."""
+        np = _numpy()
+        with self._lock:
+            paths = sharding.layout_paths(db.DB_PATH)
+            sharded = sharding.is_enabled()
+            files = {p: _FileColumns(p, i if sharded else None) for i, p in enumerate(paths)}
+            sharding.scatter(paths, lambda p: files[p].load(np))
+            self._files = list(files.values())
+            self.source = (db.DB_PATH, sharding.SHARD_COUNT)
+        return self
+
+    def refresh(self) -> int:
+        """Apply the changes logged since the last refresh. Returns the number of tickets re-read."""
+        np = _numpy()
+        patched = 0
+        with self._lock:
+            for f in self._files:
+                ids = f.changed_ids(self.change_batch)
+                if ids is None:
+                    f.load(np)
+                    self.reloads += 1
+                elif ids:
+                    f.patch(np, ids)
+                    patched += len(ids)
+            if patched:
+                self.refreshes += 1
+        return patched
+
+    def _columns(self):
+        """Live rows of all files as one (n, 5) array (refreshed first)."""
+        np = _numpy()
+        self.refresh()
+        tables = [f.table for f in self._files]
+        table = tables[0] if len(tables) == 1 else np.concatenate(tables)
+        if any(f.tombstones for f in self._files):
+            table = table[table[:, _STATUS] != DELETED]
+        return np, table
+
+    # ------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------
+    def backlog_stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Backlog (open + in_progress) counts by status and priority, with
+        age percentiles in days per priority. `now` is an epoch (default:
+        the current time).
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            np, table = self._columns()
+            backlog = table[table[:, _STATUS] < RESOLVED]
+
+        status = backlog[:, _STATUS]
+        priority = backlog[:, _PRIORITY]
+        age_days = (now - backlog[:, _CREATED]) / 86400.0
+        by_priority: Dict[str, Dict[str, Any]] = {}
+        for name, code in PRIORITY_RANK.items():
+            mask = priority == code
+            ages = age_days[mask]
+            entry: Dict[str, Any] = {
+                "count": int(mask.sum()),
+                "in_progress": int((status[mask] == STATUS_CODES["in_progress"]).sum()),
+            }
+            if len(ages):
+                for p, value in zip(PERCENTILES, np.percentile(ages, PERCENTILES)):
+                    entry[f"age_p{p}_days"] = round(float(value), 2)
+                entry["age_max_days"] = round(float(ages.max()), 2)
+            by_priority[name] = entry
+
+        counts = np.bincount(status, minlength=RESOLVED)
+        return {
+            "backlog": int(len(backlog)),
+            "tickets": int(len(table)),
+            "by_status": {name: int(counts[code]) for name, code in STATUS_CODES.items() if code < RESOLVED},
+            "by_priority": by_priority,
+        }
+
+    def customer_ticket_distribution(self, status: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+        """
+        Distribution of tickets per customer over the customers that have
+        any (`status`: only tickets in that status, "backlog": open +
+        in_progress). Mean, percentiles, power-of-two histogram buckets and
+        the `top` customers by ticket count.
+        """
+        with self._lock:
+            np, table = self._columns()
+            if status == "backlog":
+                table = table[table[:, _STATUS] < RESOLVED]
+            elif status is not None:
+                if status not in STATUS_CODES:
+                    raise ValueError(f"Unknown status: {status!r}")
+                table = table[table[:, _STATUS] == STATUS_CODES[status]]
+            per_customer = np.bincount(table[:, _CUSTOMER]) if len(table) else np.zeros(0, dtype=np.int64)
+
+        customers = np.flatnonzero(per_customer)
+        counts = per_customer[customers]
+        result: Dict[str, Any] = {"customers": int(len(counts)), "tickets": int(counts.sum())}
+        if not len(counts):
+            return result
+
+        result["mean"] = round(float(counts.mean()), 3)
+        for p, value in zip(PERCENTILES, np.percentile(counts, PERCENTILES)):
+            result[f"p{p}"] = round(float(value), 2)
+        result["max"] = int(counts.max())
+
+        # Bucket b holds counts in [2**b, 2**(b+1))
+        buckets = np.bincount(np.log2(counts).astype(np.int64))
+        result["histogram"] = [
+            {"tickets": f"{2 ** b}-{2 ** (b + 1) - 1}" if b else "1", "customers": int(n)}
+            for b, n in enumerate(buckets) if n
+        ]
+        k = min(max(top, 0), len(counts))
+        if k:
+            order = np.argsort(-counts, kind="stable")[:k]
+            result["top"] = [{"customer_id": int(customers[i]), "tickets": int(counts[i])} for i in order]
+        return result
+
+
+_index: Optional[TicketColumns] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> TicketColumns:
+    """Process-wide column store, loaded on first use (and reloaded if the DB layout changed)."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.source != (db.DB_PATH, sharding.SHARD_COUNT):
+            _index = TicketColumns().build()
+        return _index
+
+
+def reset_index():
+    """Drop the process-wide column store (it is reloaded on next use)."""
+    global _index
+    with _index_lock:
+        _index = None
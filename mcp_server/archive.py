@@ -0,0 +1,121 @@
+# mcp_server/archive.py
+"""
+Hot / cold partitioning of tickets.
+
+Resolved tickets never change again but stay in `tickets` forever, growing
+the indexes every history and status query walks. archive_resolved() moves
+resolved tickets older than a cut-off into `tickets_archive` (same columns,
+same database file, so sharding and the read snapshot need nothing new):
+
+    python -m mcp_server.archive --older-than-days 90 --batch-size 500
+
+Tickets have no resolved_at column, so age is measured from created_at.
+
+The job never holds the write lock for long: candidate ids are read
+outside any transaction, then each batch is copied and deleted in its own
+short BEGIN IMMEDIATE transaction (re-checking status = 'resolved', so a
+ticket reopened in between stays hot). Other writers get the lock between
+batches; `pause` adds a sleep there to throttle the job further.
+
+db.get_customer_history / get_customer_histories merge both tables
+(hot_only=True reads `tickets` alone). Archived tickets show up in the
+change log as deletes from `tickets`.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from . import db, sharding
+
+ARCHIVE_AFTER_DAYS = 90
+
+SELECT_ARCHIVABLE = """
+    SELECT id FROM tickets
+    WHERE status = 'resolved' AND id > ? AND created_at < datetime('now', ?)
+    ORDER BY id LIMIT ?
+"""
+COPY_TO_ARCHIVE = """
+    INSERT OR REPLACE INTO tickets_archive (id, customer_id, issue, status, priority, created_at)
+    SELECT id, customer_id, issue, status, priority, created_at
+    FROM tickets WHERE id IN ({ids}) AND status = 'resolved'
+"""
+DELETE_ARCHIVED = "DELETE FROM tickets WHERE id IN ({ids}) AND status = 'resolved'"
+
+QUERIES: Dict[str, str] = {
+    "select_archivable": SELECT_ARCHIVABLE,
+    "copy_to_archive": COPY_TO_ARCHIVE,
+    "delete_archived": DELETE_ARCHIVED,
+}
+
+
+def _archive_file(path: Path, cutoff: str, batch_size: int, pause: float,
+                  max_batches: Optional[int]) -> int:
+    conn = db.get_connection(path)
+    conn.isolation_level = None  # explicit transactions, one per batch
+    moved = batches = last_id = 0
+    try:
+        while max_batches is None or batches < max_batches:
+            ids: List[int] = [r[0] for r in conn.execute(SELECT_ARCHIVABLE, (last_id, cutoff, batch_size))]
+            if not ids:
+                break
+            last_id = ids[-1]
+            placeholders = ", ".join("?" for _ in ids)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(COPY_TO_ARCHIVE.format(ids=placeholders), ids)
+                moved += conn.execute(DELETE_ARCHIVED.format(ids=placeholders), ids).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            batches += 1
+            if pause:
+                time.sleep(pause)
+    finally:
+        conn.close()
+    return moved
+
+
+def archive_resolved(
+    older_than_days: float = ARCHIVE_AFTER_DAYS,
+    batch_size: int = 500,
+    pause: float = 0.0,
+    shard: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    Move resolved tickets created more than `older_than_days` ago into
+    tickets_archive, `batch_size` per transaction. Without `shard`, every
+    database file of the current layout is processed. `max_batches` caps
+    the work per file (for a job run on a schedule). Returns the number of
+    tickets moved.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    if shard is not None:
+        paths = [sharding.shard_path(db.DB_PATH, shard) if sharding.is_enabled() else db.DB_PATH]
+    else:
+        paths = sharding.layout_paths(db.DB_PATH)
+    cutoff = f"-{float(older_than_days)} days"
+    return sum(_archive_file(path, cutoff, batch_size, pause, max_batches) for path in paths)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move old resolved tickets into tickets_archive")
+    parser.add_argument("--older-than-days", type=float, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+    parser.add_argument("--max-batches", type=int, help="Stop after N batches per database file.")
+    parser.add_argument("--db", default=str(db.DB_PATH), help="Base database path")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = Path(args.db)
+    moved = archive_resolved(args.older_than_days, args.batch_size, args.pause, max_batches=args.max_batches)
+    print(f"Archived {moved} resolved tickets.")
+
+
+if __name__ == "__main__":
+    main()
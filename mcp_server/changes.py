@@ -0,0 +1,200 @@
+# mcp_server/changes.py
+"""
+Change-data-capture feed over the `change_log` table.
+
+Triggers (DatabaseSetup.create_triggers) append one row per insert /
+update / delete on `customers` and `tickets`:
+
+    seq | table_name | row_id | customer_id | op | changed_at
+
+`seq` is monotonic per database file (AUTOINCREMENT, never reused), so a
+consumer in any process keeps a cursor and asks for everything after it:
+
+    get_changes(since_seq=cursor, limit=100, wait_seconds=10)
+
+With `wait_seconds` the call long-polls until a change arrives. Writes
+made through this process's db module wake waiters immediately; changes
+from other processes are picked up within POLL_INTERVAL.
+
+Retention: the trim_change_log trigger keeps the newest
+CHANGE_LOG_RETAIN_ROWS entries, and compact_changes() drops entries by
+age. A consumer whose cursor fell behind the oldest retained entry gets
+`reset: True` and must drop everything it cached.
+
+With sharding enabled every shard has its own log and sequence; pass
+`shard` and keep one cursor per shard.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from . import db, sharding
+
+POLL_INTERVAL = 0.05
+
+READ_CHANGES = "SELECT * FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?"
+LATEST_SEQ = "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+OLDEST_SEQ = "SELECT MIN(seq) FROM change_log"
+# changed_at grows with seq: walk from the oldest entry to the first young one
+COMPACT_BY_AGE = """
+    DELETE FROM change_log WHERE seq < COALESCE(
+        (SELECT seq FROM change_log WHERE changed_at >= datetime('now', ?) ORDER BY seq LIMIT 1),
+        (SELECT COALESCE(MAX(seq), 0) + 1 FROM change_log)
+    )
+"""
+COMPACT_BY_ROWS = "DELETE FROM change_log WHERE seq <= (SELECT COALESCE(MAX(seq), 0) FROM change_log) - ?"
+
+QUERIES: Dict[str, str] = {
+    "read_changes": READ_CHANGES,
+    "latest_seq": LATEST_SEQ,
+    "oldest_seq": OLDEST_SEQ,
+    "compact_by_age": COMPACT_BY_AGE,
+    "compact_by_rows": COMPACT_BY_ROWS,
+}
+
+_cond = threading.Condition()
+_listening = False
+
+
+def _wake(path: Path, table: str, row: Dict[str, Any]):
+    with _cond:
+        _cond.notify_all()
+
+
+def _log_path(shard: Optional[int]) -> Path:
+    if shard is None:
+        if sharding.is_enabled():
+            raise ValueError("shard is required when sharding is enabled")
+        return db.DB_PATH
+    if not 0 <= shard < max(sharding.SHARD_COUNT, 1):
+        raise ValueError(f"shard must be in [0, {sharding.SHARD_COUNT}), got {shard}")
+    return sharding.shard_path(db.DB_PATH, shard) if sharding.is_enabled() else db.DB_PATH
+
+
+def _read(path: Path, since_seq: int, limit: int) -> Dict[str, Any]:
+    # Always from disk: the read snapshot may lag behind the log
+    conn = db.get_connection(path)
+    try:
+        rows = [db.dictify(r) for r in conn.execute(READ_CHANGES, (since_seq, limit))]
+        latest = conn.execute(LATEST_SEQ).fetchone()
+        oldest = conn.execute(OLDEST_SEQ).fetchone()[0]
+    finally:
+        conn.close()
+
+    latest_seq = latest[0] if latest else 0
+    oldest_seq = oldest if oldest is not None else latest_seq + 1
+    return {
+        "changes": rows,
+        "next_seq": rows[-1]["seq"] if rows else max(since_seq, min(latest_seq, oldest_seq - 1)),
+        "latest_seq": latest_seq,
+        "has_more": len(rows) == limit,
+        # Entries after since_seq were compacted away before being read
+        "reset": since_seq < oldest_seq - 1,
+    }
+
+
+def get_changes(
+    since_seq: int = 0,
+    limit: int = 100,
+    wait_seconds: float = 0.0,
+    shard: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Changes with seq > since_seq (oldest first, at most `limit`).
+
+    Returns {"changes", "next_seq", "latest_seq", "has_more", "reset"};
+    pass next_seq back as since_seq to continue. If nothing changed, waits
+    up to `wait_seconds` for a change before returning an empty page.
+    """
+    global _listening
+    path = _log_path(shard)
+    deadline = time.monotonic() + max(wait_seconds, 0.0)
+    if wait_seconds > 0 and not _listening:
+        with _cond:
+            if not _listening:
+                db.add_write_listener(_wake)
+                _listening = True
+
+    while True:
+        result = _read(path, since_seq, limit)
+        remaining = deadline - time.monotonic()
+        if result["changes"] or result["reset"] or remaining <= 0:
+            return result
+        with _cond:
+            _cond.wait(min(POLL_INTERVAL, remaining))
+
+
+def compact_changes(
+    max_age_seconds: Optional[float] = None,
+    keep_rows: Optional[int] = None,
+    shard: Optional[int] = None,
+) -> int:
+    """
+    Delete change_log entries older than `max_age_seconds` and / or all
+    but the newest `keep_rows`. Without `shard`, compacts every database
+    file of the current layout. Returns the number of entries deleted.
+    """
+    if shard is not None:
+        paths = [_log_path(shard)]
+    else:
+        paths = sharding.layout_paths(db.DB_PATH)
+
+    deleted = 0
+    for path in paths:
+        conn = db.get_connection(path)
+        try:
+            if max_age_seconds is not None:
+                deleted += conn.execute(
+                    COMPACT_BY_AGE, (f"-{float(max_age_seconds)} seconds",)
+                ).rowcount
+            if keep_rows is not None:
+                deleted += conn.execute(COMPACT_BY_ROWS, (int(keep_rows),)).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+    return deleted
+
+
+class ChangeFeed:
+    """
+    Cursor over one database's change log, for cache invalidation:
+
+        feed = ChangeFeed()                 # starts at the current end
+        for change in feed.poll(wait_seconds=5):
+            cache.pop(change["customer_id"], None)
+        if feed.reset:                      # fell behind retention
+            cache.clear()
+    """
+
+    def __init__(self, shard: Optional[int] = None, since_seq: Optional[int] = None):
+        self.shard = shard
+        self.since_seq = since_seq if since_seq is not None else _read(_log_path(shard), 0, 1)["latest_seq"]
+        self.reset = False
+
+    def poll(self, limit: int = 1000, wait_seconds: float = 0.0) -> List[Dict[str, Any]]:
+        result = get_changes(self.since_seq, limit, wait_seconds, self.shard)
+        self.since_seq = result["next_seq"]
+        self.reset = result["reset"]
+        return result["changes"]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Customer DB change log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cp = sub.add_parser("compact", help="Drop old change_log entries")
+    cp.add_argument("--max-age", type=float, help="Drop entries older than this many seconds")
+    cp.add_argument("--keep", type=int, help="Keep only the newest N entries (per database file)")
+    cp.add_argument("--db", default=str(db.DB_PATH), help="Base database path")
+    args = parser.parse_args(argv)
+
+    db.DB_PATH = Path(args.db)
+    deleted = compact_changes(max_age_seconds=args.max_age, keep_rows=args.keep)
+    print(f"Deleted {deleted} change_log entries.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,19 @@
+import random
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 
+# Newest change_log entries kept by the trim_change_log trigger
+CHANGE_LOG_RETAIN_ROWS = 100_000
+
+# customers.phone reduced to its digits ("+1-555-0105" → "15550105"). The
+# phone lookup in db.py must use this exact expression for SQLite to use
+# idx_customers_phone_digits.
+PHONE_DIGITS = (
+    "replace(replace(replace(replace(replace(replace("
+    "phone, '+', ''), '-', ''), ' ', ''), '(', ''), ')', ''), '.', '')"
+)
+
 
 class DatabaseSetup:
     """SQLite database setup for customer support system."""
@@ -35,10 +47,18 @@ class DatabaseSetup:
                 phone TEXT,
                 status TEXT NOT NULL DEFAULT 'active' CHECK(status IN ('active', 'disabled')),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                version INTEGER NOT NULL DEFAULT 1
             )
         """)
 
+        # Migration: row version counter for conditional reads (ETags).
+        # updated_at only has one-second resolution, so it can't tell two
+        # quick updates apart.
+        columns = [row[1] for row in self.cursor.execute("PRAGMA table_info(customers)")]
+        if "version" not in columns:
+            self.cursor.execute("ALTER TABLE customers ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+
         # Create tickets table
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS tickets (
@@ -52,32 +72,127 @@ class DatabaseSetup:
             )
         """)
 
+        # Cold partition: resolved tickets moved out of `tickets` by
+        # mcp_server/archive.py. Same columns, so history reads can merge
+        # both tables transparently.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tickets_archive (
+                id INTEGER PRIMARY KEY,
+                customer_id INTEGER NOT NULL,
+                issue TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                created_at DATETIME
+            )
+        """)
+
+        # Change log (one row per insert / update / delete, filled by triggers)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                customer_id INTEGER,
+                op TEXT NOT NULL CHECK(op IN ('insert', 'update', 'delete')),
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
         # Create indexes for better query performance
         self.cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email)
         """)
 
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tickets_customer_id ON tickets(customer_id)
+            CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status)
         """)
 
+        # Indexes matched to the tool queries in mcp_server/db.py
+        # (tests/test_query_plans.py fails on full scans / temp sorts).
+        # list_customers(status) ... ORDER BY id
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status)
+            CREATE INDEX IF NOT EXISTS idx_customers_status_id ON customers(status, id)
         """)
 
+        # get_customer_history(ies): newest first per customer
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tickets_customer_created
+            ON tickets(customer_id, created_at DESC, id DESC)
+        """)
+
+        # Archived part of get_customer_history(ies)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tickets_archive_customer_created
+            ON tickets_archive(customer_id, created_at DESC, id DESC)
+        """)
+
+        # list_open_tickets_for_customers(ids, priority)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tickets_customer_status
+            ON tickets(customer_id, status, priority)
+        """)
+
+        # find_customer_by_phone: formatting-insensitive phone match
+        self.cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_customers_phone_digits ON customers({PHONE_DIGITS})
+        """)
+
+        # Superseded by the two (customer_id, ...) indexes above
+        self.cursor.execute("DROP INDEX IF EXISTS idx_tickets_customer_id")
+
         self.conn.commit()
         print("Tables created successfully!")
 
     def create_triggers(self):
-        """Create triggers for automatic timestamp updates."""
+        """Create triggers for automatic timestamp updates and the change log."""
 
-        # Trigger to update updated_at on customers table
+        # Trigger to update updated_at on customers table. It also bumps
+        # the row version unless the UPDATE already did (db.update_customer
+        # does, so its RETURNING row has the new version). Recreated so
+        # databases with the older timestamp-only trigger pick this up.
+        self.cursor.execute("DROP TRIGGER IF EXISTS update_customer_timestamp")
         self.cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_customer_timestamp
+            CREATE TRIGGER update_customer_timestamp
             AFTER UPDATE ON customers
             FOR EACH ROW
             BEGIN
-                UPDATE customers SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+                UPDATE customers SET updated_at = CURRENT_TIMESTAMP,
+                    version = version + (NEW.version = OLD.version)
+                WHERE id = NEW.id;
+            END
+        """)
+
+        # Change-log triggers. Customers only log updates of the data
+        # columns, so the updated_at trigger above doesn't log twice.
+        watched = {
+            "customers": ("id", "AFTER UPDATE OF name, email, phone, status ON customers"),
+            "tickets": ("customer_id", "AFTER UPDATE ON tickets"),
+        }
+        for table, (customer_col, update_event) in watched.items():
+            for op, event, ref in (
+                ("insert", f"AFTER INSERT ON {table}", "NEW"),
+                ("update", update_event, "NEW"),
+                ("delete", f"AFTER DELETE ON {table}", "OLD"),
+            ):
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS log_{table}_{op}
+                    {event}
+                    FOR EACH ROW
+                    BEGIN
+                        INSERT INTO change_log (table_name, row_id, customer_id, op)
+                        VALUES ('{table}', {ref}.id, {ref}.{customer_col}, '{op}');
+                    END
+                """)
+
+        # Retention: every 1000th change trims the log to the newest
+        # CHANGE_LOG_RETAIN_ROWS entries (see mcp_server/changes.py for
+        # age-based compaction)
+        self.cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trim_change_log
+            AFTER INSERT ON change_log
+            FOR EACH ROW WHEN NEW.seq % 1000 = 0
+            BEGIN
+                DELETE FROM change_log WHERE seq <= NEW.seq - {CHANGE_LOG_RETAIN_ROWS};
             END
         """)
 
@@ -155,6 +270,61 @@ class DatabaseSetup:
         print(f"  - {len(customers)} customers added")
         print(f"  - {len(tickets)} tickets added")
 
+    def insert_generated_data(self, num_customers: int, num_tickets: int, seed: int = 42,
+                              batch_size: int = 10000):
+        """Insert a large synthetic dataset (for benchmarks and scale tests).
+
+        Args:
+            num_customers: Number of customers to generate
+            num_tickets: Number of tickets, spread randomly over the customers
+            seed: Random seed so runs are reproducible
+            batch_size: Rows per executemany batch
+        """
+        rng = random.Random(seed)
+        now = datetime.now()
+        first_id = self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM customers").fetchone()[0] + 1
+
+        def stamp(max_days: int) -> str:
+            return (now - timedelta(seconds=rng.randint(0, max_days * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+        for start in range(0, num_customers, batch_size):
+            rows = []
+            for i in range(start, min(start + batch_size, num_customers)):
+                n = first_id + i
+                rows.append((
+                    f"Customer {n}",
+                    f"customer{n}@example.com",
+                    f"+1-555-{n:07d}",
+                    "active" if rng.random() < 0.8 else "disabled",
+                    stamp(730),
+                ))
+            self.cursor.executemany("""
+                INSERT INTO customers (name, email, phone, status, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+
+        last_id = first_id + num_customers - 1
+        statuses = ["open", "in_progress", "resolved"]
+        priorities = ["low", "medium", "high"]
+        for start in range(0, num_tickets, batch_size):
+            rows = [
+                (
+                    rng.randint(first_id, last_id),
+                    f"Generated issue #{start + i}",
+                    rng.choices(statuses, weights=[2, 1, 7])[0],
+                    rng.choices(priorities, weights=[5, 4, 1])[0],
+                    stamp(365),
+                )
+                for i in range(min(batch_size, num_tickets - start))
+            ]
+            self.cursor.executemany("""
+                INSERT INTO tickets (customer_id, issue, status, priority, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+
+        self.conn.commit()
+        print(f"Generated {num_customers} customers and {num_tickets} tickets")
+
     def display_schema(self):
         """Display the database schema."""
 
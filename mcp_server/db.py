@@ -1,13 +1,43 @@
 # mcp_server/db.py
+import heapq
+import os
 import sqlite3
-from typing import Any, Dict, List, Optional
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional
 from pathlib import Path
 
+from . import sharding
+from .database_setup import PHONE_DIGITS
+
 DB_PATH = Path(__file__).parent / "customers.db"
 
+# Read-snapshot mode (see snapshot.py). None = read straight from disk.
+# MCP_READ_SNAPSHOT=<max staleness in seconds> turns it on at startup.
+_snapshot_config: Optional[Dict[str, Any]] = (
+    {"max_staleness": float(os.environ["MCP_READ_SNAPSHOT"]), "refresh_interval": None}
+    if os.getenv("MCP_READ_SNAPSHOT")
+    else None
+)
+_snapshots: Dict[Path, Any] = {}
+_snapshots_lock = threading.Lock()
+
+# Callbacks fired after a committed write: fn(path, table, row)
+_write_listeners: List[Callable[[Path, str, Dict[str, Any]], None]] = []
+
+# Group-commit mode (see write_queue.py). MCP_GROUP_COMMIT=<max batch size>
+# turns it on at startup; the writer thread starts on the first write.
+_group_commit_config: Optional[Dict[str, Any]] = (
+    {"max_batch": int(os.environ["MCP_GROUP_COMMIT"]), "max_wait": 0.002}
+    if os.getenv("MCP_GROUP_COMMIT")
+    else None
+)
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+def get_connection(path: Optional[Path] = None):
+    conn = sqlite3.connect(path or DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -16,30 +46,332 @@ def dictify(row: sqlite3.Row) -> Dict[str, Any]:
     return {k: row[k] for k in row.keys()}
 
 
+# ---- read snapshot / write notifications ----
+
+def enable_read_snapshot(max_staleness: float = 1.0, refresh_interval: Optional[float] = None):
+    """
+    Answer read tools from an in-memory copy of each database file.
+    Reads are at most `max_staleness` seconds behind the file; writes made
+    through this module are copied in the background, usually well within
+    that bound (max_staleness=0: visible on the next read).
+    """
+    global _snapshot_config
+    disable_read_snapshot()
+    _snapshot_config = {"max_staleness": max_staleness, "refresh_interval": refresh_interval}
+
+
+def disable_read_snapshot():
+    global _snapshot_config
+    _snapshot_config = None
+    with _snapshots_lock:
+        snapshots = list(_snapshots.values())
+        _snapshots.clear()
+    for snap in snapshots:
+        snap.close()
+
+
+def _snapshot_for(path: Path):
+    if _snapshot_config is None:
+        return None
+    with _snapshots_lock:
+        snap = _snapshots.get(path)
+        if snap is None:
+            from .snapshot import ReadSnapshot
+
+            snap = _snapshots[path] = ReadSnapshot(path, **_snapshot_config)
+        return snap
+
+
+def add_write_listener(fn: Callable[[Path, str, Dict[str, Any]], None]):
+    _write_listeners.append(fn)
+
+
+def remove_write_listener(fn: Callable[[Path, str, Dict[str, Any]], None]):
+    _write_listeners.remove(fn)
+
+
+def _notify_write(path: Path, table: str, row: Dict[str, Any]):
+    snap = _snapshots.get(path)
+    if snap is not None:
+        snap.notify_write()
+    for fn in list(_write_listeners):
+        fn(path, table, row)
+
+
+# ---- write path ----
+
+def enable_group_commit(max_batch: int = 64, max_wait: float = 0.002):
+    """
+    Batch concurrent create_ticket / update_customer calls into one
+    transaction (one commit) per database file.
+    """
+    global _group_commit_config
+    disable_group_commit()
+    _group_commit_config = {"max_batch": max_batch, "max_wait": max_wait}
+
+
+def disable_group_commit():
+    """Flush and stop the group-commit writer; writes commit individually again."""
+    global _group_commit_config, _write_queue
+    _group_commit_config = None
+    with _write_queue_lock:
+        wq, _write_queue = _write_queue, None
+    if wq is not None:
+        wq.close()
+
+
+def _get_write_queue():
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None and _group_commit_config is not None:
+            from .write_queue import WriteQueue
+
+            _write_queue = WriteQueue(**_group_commit_config)
+        return _write_queue
+
+
+def _execute_write(path: Path, table: str, sql: str, params) -> Optional[Dict[str, Any]]:
+    """Run one `... RETURNING *` statement and commit it; returns the row."""
+    wq = _get_write_queue()
+    if wq is not None:
+        row = wq.submit(path, sql, params).result()
+    else:
+        conn = get_connection(path)
+        try:
+            found = conn.execute(sql, params).fetchall()
+            row = dictify(found[0]) if found else None
+            conn.commit()
+        finally:
+            conn.close()
+
+    if row is not None:
+        _notify_write(path, table, row)
+    return row
+
+
+# ---- shard routing ----
+
+def _customer_db(customer_id: int) -> Path:
+    """Database file holding this customer (and its tickets)."""
+    if sharding.is_enabled():
+        return sharding.shard_path(DB_PATH, sharding.shard_for(customer_id))
+    return DB_PATH
+
+
+def _fetch_all(path: Path, sql: str, params=()) -> List[Dict[str, Any]]:
+    snap = _snapshot_for(path)
+    if snap is not None:
+        return snap.query(sql, params)
+
+    conn = get_connection(path)
+    try:
+        return [dictify(r) for r in conn.execute(sql, params).fetchall()]
+    finally:
+        conn.close()
+
+
+def _gather_by_id(sql: str, params=(), limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run `sql` (which must ORDER BY id) on every shard in parallel and
+    merge the per-shard results back into id order.
+    """
+    paths = sharding.layout_paths(DB_PATH)
+    runs = sharding.scatter(paths, lambda p: _fetch_all(p, sql, params))
+    merged = heapq.merge(*runs, key=lambda r: r["id"])
+    return list(islice(merged, limit)) if limit is not None else list(merged)
+
+
+# Max ids bound into one IN (...) list (SQLITE_MAX_VARIABLE_NUMBER is 999 on old builds)
+IN_CHUNK_SIZE = 500
+
+
+def _ids_by_db(customer_ids: List[int]) -> Dict[Path, List[int]]:
+    """Deduplicated customer ids grouped by the database file holding them."""
+    by_path: Dict[Path, List[int]] = {}
+    seen = set()
+    for cid in customer_ids:
+        cid = int(cid)
+        if cid not in seen:
+            seen.add(cid)
+            by_path.setdefault(_customer_db(cid), []).append(cid)
+    return by_path
+
+
+def _fetch_in(path: Path, sql: str, ids: List[int], params=()) -> List[Dict[str, Any]]:
+    """
+    Run `sql` once per chunk of `ids`. `{ids}` in the statement is replaced
+    by the chunk's placeholders (`{values}` by "(?), (?), ..."); `params`
+    are bound after the ids.
+    """
+    rows: List[Dict[str, Any]] = []
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        chunk = ids[i:i + IN_CHUNK_SIZE]
+        statement = sql.format(
+            ids=", ".join("?" for _ in chunk), values=", ".join("(?)" for _ in chunk)
+        )
+        rows.extend(_fetch_all(path, statement, [*chunk, *params]))
+    return rows
+
+
+def _scatter_ids(customer_ids: List[int], sql: str, params=()) -> List[Dict[str, Any]]:
+    """_fetch_in on every shard that holds one of `customer_ids`, in parallel."""
+    by_path = _ids_by_db(customer_ids)
+    runs = sharding.scatter(list(by_path), lambda p: _fetch_in(p, sql, by_path[p], params))
+    return [row for run in runs for row in run]
+
+
+# ---- SQL ----
+# Every statement the tools run, by name. "{ids}" is replaced by a chunk of
+# IN (...) placeholders ("{values}" by a VALUES list of the same ids) and
+# "{set_clause}" by the updated columns.
+# tests/test_query_plans.py checks each one with EXPLAIN QUERY PLAN, so a
+# new query needs an entry here and an index that serves it.
+
+GET_CUSTOMER = "SELECT * FROM customers WHERE id = ?"
+GET_CUSTOMERS = "SELECT * FROM customers WHERE id IN ({ids})"
+LIST_CUSTOMERS = "SELECT * FROM customers ORDER BY id LIMIT ?"
+LIST_CUSTOMERS_BY_STATUS = "SELECT * FROM customers WHERE status = ? ORDER BY id LIMIT ?"
+# Contact lookups; each binds two spellings of the value (see find_customers_by_*)
+FIND_CUSTOMERS_BY_EMAIL = "SELECT * FROM customers WHERE email IN (?, ?)"
+FIND_CUSTOMERS_BY_PHONE = f"SELECT * FROM customers WHERE {PHONE_DIGITS} IN (?, ?)"
+UPDATE_CUSTOMER = (
+    "UPDATE customers SET {set_clause}, updated_at=CURRENT_TIMESTAMP, version = version + 1 "
+    "WHERE id = ? RETURNING *"
+)
+
+CREATE_TICKET = """
+    INSERT INTO tickets (customer_id, issue, status, priority, created_at)
+    VALUES (?, ?, 'open', ?, CURRENT_TIMESTAMP)
+    RETURNING *
+"""
+# Sharded: shard s only hands out ids with id % SHARD_COUNT == s, above its
+# AUTOINCREMENT high-water mark (reshard() sets that to the global max).
+CREATE_TICKET_SHARDED = """
+    INSERT INTO tickets (id, customer_id, issue, status, priority, created_at)
+    SELECT base + CASE WHEN base <= m THEN ? ELSE 0 END, ?, ?, 'open', ?, CURRENT_TIMESTAMP
+    FROM (SELECT m, (m / ?) * ? + ? AS base
+          FROM (SELECT COALESCE(MAX(seq), 0) AS m
+                FROM sqlite_sequence WHERE name = 'tickets'))
+    RETURNING *
+"""
+UPDATE_TICKET_STATUS = "UPDATE tickets SET status = ? WHERE id = ? RETURNING *"
+
+GET_CUSTOMER_HISTORY = "SELECT * FROM tickets WHERE customer_id = ? ORDER BY created_at DESC, id DESC"
+GET_CUSTOMER_HISTORIES = "SELECT * FROM tickets WHERE customer_id IN ({ids})"
+# Newest N per customer: a LIMITed index probe per id. (A ROW_NUMBER()
+# window would number every ticket of the customer before filtering.)
+GET_CUSTOMER_HISTORIES_LIMITED = """
+    WITH ids(cid) AS (VALUES {values})
+    SELECT t.* FROM ids JOIN tickets t ON t.id IN (
+        SELECT id FROM tickets WHERE customer_id = ids.cid
+        ORDER BY created_at DESC, id DESC LIMIT ?
+    )
+"""
+# Cold partition (resolved tickets moved by archive.py); same shapes as above
+# Both sides come out of their (customer_id, created_at DESC, id DESC)
+# index already ordered; SQLite merges them without sorting
+GET_MERGED_HISTORY = """
+    SELECT * FROM tickets WHERE customer_id = ?
+    UNION ALL
+    SELECT * FROM tickets_archive WHERE customer_id = ?
+    ORDER BY created_at DESC, id DESC
+"""
+GET_ARCHIVED_HISTORIES = "SELECT * FROM tickets_archive WHERE customer_id IN ({ids})"
+GET_ARCHIVED_HISTORIES_LIMITED = """
+    WITH ids(cid) AS (VALUES {values})
+    SELECT t.* FROM ids JOIN tickets_archive t ON t.id IN (
+        SELECT id FROM tickets_archive WHERE customer_id = ids.cid
+        ORDER BY created_at DESC, id DESC LIMIT ?
+    )
+"""
+LIST_OPEN_TICKETS = "SELECT * FROM tickets WHERE customer_id IN ({ids}) AND status = 'open'"
+LIST_OPEN_TICKETS_BY_PRIORITY = LIST_OPEN_TICKETS + " AND priority = ?"
+
+QUERIES: Dict[str, str] = {
+    "get_customer": GET_CUSTOMER,
+    "get_customers": GET_CUSTOMERS,
+    "list_customers": LIST_CUSTOMERS,
+    "list_customers_by_status": LIST_CUSTOMERS_BY_STATUS,
+    "find_customers_by_email": FIND_CUSTOMERS_BY_EMAIL,
+    "find_customers_by_phone": FIND_CUSTOMERS_BY_PHONE,
+    "update_customer": UPDATE_CUSTOMER,
+    "create_ticket": CREATE_TICKET,
+    "create_ticket_sharded": CREATE_TICKET_SHARDED,
+    "update_ticket_status": UPDATE_TICKET_STATUS,
+    "get_customer_history": GET_CUSTOMER_HISTORY,
+    "get_customer_histories": GET_CUSTOMER_HISTORIES,
+    "get_customer_histories_limited": GET_CUSTOMER_HISTORIES_LIMITED,
+    "get_merged_history": GET_MERGED_HISTORY,
+    "get_archived_histories": GET_ARCHIVED_HISTORIES,
+    "get_archived_histories_limited": GET_ARCHIVED_HISTORIES_LIMITED,
+    "list_open_tickets": LIST_OPEN_TICKETS,
+    "list_open_tickets_by_priority": LIST_OPEN_TICKETS_BY_PRIORITY,
+}
+
+
 # ---- MCP tools core logic ----
 
-def get_customer(customer_id: int) -> Optional[Dict[str, Any]]:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM customers WHERE id = ?", (customer_id,))
-    row = cur.fetchone()
-    conn.close()
-    return dictify(row) if row else None
+def not_modified(customer: Dict[str, Any]) -> Dict[str, Any]:
+    """Reply to a conditional read whose known version is still current."""
+    return {"id": customer["id"], "version": customer["version"], "not_modified": True}
+
+
+def is_not_modified(result: Optional[Dict[str, Any]]) -> bool:
+    return bool(result) and result.get("not_modified", False)
+
+
+def get_customer(customer_id: int, known_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Customer row, or None if it doesn't exist. With `known_version` (the
+    `version` of a copy the caller already has) an unchanged row comes back
+    as the small not_modified() reply instead.
+    """
+    rows = _fetch_all(_customer_db(customer_id), GET_CUSTOMER, (customer_id,))
+    if not rows:
+        return None
+    if known_version is not None and rows[0].get("version") == known_version:
+        return not_modified(rows[0])
+    return rows[0]
 
 
 def list_customers(status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    cur = conn.cursor()
     if status:
-        cur.execute(
-            "SELECT * FROM customers WHERE status = ? ORDER BY id LIMIT ?",
-            (status, limit),
-        )
-    else:
-        cur.execute("SELECT * FROM customers ORDER BY id LIMIT ?", (limit,))
-    rows = cur.fetchall()
-    conn.close()
-    return [dictify(r) for r in rows]
+        return _gather_by_id(LIST_CUSTOMERS_BY_STATUS, (status, limit), limit)
+    return _gather_by_id(LIST_CUSTOMERS, (limit,), limit)
+
+
+def _find_customers(sql: str, params) -> List[Dict[str, Any]]:
+    # Contacts say nothing about the shard: ask every one (an index probe each)
+    paths = sharding.layout_paths(DB_PATH)
+    runs = sharding.scatter(paths, lambda p: _fetch_all(p, sql, params))
+    return sorted((row for run in runs for row in run), key=lambda r: r["id"])
+
+
+def find_customers_by_email(email: str) -> List[Dict[str, Any]]:
+    """Customers with this email (as given or lower-cased), by id."""
+    email = email.strip()
+    return _find_customers(FIND_CUSTOMERS_BY_EMAIL, (email, email.lower()))
+
+
+# Fewer digits than this can't identify a phone number
+MIN_PHONE_DIGITS = 7
+
+
+def phone_digits(phone: str) -> str:
+    return "".join(ch for ch in phone if ch.isdigit())
+
+
+def find_customers_by_phone(phone: str) -> List[Dict[str, Any]]:
+    """
+    Customers whose phone has the same digits, whatever the formatting
+    ("+1 (555) 0105" matches "+1-555-0105"). A number given without the
+    leading country code 1 also matches with it, and vice versa.
+    """
+    digits = phone_digits(phone)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return []
+    other = digits[1:] if digits.startswith("1") else "1" + digits
+    return _find_customers(FIND_CUSTOMERS_BY_PHONE, (digits, other))
 
 
 def update_customer(customer_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -54,45 +386,121 @@ def update_customer(customer_id: int, data: Dict[str, Any]) -> Optional[Dict[str
     if not fields:
         return get_customer(customer_id)
 
-    conn = get_connection()
-    cur = conn.cursor()
-
     set_clause = ", ".join([f"{f} = ?" for f in fields])
     values = [data[f] for f in fields]
     values.append(customer_id)
 
-    cur.execute(f"UPDATE customers SET {set_clause}, updated_at=CURRENT_TIMESTAMP WHERE id = ?", values)
-    conn.commit()
-    conn.close()
-
-    return get_customer(customer_id)
+    return _execute_write(
+        _customer_db(customer_id),
+        "customers",
+        UPDATE_CUSTOMER.format(set_clause=set_clause),
+        values,
+    )
 
 
 def create_ticket(customer_id: int, issue: str, priority: str = "medium") -> Dict[str, Any]:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO tickets (customer_id, issue, status, priority, created_at)
-        VALUES (?, ?, 'open', ?, CURRENT_TIMESTAMP)
-        """,
-        (customer_id, issue, priority),
-    )
-    ticket_id = cur.lastrowid
-    conn.commit()
-    cur.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-    row = cur.fetchone()
-    conn.close()
-    return dictify(row)
-
-
-def get_customer_history(customer_id: int) -> List[Dict[str, Any]]:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM tickets WHERE customer_id = ? ORDER BY created_at DESC",
-        (customer_id,),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return [dictify(r) for r in rows]
+    if sharding.is_enabled():
+        # Ticket ids must stay unique across shards (see CREATE_TICKET_SHARDED)
+        n, s = sharding.SHARD_COUNT, sharding.shard_for(customer_id)
+        sql = CREATE_TICKET_SHARDED
+        params = (n, customer_id, issue, priority, n, n, s)
+    else:
+        sql = CREATE_TICKET
+        params = (customer_id, issue, priority)
+    return _execute_write(_customer_db(customer_id), "tickets", sql, params)
+
+
+def update_ticket_status(
+    ticket_id: int,
+    status: str,
+    customer_id: Optional[int] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Set a ticket's status ('open', 'in_progress', 'resolved'); returns the
+    updated ticket or None if it does not exist. In sharded mode, passing
+    the owning customer_id avoids trying every shard.
+    """
+    if customer_id is not None:
+        paths = [_customer_db(customer_id)]
+    else:
+        paths = sharding.layout_paths(DB_PATH)
+    for path in paths:
+        row = _execute_write(path, "tickets", UPDATE_TICKET_STATUS, (status, ticket_id))
+        if row is not None:
+            return row
+    return None
+
+
+def _newest_first(ticket: Dict[str, Any]):
+    return ticket["created_at"], ticket["id"]
+
+
+def get_customer_history(customer_id: int, hot_only: bool = False) -> List[Dict[str, Any]]:
+    """
+    All tickets of a customer, newest first: the live `tickets` table merged
+    with archived ones (tickets_archive). `hot_only` skips the archive.
+    """
+    if hot_only:
+        return _fetch_all(_customer_db(customer_id), GET_CUSTOMER_HISTORY, (customer_id,))
+    return _fetch_all(_customer_db(customer_id), GET_MERGED_HISTORY, (customer_id, customer_id))
+
+
+def list_open_tickets_for_customers(
+    customer_ids: List[int],
+    priority: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Open tickets for the given customers, in ticket id order."""
+    if not customer_ids:
+        return []
+
+    if priority:
+        rows = _scatter_ids(customer_ids, LIST_OPEN_TICKETS_BY_PRIORITY, (priority,))
+    else:
+        rows = _scatter_ids(customer_ids, LIST_OPEN_TICKETS)
+    return sorted(rows, key=lambda r: r["id"])
+
+
+def get_customers(customer_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Bulk get_customer: one chunked IN query per shard instead of one query
+    per id. Customers come back in the order of `customer_ids`; unknown ids
+    are skipped and duplicates collapsed.
+    """
+    if not customer_ids:
+        return []
+    found = {r["id"]: r for r in _scatter_ids(customer_ids, GET_CUSTOMERS)}
+    return [found[cid] for cid in dict.fromkeys(int(c) for c in customer_ids) if cid in found]
+
+
+def get_customer_histories(
+    customer_ids: List[int],
+    per_customer_limit: Optional[int] = None,
+    hot_only: bool = False,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Bulk get_customer_history: {customer_id: tickets newest first} for every
+    requested id (empty list when a customer has no tickets). With
+    `per_customer_limit`, only the newest N tickets of each customer are
+    read (one LIMITed index probe per customer and table).
+    """
+    histories: Dict[int, List[Dict[str, Any]]] = {int(c): [] for c in customer_ids}
+    if not histories:
+        return histories
+
+    tables = [(GET_CUSTOMER_HISTORIES, GET_CUSTOMER_HISTORIES_LIMITED)]
+    if not hot_only:
+        tables.append((GET_ARCHIVED_HISTORIES, GET_ARCHIVED_HISTORIES_LIMITED))
+    rows = []
+    for all_sql, limited_sql in tables:
+        if per_customer_limit is None:
+            rows += _scatter_ids(list(histories), all_sql)
+        else:
+            rows += _scatter_ids(list(histories), limited_sql, (int(per_customer_limit),))
+
+    for row in rows:
+        histories[row["customer_id"]].append(row)
+    for tickets in histories.values():
+        tickets.sort(key=_newest_first, reverse=True)
+        if per_customer_limit is not None:
+            del tickets[per_customer_limit:]
+    return histories
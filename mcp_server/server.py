@@ -1,9 +1,10 @@
 # mcp_server/server.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
 from typing import Any, Dict, List, Optional
 
-from . import db
+from . import analytics, changes, db, triage, wire
 
 app = FastAPI(title="Customer MCP Server")
 
@@ -14,11 +15,12 @@ app = FastAPI(title="Customer MCP Server")
 TOOLS = {
     "get_customer": {
         "name": "get_customer",
-        "description": "Get a single customer by ID",
+        "description": "Get a single customer by ID (known_version: reply not_modified if unchanged)",
         "input_schema": {
             "type": "object",
             "properties": {
-                "customer_id": {"type": "integer"}
+                "customer_id": {"type": "integer"},
+                "known_version": {"type": "integer"}
             },
             "required": ["customer_id"]
         },
@@ -35,6 +37,28 @@ TOOLS = {
             "required": []
         },
     },
+    "find_customer_by_email": {
+        "name": "find_customer_by_email",
+        "description": "Customers with this email address (indexed lookup)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "email": {"type": "string"}
+            },
+            "required": ["email"]
+        },
+    },
+    "find_customer_by_phone": {
+        "name": "find_customer_by_phone",
+        "description": "Customers with this phone number, ignoring formatting (indexed lookup)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "phone": {"type": "string"}
+            },
+            "required": ["phone"]
+        },
+    },
     "update_customer": {
         "name": "update_customer",
         "description": "Update customer fields",
@@ -62,15 +86,110 @@ TOOLS = {
     },
     "get_customer_history": {
         "name": "get_customer_history",
-        "description": "Get ticket history for a customer",
+        "description": "Get ticket history for a customer (hot_only: skip archived tickets)",
         "input_schema": {
             "type": "object",
             "properties": {
-                "customer_id": {"type": "integer"}
+                "customer_id": {"type": "integer"},
+                "hot_only": {"type": "boolean"}
             },
             "required": ["customer_id"]
         },
     },
+    "get_customers": {
+        "name": "get_customers",
+        "description": "Get several customers by ID in one call",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "customer_ids": {"type": "array", "items": {"type": "integer"}}
+            },
+            "required": ["customer_ids"]
+        },
+    },
+    "list_open_tickets_for_customers": {
+        "name": "list_open_tickets_for_customers",
+        "description": "Open tickets of several customers, optionally filtered by priority",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "customer_ids": {"type": "array", "items": {"type": "integer"}},
+                "priority": {"type": "string"}
+            },
+            "required": ["customer_ids"]
+        },
+    },
+    "get_customer_histories": {
+        "name": "get_customer_histories",
+        "description": "Get ticket histories for several customers, grouped by customer ID",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "customer_ids": {"type": "array", "items": {"type": "integer"}},
+                "per_customer_limit": {"type": "integer"},
+                "hot_only": {"type": "boolean"}
+            },
+            "required": ["customer_ids"]
+        },
+    },
+    "update_ticket_status": {
+        "name": "update_ticket_status",
+        "description": "Set a ticket's status (open, in_progress, resolved)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "ticket_id": {"type": "integer"},
+                "status": {"type": "string"},
+                "customer_id": {"type": "integer"}
+            },
+            "required": ["ticket_id", "status"]
+        },
+    },
+    "get_triage_queue": {
+        "name": "get_triage_queue",
+        "description": "Open tickets to handle first (highest priority, then oldest)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer"},
+                "priority": {"type": "string"},
+                "customer_id": {"type": "integer"}
+            },
+            "required": []
+        },
+    },
+    "get_backlog_stats": {
+        "name": "get_backlog_stats",
+        "description": "Open / in-progress ticket counts and age percentiles (days) per priority",
+        "input_schema": {"type": "object", "properties": {}, "required": []},
+    },
+    "get_customer_ticket_distribution": {
+        "name": "get_customer_ticket_distribution",
+        "description": "Tickets per customer: mean, percentiles, histogram and top customers "
+                       "(status: open / in_progress / resolved / backlog)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "status": {"type": "string"},
+                "top": {"type": "integer"}
+            },
+            "required": []
+        },
+    },
+    "get_changes": {
+        "name": "get_changes",
+        "description": "Customer / ticket changes after a sequence number (long-poll with wait_seconds)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "since_seq": {"type": "integer"},
+                "limit": {"type": "integer"},
+                "wait_seconds": {"type": "number"},
+                "shard": {"type": "integer"}
+            },
+            "required": []
+        },
+    },
 }
 
 
@@ -109,11 +228,46 @@ def list_tools():
     return {"tools": list(TOOLS.values())}
 
 
+def customer_etag(customer: Dict[str, Any]) -> str:
+    return f'"c{customer["id"]}-v{customer["version"]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): ignore W/ prefixes
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in tags
+
+
+@app.get("/customers/{customer_id}")
+def get_customer_http(customer_id: int, request: Request):
+    """
+    Plain HTTP read of one customer with an ETag (row version). Send the
+    ETag back in If-None-Match to get an empty 304 while it is unchanged.
+    """
+    customer = db.get_customer(customer_id)
+    if customer is None:
+        raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
+    headers = {"ETag": customer_etag(customer), "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    content_type = wire.negotiate(request.headers.get("accept"))
+    return Response(wire.encode(customer, content_type), media_type=content_type, headers=headers)
+
+
 @app.post("/tools/call", response_model=JsonRpcResponse)
-def call_tool(request: JsonRpcRequest):
+async def call_tool(http_request: Request):
     """
     JSON-RPC style MCP tool call.
 
+    Request and response bodies are JSON by default. A client that sends
+    `Accept: application/vnd.a2a-mcp+msgpack` gets the response in the
+    binary wire format (mcp_server.wire) and may send its request in it
+    too (Content-Type). JSON is used whenever msgpack is not installed.
+
     Request:
     {
       "jsonrpc": "2.0",
@@ -125,6 +279,18 @@ def call_tool(request: JsonRpcRequest):
       }
     }
     """
+    content_type = wire.negotiate(http_request.headers.get("accept"))
+    try:
+        payload = wire.decode(await http_request.body(), http_request.headers.get("content-type"))
+        request = JsonRpcRequest(**payload)
+    except (wire.WireFormatError, ValidationError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid request: {e}")
+
+    response = await run_in_threadpool(dispatch, request)
+    return Response(wire.encode(response.model_dump(), content_type), media_type=content_type)
+
+
+def dispatch(request: JsonRpcRequest) -> JsonRpcResponse:
     if request.method != "tools/call":
         raise HTTPException(status_code=400, detail="Invalid method")
 
@@ -140,13 +306,20 @@ def call_tool(request: JsonRpcRequest):
     try:
         if tool_name == "get_customer":
             cid = int(args["customer_id"])
-            result = db.get_customer(cid)
+            known = args.get("known_version")
+            result = db.get_customer(cid, known_version=int(known) if known is not None else None)
 
         elif tool_name == "list_customers":
             status = args.get("status")
             limit = int(args.get("limit", 50))
             result = db.list_customers(status=status, limit=limit)
 
+        elif tool_name == "find_customer_by_email":
+            result = db.find_customers_by_email(str(args["email"]))
+
+        elif tool_name == "find_customer_by_phone":
+            result = db.find_customers_by_phone(str(args["phone"]))
+
         elif tool_name == "update_customer":
             cid = int(args["customer_id"])
             data = args.get("data") or {}
@@ -160,7 +333,55 @@ def call_tool(request: JsonRpcRequest):
 
         elif tool_name == "get_customer_history":
             cid = int(args["customer_id"])
-            result = db.get_customer_history(cid)
+            result = db.get_customer_history(cid, hot_only=bool(args.get("hot_only", False)))
+
+        elif tool_name == "get_customers":
+            ids = [int(c) for c in args["customer_ids"]]
+            result = db.get_customers(ids)
+
+        elif tool_name == "get_customer_histories":
+            ids = [int(c) for c in args["customer_ids"]]
+            limit = args.get("per_customer_limit")
+            result = db.get_customer_histories(
+                ids, per_customer_limit=int(limit) if limit is not None else None,
+                hot_only=bool(args.get("hot_only", False)),
+            )
+
+        elif tool_name == "list_open_tickets_for_customers":
+            ids = [int(c) for c in args["customer_ids"]]
+            result = db.list_open_tickets_for_customers(ids, priority=args.get("priority"))
+
+        elif tool_name == "update_ticket_status":
+            cid = args.get("customer_id")
+            result = db.update_ticket_status(
+                int(args["ticket_id"]), str(args["status"]),
+                customer_id=int(cid) if cid is not None else None,
+            )
+
+        elif tool_name == "get_triage_queue":
+            cid = args.get("customer_id")
+            result = triage.get_index().top(
+                int(args.get("limit", 10)),
+                priority=args.get("priority"),
+                customer_id=int(cid) if cid is not None else None,
+            )
+
+        elif tool_name == "get_backlog_stats":
+            result = analytics.get_index().backlog_stats()
+
+        elif tool_name == "get_customer_ticket_distribution":
+            result = analytics.get_index().customer_ticket_distribution(
+                args.get("status"), top=int(args.get("top", 10))
+            )
+
+        elif tool_name == "get_changes":
+            shard = args.get("shard")
+            result = changes.get_changes(
+                int(args.get("since_seq", 0)),
+                limit=int(args.get("limit", 100)),
+                wait_seconds=min(float(args.get("wait_seconds", 0.0)), 30.0),
+                shard=int(shard) if shard is not None else None,
+            )
 
         else:
             result = None
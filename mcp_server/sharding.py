@@ -0,0 +1,211 @@
+# mcp_server/sharding.py
+"""
+Hash sharding of the customer database across N SQLite files.
+
+A customer and all of its tickets live in shard `shard_for(customer_id)`,
+so single-customer tools touch exactly one file and writes to different
+shards no longer queue behind one SQLite writer lock.
+
+Shard files sit next to the base database:
+
+    customers.db  ->  customers.shard0of4.db, customers.shard1of4.db, ...
+
+The shard count is read from MCP_DB_SHARDS (default 1 = no sharding) and
+can be changed at runtime with configure(). Existing data is moved
+between layouts with reshard():
+
+    python -m mcp_server.sharding reshard --from 1 --to 4
+"""
+
+import os
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+SHARD_COUNT = int(os.getenv("MCP_DB_SHARDS", "1"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def configure(count: int):
+    """Set the number of shards used by mcp_server.db."""
+    global SHARD_COUNT
+    if count < 1:
+        raise ValueError("Shard count must be >= 1")
+    SHARD_COUNT = count
+
+
+def is_enabled() -> bool:
+    return SHARD_COUNT > 1
+
+
+def shard_for(customer_id: int, count: int = None) -> int:
+    """Stable hash of customer_id -> shard index."""
+    count = count or SHARD_COUNT
+    return zlib.crc32(str(int(customer_id)).encode()) % count
+
+
+def shard_path(base: Path, index: int, count: int = None) -> Path:
+    count = count or SHARD_COUNT
+    base = Path(base)
+    return base.with_name(f"{base.stem}.shard{index}of{count}{base.suffix}")
+
+
+def layout_paths(base: Path, count: int = None) -> List[Path]:
+    """All database files for a layout (the base file itself when count == 1)."""
+    count = count or SHARD_COUNT
+    if count == 1:
+        return [Path(base)]
+    return [shard_path(base, i, count) for i in range(count)]
+
+
+def scatter(paths: Sequence[Path], fn: Callable[[Path], T]) -> List[T]:
+    """Run fn(path) for every path in parallel; results in path order."""
+    if len(paths) == 1:
+        return [fn(paths[0])]
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="shard")
+    return list(_executor.map(fn, paths))
+
+
+def ensure_shards(base: Path, count: int = None):
+    """Create schema (tables, indexes, triggers) in every shard file."""
+    from .database_setup import DatabaseSetup
+
+    for path in layout_paths(base, count):
+        setup = DatabaseSetup(str(path))
+        setup.connect()
+        try:
+            setup.create_tables()
+            setup.create_triggers()
+        finally:
+            setup.close()
+
+
+# ------------------------------------------------------
+# Resharding
+# ------------------------------------------------------
+def _copy_table(src: sqlite3.Connection, dsts: List[sqlite3.Connection], table: str,
+                key: str, count: int, batch_size: int):
+    cur = src.execute(f"SELECT * FROM {table} ORDER BY id")
+    columns = [d[0] for d in cur.description]
+    key_idx = columns.index(key)
+    insert = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    moved = 0
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return moved
+        buckets = [[] for _ in dsts]
+        for row in rows:
+            buckets[shard_for(row[key_idx], count) if count > 1 else 0].append(row)
+        for conn, bucket in zip(dsts, buckets):
+            if bucket:
+                conn.executemany(insert, bucket)
+        moved += len(rows)
+
+
+def _align_sequences(conns: List[sqlite3.Connection], table: str, *id_tables: str):
+    """
+    Raise every shard's AUTOINCREMENT counter to the global max id so that
+    ids handed out after resharding can never collide with copied rows.
+    `id_tables` share the id space without a sequence of their own
+    (tickets_archive keeps the ids of the tickets moved into it).
+    """
+    high = 0
+    for conn in conns:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        high = max(high, row[0] if row else 0)
+        for name in (table,) + id_tables:
+            high = max(high, conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {name}").fetchone()[0])
+    for conn in conns:
+        if conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (high, table)).rowcount == 0:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, high))
+
+
+def reshard(base: Path, src_count: int, dst_count: int, batch_size: int = 1000):
+    """
+    Copy all customers and tickets from the src_count layout into a fresh
+    dst_count layout. The source files are left untouched; switch over with
+    configure(dst_count) / MCP_DB_SHARDS once this returns.
+
+    Returns {"customers": n, "tickets": n, "tickets_archive": n}.
+    """
+    if src_count == dst_count:
+        raise ValueError("Source and destination shard counts are the same")
+
+    dst_paths = layout_paths(base, dst_count)
+    for path in dst_paths:
+        if path.exists():
+            conn = sqlite3.connect(path)
+            try:
+                has_rows = conn.execute(
+                    "SELECT name FROM sqlite_master WHERE name = 'customers'"
+                ).fetchone() and conn.execute("SELECT 1 FROM customers LIMIT 1").fetchone()
+            finally:
+                conn.close()
+            if has_rows:
+                raise ValueError(f"Destination shard already holds data: {path}")
+
+    ensure_shards(base, dst_count)
+
+    dsts = [sqlite3.connect(p) for p in dst_paths]
+    totals = {"customers": 0, "tickets": 0, "tickets_archive": 0}
+    try:
+        for src_path in layout_paths(base, src_count):
+            src = sqlite3.connect(src_path)
+            try:
+                totals["customers"] += _copy_table(src, dsts, "customers", "id", dst_count, batch_size)
+                totals["tickets"] += _copy_table(src, dsts, "tickets", "customer_id", dst_count, batch_size)
+                if src.execute("SELECT 1 FROM sqlite_master WHERE name = 'tickets_archive'").fetchone():
+                    totals["tickets_archive"] += _copy_table(
+                        src, dsts, "tickets_archive", "customer_id", dst_count, batch_size
+                    )
+            finally:
+                src.close()
+        _align_sequences(dsts, "customers")
+        _align_sequences(dsts, "tickets", "tickets_archive")
+        for conn in dsts:
+            conn.commit()
+    finally:
+        for conn in dsts:
+            conn.close()
+    return totals
+
+
+def main(argv=None):
+    import argparse
+
+    from .db import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Customer DB shard tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rs = sub.add_parser("reshard", help="Copy data into a new shard layout")
+    rs.add_argument("--from", dest="src", type=int, default=SHARD_COUNT)
+    rs.add_argument("--to", dest="dst", type=int, required=True)
+    rs.add_argument("--db", default=str(DB_PATH), help="Base database path")
+    rs.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    totals = reshard(Path(args.db), args.src, args.dst, batch_size=args.batch_size)
+    print(
+        f"Resharded {totals['customers']} customers / {totals['tickets']} tickets "
+        f"from {args.src} to {args.dst} shard(s). Set MCP_DB_SHARDS={args.dst} to use them."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# mcp_server/snapshot.py
+"""
+In-memory read snapshot of an on-disk SQLite database.
+
+The database file is copied into a private `:memory:` database with the
+SQLite backup API and read tools are answered from that copy. Writes keep
+going to disk; afterwards the snapshot is marked dirty and a background
+thread takes a new copy, while reads keep being answered from the
+previous one. Many writes during one copy are picked up by a single next
+copy.
+
+Staleness is bounded by `max_staleness` seconds: a read never sees a copy
+that misses a write committed (through mcp_server.db) more than that ago,
+nor a copy older than that (this is what bounds lag behind writes made by
+*other* processes). Only when a copy would break that bound does the
+reader take a new one itself (max_staleness=0: every read does, so a
+process always reads its own writes). With `refresh_interval` set, the
+background thread also refreshes periodically, so age-based refreshes
+stay out of the read path too.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class ReadSnapshot:
+    def __init__(
+        self,
+        path: Path,
+        max_staleness: float = 1.0,
+        refresh_interval: Optional[float] = None,
+    ):
+        self.path = Path(path)
+        self.max_staleness = max_staleness
+        self.refresh_interval = refresh_interval
+
+        self.refreshes = 0
+        self.sync_refreshes = 0                # refreshes a reader had to wait for
+        self._conn: Optional[sqlite3.Connection] = None
+        self._loaded_at = 0.0
+        self._dirty_since: Optional[float] = None   # first write the copy does not have
+        self._lock = threading.Lock()          # guards _conn while querying / swapping
+        self._refresh_lock = threading.Lock()  # one backup at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._refresh_loop, name=f"snapshot-{self.path.name}", daemon=True
+        )
+        self._thread.start()
+
+    # ------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------
+    def refresh(self):
+        """Copy the disk database into a new in-memory database and swap it in."""
+        with self._refresh_lock:
+            self._refresh()
+
+    def _refresh(self):
+        started = time.monotonic()
+        src = sqlite3.connect(self.path)
+        mem = sqlite3.connect(":memory:", check_same_thread=False)
+        try:
+            src.backup(mem)
+        finally:
+            src.close()
+        mem.row_factory = sqlite3.Row
+
+        with self._lock:
+            old, self._conn = self._conn, mem
+            self._loaded_at = started
+            # Writes committed after the copy started are still missing
+            if self._dirty_since is not None and self._dirty_since <= started:
+                self._dirty_since = None
+        if old is not None:
+            old.close()
+        self.refreshes += 1
+
+    def notify_write(self):
+        """Called after a committed write to the underlying file."""
+        with self._lock:
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+        self._wake.set()
+
+    def is_stale(self) -> bool:
+        """True if the current copy may no longer be served."""
+        now = time.monotonic()
+        dirty_since = self._dirty_since
+        return (
+            self._conn is None
+            or now - self._loaded_at > self.max_staleness
+            or (dirty_since is not None and now - dirty_since >= self.max_staleness)
+        )
+
+    def _refresh_loop(self):
+        while True:
+            self._wake.wait(self.refresh_interval)
+            if self._stop.is_set():
+                return
+            self._wake.clear()
+            if self._dirty_since is None and not self.refresh_interval:
+                continue
+            try:
+                self.refresh()
+            except sqlite3.Error as e:
+                print(f"[ReadSnapshot] refresh of {self.path} failed: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------
+    def query(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        if self.is_stale():
+            with self._refresh_lock:
+                # Another reader (or the background thread) may have just refreshed
+                if self.is_stale():
+                    self._refresh()
+                    self.sync_refreshes += 1
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{k: r[k] for k in r.keys()} for r in rows]
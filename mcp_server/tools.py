@@ -8,14 +8,14 @@ as MCP tools (e.g. with decorators from your course framework).
 
 from typing import Any, Dict, List, Optional
 
-from . import db
+from . import analytics, changes, db, triage
 
 
 # Required by assignment:
 
-def get_customer(customer_id: int) -> Optional[Dict[str, Any]]:
-    """Tool: get_customer(customer_id)"""
-    return db.get_customer(customer_id)
+def get_customer(customer_id: int, known_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Tool: get_customer(customer_id, known_version) — {"not_modified": true, ...} if unchanged"""
+    return db.get_customer(customer_id, known_version=known_version)
 
 
 def list_customers(status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
@@ -23,6 +23,16 @@ def list_customers(status: Optional[str] = None, limit: int = 50) -> List[Dict[s
     return db.list_customers(status=status, limit=limit)
 
 
+def find_customer_by_email(email: str) -> List[Dict[str, Any]]:
+    """Tool: find_customer_by_email(email) — matching customers (usually one)"""
+    return db.find_customers_by_email(email)
+
+
+def find_customer_by_phone(phone: str) -> List[Dict[str, Any]]:
+    """Tool: find_customer_by_phone(phone) — matching customers, any formatting"""
+    return db.find_customers_by_phone(phone)
+
+
 def update_customer(customer_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Tool: update_customer(customer_id, data)"""
     return db.update_customer(customer_id, data)
@@ -37,9 +47,25 @@ def create_ticket(
     return db.create_ticket(customer_id=customer_id, issue=issue, priority=priority)
 
 
-def get_customer_history(customer_id: int) -> List[Dict[str, Any]]:
-    """Tool: get_customer_history(customer_id)"""
-    return db.get_customer_history(customer_id)
+def get_customer_history(customer_id: int, hot_only: bool = False) -> List[Dict[str, Any]]:
+    """Tool: get_customer_history(customer_id, hot_only)"""
+    return db.get_customer_history(customer_id, hot_only=hot_only)
+
+
+# Bulk variants (one query per shard instead of one call per customer):
+
+def get_customers(customer_ids: List[int]) -> List[Dict[str, Any]]:
+    """Tool: get_customers(customer_ids)"""
+    return db.get_customers(customer_ids)
+
+
+def get_customer_histories(
+    customer_ids: List[int],
+    per_customer_limit: Optional[int] = None,
+    hot_only: bool = False,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Tool: get_customer_histories(customer_ids, per_customer_limit, hot_only)"""
+    return db.get_customer_histories(customer_ids, per_customer_limit=per_customer_limit, hot_only=hot_only)
 
 
 # Extra helper tool for scenario 3 / complex queries:
@@ -49,3 +75,43 @@ def list_open_tickets_for_customers(
     priority: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     return db.list_open_tickets_for_customers(customer_ids=customer_ids, priority=priority)
+
+
+# Triage (open tickets by priority, then age):
+
+def update_ticket_status(ticket_id: int, status: str, customer_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Tool: update_ticket_status(ticket_id, status)"""
+    return db.update_ticket_status(ticket_id, status, customer_id=customer_id)
+
+
+def get_triage_queue(
+    limit: int = 10,
+    priority: Optional[str] = None,
+    customer_id: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Tool: get_triage_queue(limit, priority, customer_id)"""
+    return triage.get_index().top(limit, priority=priority, customer_id=customer_id)
+
+
+# Backlog analytics (NumPy column store):
+
+def get_backlog_stats() -> Dict[str, Any]:
+    """Tool: get_backlog_stats()"""
+    return analytics.get_index().backlog_stats()
+
+
+def get_customer_ticket_distribution(status: Optional[str] = None, top: int = 10) -> Dict[str, Any]:
+    """Tool: get_customer_ticket_distribution(status, top)"""
+    return analytics.get_index().customer_ticket_distribution(status, top=top)
+
+
+# Change feed (cross-process cache invalidation):
+
+def get_changes(
+    since_seq: int = 0,
+    limit: int = 100,
+    wait_seconds: float = 0.0,
+    shard: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Tool: get_changes(since_seq, limit, wait_seconds, shard)"""
+    return changes.get_changes(since_seq, limit=limit, wait_seconds=wait_seconds, shard=shard)
@@ -0,0 +1,231 @@
+# mcp_server/triage.py
+"""
+In-process triage index of open tickets.
+
+Open tickets are kept in binary heaps ordered by (priority, age):
+
+- one heap per priority of (created_at, id)         → priority filter
+- one heap per customer of (rank, created_at, id)   → per-customer filter
+
+The index is built once from the `tickets` table (all shards) and then
+kept current from db's write listeners: every create_ticket /
+update_ticket_status row is applied as it commits. Closed or re-keyed
+tickets are not removed from the heaps right away (lazy deletion); each
+heap entry carries a generation number and is skipped unless it matches
+the ticket's live generation. Heaps are rebuilt once stale entries
+outnumber live ones.
+
+top(k) walks a heap in sorted order without popping it (a frontier heap
+over the node indices), so a query costs O(K log K) plus the stale
+entries it steps over, instead of sorting N tickets.
+
+Only writes made through this process's db module are seen; other
+processes need their own index (or a rebuild).
+"""
+
+import heapq
+import itertools
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import db, sharding
+
+# Lower rank = triaged first
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+LOAD_OPEN_TICKETS = "SELECT * FROM tickets WHERE status = 'open'"
+
+QUERIES: Dict[str, str] = {"load_open_tickets": LOAD_OPEN_TICKETS}
+
+
+def _walk(heap: List[tuple], prune: Optional[Callable[[tuple], bool]] = None) -> Iterator[tuple]:
+    """
+    Yield heap entries in ascending order without modifying the heap.
+    `prune(entry)` stops the walk below an entry (its children are >= it).
+    """
+    if not heap:
+        return
+    frontier = [(heap[0], 0)]
+    while frontier:
+        entry, i = heapq.heappop(frontier)
+        if prune is not None and prune(entry):
+            continue
+        yield entry
+        for child in (2 * i + 1, 2 * i + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+
+
+class TriageIndex:
+    def __init__(self, compact_ratio: float = 1.0):
+        self.compact_ratio = compact_ratio
+
+        self._tickets: Dict[int, Dict[str, Any]] = {}  # open tickets by id
+        self._live: Dict[int, int] = {}                 # ticket id → live generation
+        self._by_priority: Dict[str, List[Tuple]] = {p: [] for p in PRIORITY_RANK}
+        self._by_customer: Dict[int, List[Tuple]] = {}
+        self._gen = itertools.count()
+        self._stale = 0
+        self._lock = threading.RLock()
+
+        self.source: Optional[Tuple[Path, int]] = None  # (DB_PATH, shard count) built from
+        self.updates = 0
+        self.compactions = 0
+        self._listening = False
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    # ------------------------------------------------------
+    # Build / change feed
+    # ------------------------------------------------------
+    def build(self) -> "TriageIndex":
+        """Load all open tickets and start following db writes."""
+        if not self._listening:
+            # Listen first: writes that land while we read are re-applied
+            # (idempotently) once the lock is released.
+            db.add_write_listener(self._on_write)
+            self._listening = True
+
+        with self._lock:
+            paths = sharding.layout_paths(db.DB_PATH)
+            runs = sharding.scatter(
+                paths, lambda p: db._fetch_all(p, LOAD_OPEN_TICKETS)
+            )
+            self._tickets = {t["id"]: t for run in runs for t in run}
+            self._rebuild_heaps()
+            self.source = (db.DB_PATH, sharding.SHARD_COUNT)
+        return self
+
+    def close(self):
+        if self._listening:
+            db.remove_write_listener(self._on_write)
+            self._listening = False
+
+    def _on_write(self, path: Path, table: str, row: Dict[str, Any]):
+        if table == "tickets":
+            self.apply(row)
+
+    def apply(self, ticket: Dict[str, Any]):
+        """Apply one committed ticket row (insert or status change)."""
+        with self._lock:
+            self.updates += 1
+            tid = ticket["id"]
+            current = self._tickets.get(tid)
+            if ticket["status"] != "open" or ticket["priority"] not in PRIORITY_RANK:
+                if current is not None:
+                    del self._tickets[tid]
+                    del self._live[tid]
+                    self._stale += 2
+                    self._maybe_compact()
+                return
+
+            if current is not None:
+                if (current["priority"], current["created_at"]) == (ticket["priority"], ticket["created_at"]):
+                    self._tickets[tid] = ticket
+                    return
+                self._stale += 2  # re-keyed: the old entries die with the old generation
+            self._tickets[tid] = ticket
+            self._push(ticket)
+            self._maybe_compact()
+
+    def _push(self, t: Dict[str, Any]):
+        gen = next(self._gen)
+        self._live[t["id"]] = gen
+        rank = PRIORITY_RANK[t["priority"]]
+        heapq.heappush(self._by_priority[t["priority"]], (t["created_at"], t["id"], gen))
+        heapq.heappush(self._by_customer.setdefault(t["customer_id"], []), (rank, t["created_at"], t["id"], gen))
+
+    def _rebuild_heaps(self):
+        self._live.clear()
+        self._by_priority = {p: [] for p in PRIORITY_RANK}
+        self._by_customer = {}
+        for t in self._tickets.values():
+            gen = next(self._gen)
+            self._live[t["id"]] = gen
+            self._by_priority[t["priority"]].append((t["created_at"], t["id"], gen))
+            self._by_customer.setdefault(t["customer_id"], []).append(
+                (PRIORITY_RANK[t["priority"]], t["created_at"], t["id"], gen)
+            )
+        for heap in itertools.chain(self._by_priority.values(), self._by_customer.values()):
+            heapq.heapify(heap)
+        self._stale = 0
+
+    def _maybe_compact(self):
+        if self._stale > 1024 and self._stale > self.compact_ratio * 2 * len(self._tickets):
+            self._rebuild_heaps()
+            self.compactions += 1
+
+    # ------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------
+    def _is_live(self, tid: int, gen: int) -> bool:
+        return self._live.get(tid) == gen
+
+    def top(
+        self,
+        k: int = 10,
+        priority: Optional[str] = None,
+        customer_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        The k open tickets to triage first: highest priority, then oldest.
+        Optionally only one priority and / or one customer.
+        """
+        if priority is not None and priority not in PRIORITY_RANK:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        result: List[Dict[str, Any]] = []
+        if k <= 0:
+            return result
+
+        with self._lock:
+            if customer_id is not None:
+                heap = self._by_customer.get(int(customer_id), [])
+                rank = PRIORITY_RANK.get(priority)
+                prune = (lambda e: e[0] > rank) if rank is not None else None
+                for r, _, tid, gen in _walk(heap, prune):
+                    if (rank is None or r == rank) and self._is_live(tid, gen):
+                        result.append(self._tickets[tid])
+                        if len(result) == k:
+                            break
+            else:
+                for p in [priority] if priority else PRIORITY_RANK:
+                    for _, tid, gen in _walk(self._by_priority[p]):
+                        if self._is_live(tid, gen):
+                            result.append(self._tickets[tid])
+                            if len(result) == k:
+                                return [dict(t) for t in result]
+        return [dict(t) for t in result]
+
+    def counts(self) -> Dict[str, int]:
+        """Open tickets per priority."""
+        with self._lock:
+            counts = {p: 0 for p in PRIORITY_RANK}
+            for t in self._tickets.values():
+                counts[t["priority"]] += 1
+            return counts
+
+
+_index: Optional[TriageIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> TriageIndex:
+    """Process-wide index, built on first use (and rebuilt if the DB layout changed)."""
+    global _index
+    with _index_lock:
+        if _index is None or _index.source != (db.DB_PATH, sharding.SHARD_COUNT):
+            if _index is not None:
+                _index.close()
+            _index = TriageIndex().build()
+        return _index
+
+
+def reset_index():
+    """Drop the process-wide index (it is rebuilt on next use)."""
+    global _index
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+        _index = None
@@ -0,0 +1,173 @@
+# mcp_server/wire.py
+"""
+Wire formats for tool results and A2AMessages crossing a process or
+network boundary.
+
+- JSON (`application/json`): always available, the fallback.
+- Binary (`application/vnd.a2a-mcp+msgpack`): MessagePack, only when the
+  optional `msgpack` package is installed. Each payload starts with a
+  4-byte header (b"A2W" + format version) so a reader can reject versions
+  it does not understand.
+
+In the binary format, lists of two or more dicts with the same keys (tool
+rows: customers, tickets, change_log entries) are stored column-wise as a
+msgpack extension: the keys once, then one array per column. Rows are
+rebuilt on decode, so callers see exactly what they encoded:
+
+    data = wire.encode(result, wire.BINARY)
+    wire.decode(data, wire.BINARY) == result
+
+A2AMessage has to_wire() / from_wire() on top of these.
+
+Content negotiation: a client sends `Accept: application/vnd.a2a-mcp+msgpack,
+application/json;q=0.5`; negotiate() picks binary if the client accepts it
+and msgpack is installed here, JSON otherwise.
+"""
+
+import json
+from operator import itemgetter
+from typing import Any, Dict, List, Optional
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON only
+    msgpack = None
+
+JSON = "application/json"
+BINARY = "application/vnd.a2a-mcp+msgpack"
+
+WIRE_VERSION = 1
+_MAGIC = b"A2W"
+_HEADER = _MAGIC + bytes([WIRE_VERSION])
+
+EXT_TABLE = 1       # columnar list of homogeneous dict rows
+MIN_TABLE_ROWS = 2
+
+
+class WireFormatError(ValueError):
+    """Payload is not in the expected format or has an unsupported version."""
+
+
+def binary_available() -> bool:
+    return msgpack is not None
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or JSON).split(";", 1)[0].strip().lower()
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Response content type for an Accept header (JSON unless binary is acceptable and available)."""
+    if msgpack is None or not accept:
+        return JSON
+    best, best_q = JSON, 0.0
+    for part in accept.split(","):
+        media, _, params = part.partition(";")
+        media = media.strip().lower()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in (BINARY, JSON) and q > best_q:
+            best, best_q = media, q
+    return best
+
+
+# ------------------------------------------------------
+# Columnar tables
+# ------------------------------------------------------
+class _Table:
+    __slots__ = ("keys", "rows")
+
+    def __init__(self, keys: List[str], rows: List[Dict[str, Any]]):
+        self.keys = keys
+        self.rows = rows
+
+
+_CONTAINERS = (dict, list, tuple)
+
+
+def _tabulate(obj: Any) -> Any:
+    """Replace lists of same-keyed (non-empty) dicts with _Table markers (recursively)."""
+    if isinstance(obj, dict):
+        return {k: _tabulate(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        if len(obj) >= MIN_TABLE_ROWS and isinstance(obj[0], dict):
+            keys = list(obj[0])
+            key_set = obj[0].keys()
+            if keys and all(isinstance(k, str) for k in keys) and all(
+                isinstance(r, dict) and r.keys() == key_set for r in obj
+            ):
+                return _Table(keys, obj)
+        # distinct element types: a C-speed pass over scalar columns
+        if any(issubclass(t, _CONTAINERS) for t in set(map(type, obj))):
+            return [_tabulate(v) for v in obj]
+    return obj
+
+
+def _default(obj: Any):
+    if isinstance(obj, _Table):
+        # Row values are almost always scalars (SQLite columns); only
+        # columns holding containers need another pass
+        columns = list(zip(*map(itemgetter(*obj.keys), obj.rows))) if len(obj.keys) > 1 else \
+            [[row[obj.keys[0]] for row in obj.rows]]
+        columns = [_tabulate(col) for col in columns]
+        return msgpack.ExtType(EXT_TABLE, _pack([obj.keys, columns]))
+    raise TypeError(f"cannot serialize {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes):
+    if code != EXT_TABLE:
+        raise WireFormatError(f"unknown extension type {code}")
+    keys, columns = _unpack(data)
+    return [dict(zip(keys, values)) for values in zip(*columns)]
+
+
+def _pack(obj: Any) -> bytes:
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+# ------------------------------------------------------
+# Encode / decode
+# ------------------------------------------------------
+def encode(obj: Any, content_type: str = JSON, columnar: bool = True) -> bytes:
+    """Serialize `obj` (tool result / JSON-RPC envelope) as `content_type`."""
+    media = _media_type(content_type)
+    if media == JSON:
+        return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
+    if media != BINARY:
+        raise WireFormatError(f"unsupported content type: {content_type}")
+    if msgpack is None:
+        raise WireFormatError("binary wire format requires the msgpack package")
+    return _HEADER + _pack(_tabulate(obj) if columnar else obj)
+
+
+def decode(data: bytes, content_type: Optional[str] = JSON) -> Any:
+    media = _media_type(content_type)
+    if media == JSON:
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise WireFormatError(f"invalid JSON: {e}") from None
+    if media != BINARY:
+        raise WireFormatError(f"unsupported content type: {content_type}")
+    if msgpack is None:
+        raise WireFormatError("binary wire format requires the msgpack package")
+    if data[:3] != _MAGIC:
+        raise WireFormatError("missing binary wire header")
+    if data[3:4] != bytes([WIRE_VERSION]):
+        version = data[3] if len(data) > 3 else None
+        raise WireFormatError(f"unsupported wire format version {version} (expected {WIRE_VERSION})")
+    try:
+        return _unpack(data[4:])
+    except (ValueError, msgpack.ExtraData, msgpack.FormatError, msgpack.StackError) as e:
+        raise WireFormatError(f"invalid msgpack payload: {e}") from None
+
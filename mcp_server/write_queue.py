@@ -0,0 +1,127 @@
+# mcp_server/write_queue.py
+"""
+Group commit for single-statement writes.
+
+Callers submit one `... RETURNING *` statement and get a Future back.
+A background writer thread drains the queue, packs up to `max_batch`
+statements (waiting at most `max_wait` seconds for stragglers) into one
+transaction per database file and commits once, so a burst of N writes
+pays for one fsync instead of N.
+
+Each statement runs inside its own SAVEPOINT: a failing write (constraint
+violation, bad column) only fails its own Future and the rest of the
+batch still commits. Futures resolve after the commit, never before.
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class _Write:
+    path: Path
+    sql: str
+    params: Tuple[Any, ...]
+    future: Future = field(default_factory=Future)
+
+
+class WriteQueue:
+    def __init__(self, max_batch: int = 64, max_wait: float = 0.002):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._conns: Dict[Path, sqlite3.Connection] = {}
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: Path, sql: str, params=()) -> Future:
+        """Queue a write; the Future resolves with the RETURNING row (or None)."""
+        item = _Write(Path(path), sql, tuple(params))
+        self._queue.put(item)
+        return item.future
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    # ------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    nxt = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            self._commit_batch(batch)
+
+        for conn in self._conns.values():
+            conn.close()
+        self._conns.clear()
+
+    def _connection(self, path: Path) -> sqlite3.Connection:
+        conn = self._conns.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._conns[path] = conn
+        return conn
+
+    def _commit_batch(self, batch: List[_Write]):
+        by_path: Dict[Path, List[_Write]] = {}
+        for w in batch:
+            by_path.setdefault(w.path, []).append(w)
+
+        for path, writes in by_path.items():
+            results = []
+            try:
+                conn = self._connection(path)
+                conn.execute("BEGIN IMMEDIATE")
+                for w in writes:
+                    conn.execute("SAVEPOINT w")
+                    try:
+                        rows = conn.execute(w.sql, w.params).fetchall()
+                        conn.execute("RELEASE w")
+                        results.append((w, {k: rows[0][k] for k in rows[0].keys()} if rows else None, None))
+                    except sqlite3.Error as e:
+                        conn.execute("ROLLBACK TO w")
+                        conn.execute("RELEASE w")
+                        results.append((w, None, e))
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                conn = self._conns.pop(path, None)
+                if conn is not None:
+                    conn.close()
+                for w in writes:
+                    w.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.writes += len(writes)
+            for w, row, err in results:
+                if err is not None:
+                    w.future.set_exception(err)
+                else:
+                    w.future.set_result(row)
@@ -0,0 +1,20 @@
+# tests/conftest.py
+import pytest
+
+from mcp_server import db
+from mcp_server.database_setup import DatabaseSetup
+
+
+@pytest.fixture
+def sample_db(tmp_path, monkeypatch):
+    """Fresh database with the sample customers/tickets, wired into mcp_server.db."""
+    path = tmp_path / "customers.db"
+    setup = DatabaseSetup(str(path))
+    setup.connect()
+    setup.create_tables()
+    setup.create_triggers()
+    setup.insert_sample_data()
+    setup.close()
+
+    monkeypatch.setattr(db, "DB_PATH", path)
+    return path
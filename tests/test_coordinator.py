@@ -0,0 +1,540 @@
+# tests/test_coordinator.py
+import json
+
+import pytest
+
+from agents.coordinator import A2ACoordinator
+
+
+def make_coordinator(classification, **kwargs):
+    """Coordinator with canned LLM replies (no network)."""
+    coord = A2ACoordinator(**kwargs)
+    coord.router.llm = lambda system, user, **kw: json.dumps(classification)
+    coord.support_agent.llm = lambda system, user, **kw: user
+    return coord
+
+
+def test_session_reuses_customer_and_intent(sample_db):
+    coord = make_coordinator({"intents": ["account_help"], "customer_id": 5, "scenario": "simple_get"})
+
+    calls = {"classify": 0, "get_customer": 0}
+    classify, get_customer = coord.router.classify_intent, coord.mcp.get_customer
+
+    def counting_classify(q):
+        calls["classify"] += 1
+        return classify(q)
+
+    def counting_get_customer(cid):
+        calls["get_customer"] += 1
+        return get_customer(cid)
+
+    coord.router.classify_intent = counting_classify
+    coord.mcp.get_customer = counting_get_customer
+
+    query = "Get customer information for ID 5"
+    for _ in range(3):
+        answer, log = coord.run(query, session_id="s1")
+        assert "Charlie Brown" in answer
+
+    assert calls == {"classify": 1, "get_customer": 1}
+    assert "reused=intent,customer" in log[-1]
+
+    # Other sessions start cold
+    coord.run(query, session_id="s2")
+    assert calls == {"classify": 2, "get_customer": 2}
+
+
+def test_session_store_evicts_lru_and_by_budget():
+    from agents.session_store import SessionStore
+
+    store = SessionStore(max_sessions=2, max_bytes=10_000)
+    for sid in ("a", "b", "c"):
+        store.update(store.get(sid), {"customer_id": 1}, "hi")
+    assert len(store) == 2 and store.evictions == 1
+
+    big = {"customer": {"id": 1, "notes": "x" * 20_000}}
+    store.update(store.get("d"), big, "hi")
+    assert len(store) == 1
+
+    # A session evicted while its turn ran is no longer charged for
+    store = SessionStore(max_sessions=1)
+    evicted = store.get("a")
+    store.update(store.get("b"), {"customer_id": 2}, "hi")
+    store.update(evicted, {"customer_id": 1}, "hi")
+    assert len(store) == 1 and store.total_bytes == store.get("b").size_bytes
+
+
+def test_batch_streams_results_in_session_order(sample_db):
+    import io
+
+    from agents.batch import read_queries, run_batch
+
+    lines = [json.dumps({"query": "Get customer information for ID 5", "session_id": "s"})] * 3
+    lines += [json.dumps("Get customer information for ID 5")]
+    out = io.StringIO()
+
+    classification = {"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"}
+    report = run_batch(
+        read_queries(io.StringIO("\n".join(lines))), out,
+        workers=3, coordinator_factory=lambda: make_coordinator(classification),
+        progress=None,
+    )
+
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert report.completed == 4 and report.errors == 0
+    assert sorted(r["id"] for r in results) == [1, 2, 3, 4]
+    session_turns = [r for r in results if r["session_id"] == "s"]
+    assert [r["id"] for r in session_turns] == [1, 2, 3]
+    assert "reused=intent,customer" in session_turns[-1]["log"][-1]
+    assert report.histogram.total == 4
+
+
+def test_batch_stdout_carries_only_results(sample_db, capsys):
+    import io
+    import sys
+
+    from agents.batch import read_queries, run_batch
+
+    lines = [json.dumps("Get customer information for ID 5"), json.dumps("Something else entirely")]
+    classification = {"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"}
+    report = run_batch(
+        read_queries(io.StringIO("\n".join(lines))), sys.stdout,
+        workers=2, coordinator_factory=lambda: make_coordinator(classification),
+        progress=None,
+    )
+
+    captured = capsys.readouterr()
+    results = [json.loads(line) for line in captured.out.splitlines()]
+    assert report.completed == len(results) == 2
+    assert "[CustomerDataAgent] Received" in captured.err
+
+
+def test_compiled_plan_skips_router_hops(sample_db):
+    classification = {"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"}
+    query = "Get customer information for ID 5"
+
+    planned = make_coordinator(classification)
+    routed = make_coordinator(classification, use_plans=False)
+
+    planned_answer, planned_log = planned.run(query)
+    routed_answer, _ = routed.run(query)
+
+    assert planned_answer == routed_answer
+    assert [t["agent"] for t in planned.last_timings] == ["router", "customer_data", "support"]
+    assert [t["agent"] for t in routed.last_timings] == [
+        "router", "customer_data", "router", "support", "router",
+    ]
+    assert any(line.startswith("[PLAN] scenario=simple_get") for line in planned_log)
+
+
+def test_unknown_scenario_falls_back_to_routing(sample_db):
+    coord = make_coordinator({"intents": ["unknown"], "customer_id": None, "scenario": "unknown"})
+    _, log = coord.run("Hello?")
+    assert [t["agent"] for t in coord.last_timings] == ["router", "support", "router"]
+    assert not any(line.startswith("[PLAN]") for line in log)
+
+
+def test_prefetch_hit_and_miss(sample_db):
+    from agents.prefetch import candidate_customer_ids
+
+    assert candidate_customer_ids("I'm customer 12345, ticket #7") == [12345, 7]
+
+    hit = make_coordinator({"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"})
+    answer, _ = hit.run("Get customer information for ID 5")
+    assert "Charlie Brown" in answer
+    assert hit.router.prefetcher.stats.hits == 1
+
+    miss = make_coordinator({"intents": ["lookup"], "customer_id": 6, "scenario": "simple_get"})
+    answer, _ = miss.run("Get customer information for ID 5")
+    assert "Diana Prince" in answer
+    stats = miss.router.prefetcher.stats
+    assert (stats.hits, stats.misses, stats.discarded) == (0, 1, 1)
+
+
+def test_deadline_returns_degraded_answer(sample_db):
+    import time
+
+    # refund_escalation always goes through the LLM rewrite
+    coord = make_coordinator({"intents": ["refund"], "customer_id": 5, "scenario": "refund_escalation"})
+
+    def slow_rewrite(system, user, timeout=None):
+        time.sleep(min(timeout or 1.0, 1.0))
+        raise TimeoutError("LLM request timed out")
+
+    coord.support_agent.llm = slow_rewrite
+    start = time.perf_counter()
+    answer, log = coord.run("Customer 5 wants a refund for a double charge", timeout=0.2)
+
+    assert time.perf_counter() - start < 0.5
+    assert answer.startswith("Sorry, we could not complete your request in time.")
+    assert "Customer #5: Charlie Brown" in answer
+    assert coord.deadline_misses == {"support": 1}
+    assert log[-1].startswith("[DEADLINE]")
+
+
+def test_writes_are_not_abandoned_at_the_deadline(sample_db, monkeypatch):
+    import time
+
+    from agents.base_agent import DeadlineExceeded
+    from agents.mcp_client import MCPClient
+    from mcp_server import db, tools
+
+    update = tools.update_customer
+
+    def slow_update(customer_id, data):
+        time.sleep(0.2)
+        return update(customer_id, data)
+
+    monkeypatch.setattr(tools, "update_customer", slow_update)
+    client = MCPClient()
+
+    # Already out of budget: rejected before anything is written
+    with pytest.raises(DeadlineExceeded):
+        client.update_customer(5, {"status": "disabled"}, timeout=0)
+    assert db.get_customer(5)["status"] == "active"
+
+    # Started in time: runs to completion and reports the committed row
+    row = client.update_customer(5, {"status": "disabled"}, timeout=0.05)
+    assert row["status"] == db.get_customer(5)["status"] == "disabled"
+
+
+def test_template_fast_path_skips_llm_rewrite(sample_db):
+    def no_llm(system, user, **kw):
+        raise AssertionError("LLM rewrite should be skipped")
+
+    coord = make_coordinator({"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"})
+    coord.support_agent.llm = no_llm
+    answer, _ = coord.run("Get customer information for ID 5")
+    assert answer.startswith("Customer #5: Charlie Brown")
+
+    coord = make_coordinator({"intents": ["report"], "customer_id": None,
+                              "scenario": "active_customers_with_open_tickets"})
+    coord.support_agent.llm = no_llm
+    answer, _ = coord.run("Show me all active customers who have open tickets")
+    assert answer.startswith("Active customers with open tickets")
+
+    # Escalations keep the LLM rewrite; the template-free draft is the placeholder
+    coord = make_coordinator({"intents": ["refund"], "customer_id": 5, "scenario": "refund_escalation"})
+    answer, _ = coord.run("Customer 5 wants a refund")
+    assert "Customer #5 - Charlie Brown" in answer
+
+
+def pool_coordinator(db_path):
+    """Module-level (picklable) factory: spawned workers re-import this module."""
+    from pathlib import Path
+
+    from mcp_server import db
+
+    db.DB_PATH = Path(db_path)
+    return make_coordinator({"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"})
+
+
+def test_pool_keeps_sessions_on_one_worker(sample_db):
+    import functools
+
+    from agents.pool import CoordinatorPool
+
+    factory = functools.partial(pool_coordinator, str(sample_db))
+    with CoordinatorPool(workers=2, coordinator_factory=factory, start_method="spawn") as pool:
+        futures = [
+            pool.submit("Get customer information for ID 5", session_id=sid)
+            for _ in range(3) for sid in ("a", "b", "c")
+        ]
+        results = [f.result(timeout=30) for f in futures]
+
+        assert all(r["error"] is None and "Charlie Brown" in r["answer"] for r in results)
+        # Later turns of every session were served from that worker's session context
+        for r in results[3:]:
+            assert "reused=intent,customer" in r["log"][-1]
+        answer, _ = pool.run("Get customer information for ID 5")
+        assert "Charlie Brown" in answer
+
+    assert sum(pool.completed) == 10
+    with pytest.raises(RuntimeError):
+        pool.submit("too late")
+
+
+def test_pool_routes_around_a_dead_worker(sample_db):
+    import functools
+    import time
+
+    from agents.pool import CoordinatorPool
+
+    factory = functools.partial(pool_coordinator, str(sample_db))
+    with CoordinatorPool(workers=2, coordinator_factory=factory, start_method="spawn") as pool:
+        assert pool.submit("Get customer information for ID 5", session_id="a").result(timeout=30)["error"] is None
+        home = pool.worker_for("a")
+        pool._procs[home].kill()
+        pool._procs[home].join()
+        deadline = time.monotonic() + 10
+        while pool.alive[home] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.alive == [i != home for i in range(2)]
+
+        # The session's next turns run on the surviving worker
+        assert pool.worker_for("a") == 1 - home
+        for _ in range(2):
+            result = pool.submit("Get customer information for ID 5", session_id="a").result(timeout=30)
+            assert result["error"] is None and "Charlie Brown" in result["answer"]
+
+        pool._procs[1 - home].kill()
+        pool._procs[1 - home].join()
+        while any(pool.alive) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        with pytest.raises(RuntimeError, match="no coordinator worker"):
+            pool.submit("Get customer information for ID 5", session_id="a").result(timeout=5)
+
+
+def test_large_results_travel_as_handles(sample_db):
+    classification = {"intents": ["list"], "customer_id": None, "scenario": "active_customers_with_open_tickets"}
+    inline_answer, inline_log = make_coordinator(classification, handle_min_rows=10**6).run("Active customers")
+    answer, log = make_coordinator(classification, handle_min_rows=2).run("Active customers")
+
+    assert answer == inline_answer
+    steps = [line for line in log if line.startswith("[STEP")]
+    assert "<active_customers#1: 12 rows>" in steps[-1]
+    assert sum(map(len, steps)) < sum(len(line) for line in inline_log if line.startswith("[STEP")) / 3
+    assert any(line.startswith("[RESULTS] handles=2") for line in log)
+
+    # A session keeps the rows, not handles into a released store
+    coord = make_coordinator({"intents": ["tickets"], "customer_id": 2, "scenario": "open_tickets"},
+                             handle_min_rows=1)
+    first, _ = coord.run("Show my open tickets", session_id="s1")
+    assert coord.sessions.get("s1").context["customer_history"][0]["customer_id"] == 2
+    assert coord.run("Show my open tickets", session_id="s1")[0] == first
+
+
+def test_llm_calls_are_recorded_per_agent_and_scenario(sample_db, monkeypatch):
+    from types import SimpleNamespace
+
+    from agents import llm_utils
+    from agents.llm_metrics import LLMMetrics
+
+    # A fake OpenAI client: usage and retries come back with the raw response
+    requests = []
+
+    def create(model, messages, **kw):
+        requests.append(kw)
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=100,
+                                prompt_tokens_details=SimpleNamespace(cached_tokens=400))
+        reply = json.dumps({"intents": ["refund"], "customer_id": 5, "scenario": "refund_escalation"})
+        completion = SimpleNamespace(model=model, usage=usage,
+                                     choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+        return SimpleNamespace(parse=lambda: completion, retries_taken=1)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create))))
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+
+    metrics = LLMMetrics()
+    coord = A2ACoordinator(llm_metrics=metrics)
+    coord.router.prefetcher = None
+    query = "Customer 5 wants a refund for a double charge"
+    for _ in range(2):
+        answer, log = coord.run(query, session_id="s1")
+
+    summary = [line for line in log if line.startswith("[LLM]")]
+    assert summary and "calls=1 cache_hits=1 retries=1" in summary[0] and "tokens=1000+100" in summary[0]
+
+    snapshot = metrics.snapshot()
+    series = {(s["agent"], s["scenario"], s["model"]): s for s in snapshot["series"]}
+    # The classification is tagged with the scenario it produced
+    router = series[("router", "refund_escalation", "gpt-4o-mini")]
+    support = series[("support", "refund_escalation", "gpt-4o-mini")]
+    assert (router["calls"], router["retries"], router["latency_ms"]["count"]) == (1, 1, 1)
+    assert support["calls"] == 2 and support["cached_tokens"] == 800
+    assert series[("router", "refund_escalation", "unknown")]["cache_hits"] == 1
+    assert snapshot["totals"]["cost_usd"] == pytest.approx(3 * (600 * 0.15 + 400 * 0.075 + 100 * 0.60) / 1e6)
+    assert json.loads(metrics.export_json())["totals"]["calls"] == 4
+
+    # No budget: the client's default timeout applies; with one, it is passed on
+    assert requests and all("timeout" not in kw for kw in requests)
+    coord.run("Customer 5 wants a refund for a double charge", timeout=30)
+    assert 0 < requests[-1]["timeout"] <= 30
+
+
+def test_identical_concurrent_calls_share_one_flight(sample_db, monkeypatch):
+    import threading
+    import time
+
+    from agents.base_agent import DeadlineExceeded
+    from agents.mcp_client import MCPClient
+    from agents.single_flight import LLM_FLIGHTS, SingleFlight, call_key
+    from mcp_server import tools
+
+    assert call_key(tools.get_customer, 5) == call_key(tools.get_customer, customer_id="5")
+    assert call_key(tools.get_customer, 5) != call_key(tools.get_customer, 5, known_version=1)
+    assert call_key(tools.get_customers, [5, 6]) == call_key(tools.get_customers, ["5", "6"])
+    # Only `int` parameters are coerced: these are different lookups
+    assert call_key(tools.find_customer_by_phone, "05550107") != call_key(tools.find_customer_by_phone, "5550107")
+    assert call_key(tools.find_customer_by_email, "007@x.com") != call_key(tools.find_customer_by_email, "7@x.com")
+
+    def burst(n, fn):
+        barrier = threading.Barrier(n)
+        results = [None] * n
+
+        def worker(i):
+            barrier.wait()
+            results[i] = fn(i)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    # MCP reads: one execution per key, every client gets its own list
+    executed = []
+    history = tools.get_customer_history
+
+    def slow_history(customer_id: int, hot_only: bool = False):
+        executed.append(customer_id)
+        time.sleep(0.2)
+        return history(customer_id, hot_only=hot_only)
+
+    monkeypatch.setattr(tools, "get_customer_history", slow_history)
+    clients = [MCPClient() for _ in range(6)]
+    results = burst(6, lambda i: clients[i].get_customer_history(5 if i % 2 else "5"))
+    assert executed == [5] and all(r == results[0] for r in results)
+    assert len({id(r) for r in results}) == 6
+
+    # The first caller's deadline does not end the shared read for the others
+    executed.clear()
+    timeouts = [0.05, 5]
+
+    def read_with_budget(i):
+        time.sleep(0.02 * i)   # the short budget starts the flight
+        try:
+            return clients[i].get_customer_history(5, timeout=timeouts[i])
+        except DeadlineExceeded as e:
+            return e
+
+    short, long = burst(2, read_with_budget)
+    assert isinstance(short, DeadlineExceeded) and long == results[0]
+    assert executed == [5]
+
+    # Waiters give up on their own deadline
+    group = SingleFlight()
+
+    def sleep_once(i):
+        try:
+            return group.do("k", time.sleep, 0.3, timeout=0.05)
+        except TimeoutError as e:
+            return e
+
+    assert sorted(map(repr, burst(2, sleep_once))) == ["(None, False)", "TimeoutError()"]
+
+    # ...and run the call again when the first caller ran out of its own budget
+    runs = []
+
+    def run_with_budget(budget):
+        runs.append(budget)
+        time.sleep(min(budget, 0.2))
+        if budget < 0.2:
+            raise DeadlineExceeded("test")
+        return budget
+
+    def rerun(i):
+        time.sleep(0.02 * i)
+        try:
+            return group.do("k", run_with_budget, [0.05, 5][i], timeout=[0.05, 5][i], rerun_on=(DeadlineExceeded,))
+        except DeadlineExceeded as e:
+            return e
+
+    short, long = burst(2, rerun)
+    assert isinstance(short, DeadlineExceeded) and long == (5, False) and runs == [0.05, 5]
+
+    # LLM: identical classification prompts from different coordinators
+    calls = []
+    classification = {"intents": ["lookup"], "customer_id": 5, "scenario": "simple_get"}
+
+    def slow_classify(system, user, **kw):
+        calls.append(user)
+        time.sleep(0.2)
+        return json.dumps(classification)
+
+    coords = [make_coordinator(classification) for _ in range(4)]
+    for coord in coords:
+        coord.router.llm = slow_classify
+    collapsed = LLM_FLIGHTS.collapsed
+    answers = burst(4, lambda i: coords[i].run("Get customer information for ID 5")[0])
+    assert len(calls) == 1 and LLM_FLIGHTS.collapsed - collapsed == 3
+    assert all("Charlie Brown" in a for a in answers)
+
+
+def test_router_resolves_customer_by_email_or_phone(sample_db):
+    coord = make_coordinator({"intents": ["lookup"], "customer_id": None, "scenario": "simple_get"})
+
+    answer, _ = coord.run("Hi, this is charlie.brown@email.com - can you pull up my account?")
+    assert answer.startswith("Customer #5: Charlie Brown")
+
+    answer, _ = coord.run("Account details please, my number is (555) 0107")
+    assert answer.startswith("Customer #7: Edward Norton")
+    answer, _ = coord.run("+1 555 0107 here, I can't log in")
+    assert answer.startswith("Customer #7: Edward Norton")
+
+    # Digit runs without a phone cue or format are not phone numbers
+    coord = make_coordinator({"intents": ["refund"], "customer_id": None, "scenario": "refund_escalation"})
+    coord.run("Order 5550107 was charged twice on 2024-01-15")
+    assert not coord.customer_data_agent.mcp.customers.fetched
+
+    # The email of an email change is the new address, not the customer's
+    coord = make_coordinator({"intents": ["update_email"], "customer_id": None,
+                              "scenario": "update_email_and_history"})
+    coord.run("Update my email to charlie.brown@email.com")
+    assert not coord.customer_data_agent.mcp.customers.fetched
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "sample"])
+def test_profiled_runs_report_agents_and_frames(sample_db, tmp_path, monkeypatch, capsys, mode):
+    import pstats
+    import time
+    from types import SimpleNamespace
+
+    from agents import coordinator, llm_utils
+    from agents.profiling import profile_runs
+
+    classification = {"intents": ["refund"], "customer_id": 5, "scenario": "refund_escalation"}
+
+    def slow_llm(system, user, **kw):
+        time.sleep(0.03)   # long enough for the sampler to see it
+        return json.dumps(classification)
+
+    coord = make_coordinator(classification)
+    coord.router.llm = coord.support_agent.llm = slow_llm
+    coord.router.prefetcher = None
+    queries = ["Customer 5 wants a refund for a double charge"] * 2
+    output = tmp_path / f"run.{mode}"
+    results, report = profile_runs(coord, queries, mode=mode, output=str(output), top=50, interval=0.002)
+
+    assert len(results) == report.runs == 2
+    assert {"router", "customer_data", "support"} <= set(report.agents)
+    assert report.agents["router"]["calls"] == 2 and report.agents["support"]["wall_ms"] >= 2 * 30
+    text = report.format()
+    assert text.startswith(f"PROFILE mode={mode} runs=2") and f"output={output}" in text
+    if mode == "cprofile":
+        stats = pstats.Stats(str(output))
+        assert any(func == "slow_llm" for _, _, func in stats.stats)
+        assert any("sleep" in name for name, _ in report.functions)
+    else:
+        stacks = output.read_text().splitlines()
+        assert any("coordinator:run;" in s and "router_agent:handle;" in s for s in stacks)
+        assert "test_coordinator:slow_llm" in [name for name, _ in report.functions]
+        assert "test_coordinator:slow_llm" in text
+
+    # CLI: --profile wraps the runs and prints the report after the answers
+    def create(model, messages, **kw):
+        completion = SimpleNamespace(model=model, usage=None, choices=[
+            SimpleNamespace(message=SimpleNamespace(content=json.dumps(classification)))])
+        return SimpleNamespace(parse=lambda: completion, retries_taken=0)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create))))
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+    cli_output = tmp_path / f"cli.{mode}"
+    coordinator.main(["--profile", mode, "--profile-out", str(cli_output), "--repeat", "2",
+                      "--query", "Customer 5 wants a refund for a double charge"])
+    out = capsys.readouterr().out
+    assert out.count("FINAL RESPONSE:") == 2
+    assert f"PROFILE mode={mode} runs=2" in out and cli_output.exists()
@@ -0,0 +1,362 @@
+# tests/test_db.py
+import pytest
+
+from mcp_server import db, sharding
+
+
+def test_sharded_layout_matches_single_file(sample_db, monkeypatch):
+    expected_customers = db.list_customers(limit=100)
+    expected_active = db.list_customers(status="active", limit=5)
+    expected_open = db.list_open_tickets_for_customers([1, 2, 4, 7, 10], priority="high")
+
+    totals = sharding.reshard(sample_db, 1, 3)
+    assert totals == {"customers": 15, "tickets": 25, "tickets_archive": 0}
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 3)
+
+    assert db.list_customers(limit=100) == expected_customers
+    assert db.list_customers(status="active", limit=5) == expected_active
+    assert db.list_open_tickets_for_customers([1, 2, 4, 7, 10], priority="high") == expected_open
+    assert db.get_customer(7)["name"] == "Edward Norton"
+    assert len(db.get_customer_history(2)) == 3
+
+
+def test_sharded_ticket_ids_are_unique(sample_db, monkeypatch):
+    sharding.reshard(sample_db, 1, 4)
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 4)
+
+    ids = set()
+    for cid in range(1, 16):
+        ticket = db.create_ticket(cid, "Sharded ticket", "low")
+        assert ticket["customer_id"] == cid
+        assert ticket["id"] % 4 == sharding.shard_for(cid)
+        assert ticket["id"] > 25
+        ids.add(ticket["id"])
+    assert len(ids) == 15
+
+
+def test_read_snapshot_refreshes_after_writes_off_the_read_path(sample_db):
+    import time
+
+    db.enable_read_snapshot(max_staleness=60)
+    try:
+        assert db.get_customer(3)["status"] == "disabled"
+        snap = db._snapshots[sample_db]
+        refreshes = snap.refreshes
+
+        db.get_customer_history(3)
+        assert snap.refreshes == refreshes  # still fresh, served from memory
+
+        # Interleaved writes: readers never copy, the background thread does
+        for i in range(20):
+            ticket = db.create_ticket(3, f"Snapshot ticket {i}")
+            db.get_customer_history(3)
+        db.update_customer(3, {"status": "active"})
+        deadline = time.monotonic() + 5
+        while db.get_customer(3)["status"] != "active" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert any(t["id"] == ticket["id"] for t in db.get_customer_history(3))
+        assert snap.sync_refreshes == 1   # the initial copy only
+        assert snap.refreshes < 1 + 21
+    finally:
+        db.disable_read_snapshot()
+
+    # max_staleness=0: a process always reads its own writes
+    db.enable_read_snapshot(max_staleness=0)
+    try:
+        assert db.get_customer(3)["status"] == "active"
+        db.update_customer(3, {"status": "disabled"})
+        assert db.get_customer(3)["status"] == "disabled"
+    finally:
+        db.disable_read_snapshot()
+
+
+def test_group_commit_batches_concurrent_writes(sample_db):
+    from concurrent.futures import ThreadPoolExecutor
+
+    db.enable_group_commit(max_batch=16, max_wait=0.05)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tickets = list(pool.map(lambda i: db.create_ticket(1 + i % 15, f"Burst {i}", "high"), range(32)))
+        updated = db.update_customer(2, {"email": "jane@new.example.com"})
+        wq = db._write_queue
+        assert wq.writes == 33
+        assert wq.batches < wq.writes
+    finally:
+        db.disable_group_commit()
+
+    assert len({t["id"] for t in tickets}) == 32
+    assert all(t["status"] == "open" and t["priority"] == "high" for t in tickets)
+    assert updated["email"] == "jane@new.example.com"
+    assert db.get_customer(2)["email"] == "jane@new.example.com"
+
+
+def test_group_commit_isolates_failing_write(sample_db):
+    db.enable_group_commit(max_batch=8, max_wait=0.05)
+    try:
+        import pytest
+        import sqlite3
+
+        with pytest.raises(sqlite3.IntegrityError):
+            db.create_ticket(1, "Bad priority", "urgent")
+        assert db.create_ticket(1, "Fine", "low")["issue"] == "Fine"
+    finally:
+        db.disable_group_commit()
+
+
+def test_bulk_reads_match_single_calls(sample_db, monkeypatch):
+    ids = [7, 2, 99, 5, 2]
+
+    def check():
+        customers = db.get_customers(ids)
+        assert [c["id"] for c in customers] == [7, 2, 5]
+        assert customers == [db.get_customer(c) for c in (7, 2, 5)]
+
+        histories = db.get_customer_histories(ids)
+        assert sorted(histories) == [2, 5, 7, 99]
+        assert histories[99] == []
+        for cid in (2, 5, 7):
+            assert [t["id"] for t in histories[cid]] == [t["id"] for t in db.get_customer_history(cid)]
+
+        newest = db.get_customer_histories(ids, per_customer_limit=1)
+        assert newest[2] == histories[2][:1]
+
+    monkeypatch.setattr(db, "IN_CHUNK_SIZE", 2)
+    check()
+    sharding.reshard(sample_db, 1, 3)
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 3)
+    check()
+
+
+def test_triage_index_follows_writes(sample_db):
+    from mcp_server import triage
+
+    def sql_top(k, where="", params=()):
+        rows = db._fetch_all(
+            sample_db,
+            f"SELECT * FROM tickets WHERE status = 'open' {where} "
+            "ORDER BY CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END, created_at, id "
+            "LIMIT ?",
+            (*params, k),
+        )
+        return [r["id"] for r in rows]
+
+    triage.reset_index()
+    index = triage.get_index()
+    try:
+        assert [t["id"] for t in index.top(5)] == sql_top(5)
+
+        ticket = db.create_ticket(4, "Triage ticket", "high")
+        assert ticket["id"] in [t["id"] for t in index.top(50, priority="high")]
+
+        oldest_high = index.top(1)[0]
+        db.update_ticket_status(oldest_high["id"], "in_progress")
+        assert oldest_high["id"] not in [t["id"] for t in index.top(50)]
+        db.update_ticket_status(oldest_high["id"], "open")
+
+        assert [t["id"] for t in index.top(50)] == sql_top(50)
+        assert [t["id"] for t in index.top(3, priority="medium")] == sql_top(3, "AND priority = ?", ("medium",))
+        assert [t["id"] for t in index.top(10, customer_id=4)] == sql_top(10, "AND customer_id = ?", (4,))
+        assert [t["id"] for t in index.top(10, priority="low", customer_id=4)] == sql_top(
+            10, "AND customer_id = ? AND priority = ?", (4, "low")
+        )
+    finally:
+        triage.reset_index()
+
+
+def test_change_log_feed_and_retention(sample_db):
+    import threading
+
+    from mcp_server import changes
+
+    start = changes.get_changes(0, limit=1000)
+    assert start["changes"][0]["op"] == "insert" and not start["reset"]
+    cursor = start["latest_seq"]
+
+    db.update_customer(5, {"email": "charlie@new.com"})
+    ticket = db.create_ticket(5, "CDC ticket")
+    db.update_ticket_status(ticket["id"], "resolved")
+
+    page = changes.get_changes(cursor, limit=10)
+    assert [(c["table_name"], c["row_id"], c["customer_id"], c["op"]) for c in page["changes"]] == [
+        ("customers", 5, 5, "update"),  # once: the updated_at trigger is not logged
+        ("tickets", ticket["id"], 5, "insert"),
+        ("tickets", ticket["id"], 5, "update"),
+    ]
+    cursor = page["next_seq"]
+    assert changes.get_changes(cursor)["changes"] == []
+
+    # Long-poll wakes up on a write from another thread
+    timer = threading.Timer(0.1, db.update_customer, (6, {"phone": "+1-555-9999"}))
+    timer.start()
+    woke = changes.get_changes(cursor, wait_seconds=5)
+    timer.join()
+    assert [c["row_id"] for c in woke["changes"]] == [6]
+
+    # A cursor behind the retained window must reset
+    assert changes.compact_changes(keep_rows=1) > 0
+    assert changes.get_changes(0)["reset"]
+    assert not changes.get_changes(woke["next_seq"])["reset"]
+
+
+def test_conditional_get_customer_by_version(sample_db):
+    import sqlite3
+
+    from agents.mcp_client import MCPClient
+    from mcp_server.database_setup import DatabaseSetup
+
+    row = db.get_customer(5)
+    assert row["version"] == 1
+    assert db.get_customer(5, known_version=1) == {"id": 5, "version": 1, "not_modified": True}
+
+    assert db.update_customer(5, {"phone": "555-0105"})["version"] == 2
+    with sqlite3.connect(sample_db) as conn:   # writers outside db.py are versioned by the trigger
+        conn.execute("UPDATE customers SET email = 'cb@example.com' WHERE id = 5")
+    assert db.get_customer(5, known_version=2)["email"] == "cb@example.com"
+    assert db.get_customer(5)["version"] == 3
+
+    client = MCPClient()
+    assert client.get_customer(5) == client.get_customer(5) == db.get_customer(5)
+    assert (client.customers.fetched, client.customers.not_modified) == (1, 1)
+    client.update_customer(5, {"status": "disabled"})
+    assert client.get_customer(5)["status"] == "disabled"
+    assert (client.customers.fetched, client.customers.not_modified) == (1, 2)
+
+    # Databases created before the version column are migrated in place
+    with sqlite3.connect(sample_db) as conn:
+        conn.execute("DROP TRIGGER update_customer_timestamp")
+        conn.execute("ALTER TABLE customers DROP COLUMN version")
+    setup = DatabaseSetup(str(sample_db))
+    setup.connect()
+    setup.create_tables()
+    setup.create_triggers()
+    setup.close()
+    assert db.get_customer(5)["version"] == 1
+    db.update_customer(5, {"status": "active"})
+    assert db.get_customer(5)["version"] == 2
+
+
+def test_archive_moves_old_resolved_tickets(sample_db):
+    import sqlite3
+
+    from mcp_server import archive
+
+    with sqlite3.connect(sample_db) as conn:
+        conn.execute("UPDATE tickets SET created_at = datetime('now', '-200 days') WHERE status = 'resolved'")
+        old_resolved = conn.execute("SELECT COUNT(*) FROM tickets WHERE status = 'resolved'").fetchone()[0]
+    ids = list(range(1, 16))
+    before = {cid: db.get_customer_history(cid) for cid in ids}
+    before_bulk = db.get_customer_histories(ids, per_customer_limit=2)
+
+    assert archive.archive_resolved(older_than_days=90, batch_size=2) == old_resolved > 0
+    assert archive.archive_resolved(older_than_days=90) == 0
+
+    assert {cid: db.get_customer_history(cid) for cid in ids} == before
+    assert db.get_customer_histories(ids, per_customer_limit=2) == before_bulk
+    for cid in ids:
+        hot = db.get_customer_history(cid, hot_only=True)
+        assert hot == [t for t in before[cid] if t["status"] != "resolved"]
+    assert all(t["status"] != "resolved" for ts in db.get_customer_histories(ids, hot_only=True).values() for t in ts)
+
+
+def test_reshard_keeps_archived_ticket_ids_reserved(sample_db, monkeypatch):
+    import sqlite3
+
+    from mcp_server import archive
+
+    with sqlite3.connect(sample_db) as conn:
+        conn.execute("UPDATE tickets SET status = 'resolved', created_at = datetime('now', '-200 days') WHERE id = 25")
+    assert archive.archive_resolved(older_than_days=90) >= 1
+    archived = {t["id"]: t for t in db.get_customer_history(10) if t["id"] == 25}
+    assert archived
+
+    sharding.reshard(sample_db, 1, 2)
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 2)
+    ticket = db.create_ticket(10, "After reshard", "low")
+    assert ticket["id"] > 25
+    history = db.get_customer_history(10)
+    assert len({t["id"] for t in history}) == len(history)
+    assert [t for t in history if t["id"] == 25] == list(archived.values())
+
+
+def test_ticket_analytics_follow_the_change_log(sample_db):
+    import sqlite3
+    import time
+    from collections import Counter
+
+    pytest.importorskip("numpy")
+    from mcp_server import analytics, archive
+
+    now = time.time()
+
+    def expected():
+        conn = db.get_connection(sample_db)
+        try:
+            rows = conn.execute(
+                "SELECT customer_id, status, priority, CAST(strftime('%s', created_at) AS INTEGER) AS created "
+                "FROM tickets UNION ALL SELECT customer_id, status, priority, "
+                "CAST(strftime('%s', created_at) AS INTEGER) FROM tickets_archive"
+            ).fetchall()
+        finally:
+            conn.close()
+        backlog = [r for r in rows if r["status"] != "resolved"]
+        high = sorted((now - r["created"]) / 86400 for r in backlog if r["priority"] == "high")
+        per_customer = Counter(r["customer_id"] for r in rows)
+        return len(rows), len(backlog), Counter(r["status"] for r in backlog), high, per_customer
+
+    def check(index):
+        total, backlog, by_status, high_ages, per_customer = expected()
+        stats = index.backlog_stats(now=now)
+        assert (stats["tickets"], stats["backlog"]) == (total, backlog)
+        assert stats["by_status"] == {s: by_status[s] for s in ("open", "in_progress")}
+        assert stats["by_priority"]["high"]["count"] == len(high_ages)
+        assert stats["by_priority"]["high"]["age_max_days"] == round(high_ages[-1], 2)
+
+        dist = index.customer_ticket_distribution(top=3)
+        assert (dist["customers"], dist["tickets"], dist["max"]) == (
+            len(per_customer), total, max(per_customer.values())
+        )
+        assert sum(b["customers"] for b in dist["histogram"]) == len(per_customer)
+        assert [t["tickets"] for t in dist["top"]] == sorted(per_customer.values(), reverse=True)[:3]
+
+    analytics.reset_index()
+    index = analytics.get_index()
+    try:
+        check(index)
+
+        ticket = db.create_ticket(4, "Analytics ticket", "high")
+        db.update_ticket_status(1, "in_progress")
+        check(index)
+        assert index.refreshes == 1
+
+        with sqlite3.connect(sample_db) as conn:   # other writers reach it through the change log
+            conn.execute("UPDATE tickets SET created_at = datetime('now', '-200 days') WHERE status = 'resolved'")
+            conn.execute("DELETE FROM tickets WHERE id = ?", (ticket["id"],))
+        archive.archive_resolved(older_than_days=90)
+        check(index)
+        assert index.customer_ticket_distribution("backlog")["tickets"] == index.backlog_stats()["backlog"]
+        with pytest.raises(ValueError):
+            index.customer_ticket_distribution("closed")
+    finally:
+        analytics.reset_index()
+
+
+def test_find_customers_by_email_and_phone(sample_db, monkeypatch):
+    def ids(rows):
+        return [r["id"] for r in rows]
+
+    def check():
+        assert ids(db.find_customers_by_email("charlie.brown@email.com")) == [5]
+        assert ids(db.find_customers_by_email("  Charlie.Brown@Email.com ")) == [5]
+        assert db.find_customers_by_email("nobody@example.com") == []
+        for phone in ("+1-555-0107", "+1 (555) 0107", "555.0107", "15550107"):
+            assert ids(db.find_customers_by_phone(phone)) == [7], phone
+        assert db.find_customers_by_phone("0107") == []   # too short to be a number
+
+    check()
+    db.update_customer(7, {"phone": "+1 555 0105"})       # formatting differs, digits equal
+    assert ids(db.find_customers_by_phone("555-0105")) == [5, 7]
+    db.update_customer(7, {"phone": "+1-555-0107"})
+
+    sharding.reshard(sample_db, 1, 3)
+    monkeypatch.setattr(sharding, "SHARD_COUNT", 3)
+    check()
@@ -0,0 +1,71 @@
+# tests/test_loadgen.py
+import asyncio
+import json
+
+from benchmarks.loadgen import parse_mix, run_load
+from mcp_server import tools
+
+
+# Tools the test target rejects with a JSON-RPC error
+FAILING = {"create_ticket"}
+
+
+async def _jsonrpc_target(reader, writer):
+    """Keep-alive HTTP/1.1 endpoint answering tools/call from mcp_server.tools."""
+    while True:
+        request_line = await reader.readline()
+        if not request_line:
+            break
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        call = json.loads(await reader.readexactly(length))
+        params = call["params"]
+        try:
+            if params["name"] in FAILING:
+                raise RuntimeError("rejected by test target")
+            body = {"result": {"data": getattr(tools, params["name"])(**params["arguments"])}}
+        except Exception as e:
+            body = {"error": {"message": str(e)}}
+        payload = json.dumps({"jsonrpc": "2.0", "id": call["id"], **body}).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     b"Content-Length: %d\r\n\r\n%s" % (len(payload), payload))
+        await writer.drain()
+    writer.close()
+
+
+def _run(**kwargs):
+    async def go():
+        server = await asyncio.start_server(_jsonrpc_target, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            report = await run_load(f"http://127.0.0.1:{port}", **kwargs)
+            await asyncio.sleep(0.05)  # let handlers see the closed connections
+            return report
+
+    return asyncio.run(go())
+
+
+def test_closed_loop_reports_per_tool_latency(sample_db):
+    mix = parse_mix("get_customer=5,list_customers,get_customer_history=2,update_customer")
+    report = _run(mix=mix, concurrency=4, requests=200, duration=30, customers=15)
+    data = report.to_dict()
+
+    assert data["total"]["count"] == 200
+    assert data["total"]["errors"] == 0
+    assert report.connections == 4  # keep-alive: one connection per client
+    assert set(data["tools"]) == set(mix)
+    for r in data["tools"].values():
+        assert 0 < r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"] <= r["max_ms"]
+    assert "TOTAL" in report.format()
+
+
+def test_open_loop_counts_rpc_errors(sample_db):
+    report = _run(mix={"get_customer": 1, "create_ticket": 1}, rate=400, duration=0.5)
+    data = report.to_dict()
+
+    assert data["mode"].startswith("open loop")
+    assert data["tools"]["get_customer"]["errors"] == 0
+    created = data["tools"]["create_ticket"]
+    assert created["count"] > 0 and created["error_kinds"] == {"rpc_error": created["count"]}
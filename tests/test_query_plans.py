@@ -0,0 +1,65 @@
+# tests/test_query_plans.py
+"""
+EXPLAIN QUERY PLAN for every tool query: no full table scans, no temp
+B-tree sorts. A new query goes into its module's QUERIES registry and
+needs an index in DatabaseSetup.create_tables (or an entry in
+ALLOWED_SCANS saying why the scan is bounded).
+"""
+
+import re
+
+import pytest
+
+from mcp_server import analytics, archive, changes, db, triage
+
+REGISTRIES = {
+    "db": db.QUERIES, "changes": changes.QUERIES, "triage": triage.QUERIES, "archive": archive.QUERIES,
+    "analytics": analytics.QUERIES,
+}
+
+# Scans that stop early, with the reason
+ALLOWED_SCANS = {
+    ("db", "list_customers"): "rowid order, stops after LIMIT",
+    ("changes", "compact_by_age"): "seq order, stops at the first entry young enough to keep",
+    ("analytics", "load_ticket_columns"): "bulk load, once per process (then change-log refreshes)",
+}
+
+TABLES = ("customers", "tickets", "tickets_archive", "change_log")
+
+
+def _fill(sql: str) -> str:
+    return sql.format(ids="?, ?, ?", values="(?), (?), (?)", set_clause="email = ?, status = ?")
+
+
+def _plan(path, sql):
+    conn = db.get_connection(path)
+    try:
+        sql = _fill(sql)
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", [1] * sql.count("?")).fetchall()
+        return [r["detail"] for r in rows]
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize(
+    "module,name", [(m, n) for m, queries in REGISTRIES.items() for n in queries]
+)
+def test_query_uses_an_index(sample_db, module, name):
+    plan = _plan(sample_db, REGISTRIES[module][name])
+
+    assert not [step for step in plan if "TEMP B-TREE" in step], plan
+
+    # "SCAN t" and "SCAN t USING [COVERING] INDEX i" both visit every row
+    scans = [step for step in plan if re.match(rf"SCAN ({'|'.join(TABLES)})\b", step)]
+    if (module, name) not in ALLOWED_SCANS:
+        assert not scans, plan
+
+
+def test_history_reads_use_the_customer_created_index(sample_db):
+    plan = _plan(sample_db, db.GET_CUSTOMER_HISTORY)
+    assert any("idx_tickets_customer_created" in step for step in plan), plan
+
+
+def test_contact_lookups_use_their_indexes(sample_db):
+    assert any("idx_customers_email" in step for step in _plan(sample_db, db.FIND_CUSTOMERS_BY_EMAIL))
+    assert any("idx_customers_phone_digits" in step for step in _plan(sample_db, db.FIND_CUSTOMERS_BY_PHONE))
@@ -0,0 +1,61 @@
+# tests/test_startup.py
+"""
+Cold-start budget, measured with `python -X importtime` in a fresh
+interpreter. The budgets are loose enough for CI noise but far below
+what an eager `import openai` costs (several hundred ms).
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_BUDGET_MS = {
+    "agents.coordinator": 200,
+    "mcp_server.tools": 100,
+}
+STARTUP_BUDGET_MS = 250
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _cumulative_import_ms(module: str) -> float:
+    """Cumulative import time of `module` from the -X importtime report."""
+    stderr = _run(f"import {module}", "-X", "importtime").stderr
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if name.strip() == module:
+            return int(cumulative_us) / 1000
+    raise AssertionError(f"{module} not found in importtime output:\n{stderr}")
+
+
+def test_import_time_budget():
+    for module, budget in IMPORT_BUDGET_MS.items():
+        ms = _cumulative_import_ms(module)
+        assert ms < budget, f"import {module} took {ms:.1f}ms (budget {budget}ms)"
+
+
+def test_coordinator_startup_is_lazy():
+    out = _run(
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        "from agents.coordinator import A2ACoordinator\n"
+        "A2ACoordinator()\n"
+        "print((time.perf_counter() - t) * 1000)\n"
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('openai', 'httpx', 'fastapi')))\n"
+    ).stdout.splitlines()
+
+    startup_ms, heavy_modules = float(out[0]), out[1]
+    assert heavy_modules == "[]"
+    assert startup_ms < STARTUP_BUDGET_MS, f"startup took {startup_ms:.1f}ms (budget {STARTUP_BUDGET_MS}ms)"
@@ -0,0 +1,77 @@
+# tests/test_wire.py
+import time
+
+import pytest
+
+from agents.base_agent import A2AMessage
+from mcp_server import db, wire
+
+
+def test_binary_roundtrip_is_columnar_and_versioned(sample_db):
+    pytest.importorskip("msgpack")
+    state = {
+        "customer": db.get_customer(5),
+        "active_customers": db.list_customers(status="active"),
+        "histories": db.get_customer_histories([1, 2, 5]),   # int keys survive
+        "mixed": [{"a": 1}, {"b": 2}, 3],                    # not a table, kept as-is
+        "empty_rows": [{}, {}, {}],                          # no columns, kept as-is
+    }
+    data = wire.encode(state, wire.BINARY)
+    assert wire.decode(data, wire.BINARY) == state
+    assert len(data) < len(wire.encode(state, wire.BINARY, columnar=False))
+    assert len(data) < len(wire.encode(state, wire.JSON))
+
+    with pytest.raises(wire.WireFormatError, match="version"):
+        wire.decode(data[:3] + b"\x09" + data[4:], wire.BINARY)
+
+    assert wire.negotiate(f"{wire.JSON};q=0.5, {wire.BINARY}") == wire.BINARY
+    assert wire.negotiate(f"{wire.JSON}, {wire.BINARY};q=0.1") == wire.JSON
+    assert wire.negotiate("*/*") == wire.JSON
+
+    msg = A2AMessage("router", "customer_data", "agent", "fetch", state, deadline=time.monotonic() + 5)
+    for content_type in (wire.JSON, wire.BINARY):
+        copy = A2AMessage.from_wire(msg.to_wire(content_type), content_type)
+        assert (copy.sender, copy.content, copy.state["customer"]) == ("router", "fetch", state["customer"])
+        assert 4 < copy.remaining() <= 5
+
+
+def test_remote_client_negotiates_wire_format(sample_db):
+    pytest.importorskip("msgpack")
+    requests = pytest.importorskip("requests")
+    pytest.importorskip("uvicorn")
+    from agents.mcp_client import MCPClient, RemoteMCPClient, RemoteToolError
+    from benchmarks.loadgen import serve_in_thread
+
+    url, server = serve_in_thread()
+    local = MCPClient()
+    try:
+        for mode in ("json", "auto", "msgpack"):
+            remote = RemoteMCPClient(url, wire=mode)
+            assert remote.get_customer(5) == local.get_customer(5)
+            assert remote.list_customers(status="active") == local.list_customers(status="active")
+            assert remote.get_customer_histories([1, 5]) == local.get_customer_histories([1, 5])
+            with pytest.raises(RemoteToolError):
+                remote.get_changes(shard=99)
+            remote.close()
+
+        resp = requests.post(
+            f"{url}/tools/call",
+            json={"id": "1", "method": "tools/call", "params": {"name": "get_customer", "arguments": {"customer_id": 5}}},
+            headers={"Accept": wire.BINARY},
+        )
+        assert resp.headers["content-type"] == wire.BINARY
+        assert wire.decode(resp.content, wire.BINARY)["result"]["data"]["name"] == "Charlie Brown"
+
+        # ETag / If-None-Match on the plain HTTP read
+        first = requests.get(f"{url}/customers/5")
+        assert first.json()["name"] == "Charlie Brown"
+        assert requests.get(f"{url}/customers/5", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+        assert requests.get(f"{url}/customers/999").status_code == 404
+
+        remote = RemoteMCPClient(url)
+        assert remote.get_customer(5) == remote.get_customer(5)
+        remote.update_customer(5, {"phone": "555-0105"})
+        assert remote.get_customer(5)["phone"] == "555-0105"
+        assert (remote.customers.fetched, remote.customers.not_modified) == (2, 1)
+    finally:
+        server.should_exit = True